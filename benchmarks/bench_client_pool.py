@@ -0,0 +1,62 @@
+"""Benchmark du pool de connexions de PennylaneClient.
+
+Mesure la latence p50/p99 d'un appel GET à 1, 16 et 64 appels simultanés
+contre une fausse API locale, avec la configuration par défaut de httpx
+et avec les réglages de `client_options_from_env()`.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_client_pool.py [--calls 2000] [--http2]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from mock_api import MockServer, make_app
+from pennylane_mcp.client import PennylaneClient, client_options_from_env
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(client: PennylaneClient, concurrency: int, calls: int) -> list[float]:
+    latencies: list[float] = []
+    queue = iter(range(calls))
+
+    async def worker():
+        for _ in queue:
+            start = time.perf_counter()
+            await client.get("customers", {"limit": 20})
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def main(calls: int, http2: bool):
+    with MockServer(make_app()) as server:
+        profiles = {
+            "minimal (5 conn, 1 keep-alive)": {"max_connections": 5, "max_keepalive_connections": 1},
+            "env": {**client_options_from_env(), "http2": http2},
+        }
+        for label, options in profiles.items():
+            client = PennylaneClient("bench", base_url=server.base_url, **options)
+            await run(client, 8, 50)  # échauffement du pool
+            print(f"\n== {label} ==")
+            print(f"{'concurrency':>12} {'p50 (ms)':>10} {'p99 (ms)':>10} {'mean (ms)':>10}")
+            for concurrency in (1, 16, 64):
+                samples = await run(client, concurrency, calls)
+                print(f"{concurrency:>12} {percentile(samples, 50) * 1000:>10.2f} "
+                      f"{percentile(samples, 99) * 1000:>10.2f} {statistics.mean(samples) * 1000:>10.2f}")
+            await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--http2", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.http2))
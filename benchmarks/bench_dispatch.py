@@ -0,0 +1,76 @@
+"""Micro-benchmark de la répartition des appels d'outils via le registre.
+
+Mesure, pour chaque outil, le coût de la recherche dans le registre et de
+l'adaptation des arguments, puis le coût d'un appel complet (registre +
+handler + client) contre un transport httpx en mémoire.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_dispatch.py [--iterations 20000]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from pennylane_mcp.client import PennylaneClient
+from pennylane_mcp.registry import REGISTRY, get_tool
+
+# Arguments minimaux plausibles pour chaque type de paramètre requis
+SAMPLE_VALUES = {"integer": 1, "number": 1, "string": "2024-01-01", "boolean": False,
+                 "array": [], "object": {}}
+
+
+def sample_arguments(schema: dict) -> dict:
+    properties = schema.get("properties", {})
+    return {
+        name: SAMPLE_VALUES.get(properties.get(name, {}).get("type"), "x")
+        for name in schema.get("required", [])
+    }
+
+
+def bench_lookup(iterations: int) -> list[tuple[str, float]]:
+    results = []
+    for name, spec in REGISTRY.items():
+        arguments = sample_arguments(spec.input_schema)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            get_tool(name).adapter(arguments)
+        results.append((name, (time.perf_counter() - start) / iterations))
+    return results
+
+
+async def bench_end_to_end(iterations: int) -> list[tuple[str, float]]:
+    payload = {"items": [], "has_more": False, "next_cursor": None, "current_page": 1, "total_pages": 1}
+    client = PennylaneClient("bench", base_url="http://pennylane.test", rate_limit=0, coalesce_gets=False,
+                             conditional_gets=0)
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=payload)))
+    results = []
+    for name, spec in REGISTRY.items():
+        arguments = sample_arguments(spec.input_schema)
+        try:
+            await spec(client, arguments)
+        except Exception:
+            continue  # outil nécessitant des arguments plus riches
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await spec(client, arguments)
+        results.append((name, (time.perf_counter() - start) / iterations))
+    await client.close()
+    return results
+
+
+def report(title: str, results: list[tuple[str, float]], unit: str, scale: float):
+    print(f"\n== {title} ==")
+    for name, seconds in sorted(results, key=lambda item: -item[1]):
+        print(f"{name:<55} {seconds * scale:>10.3f} {unit}")
+    mean = sum(seconds for _, seconds in results) / len(results)
+    print(f"{'moyenne':<55} {mean * scale:>10.3f} {unit}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    report("registre + adaptateur", bench_lookup(args.iterations), "µs", 1e6)
+    report("appel complet (transport en mémoire)", asyncio.run(bench_end_to_end(args.iterations // 20)), "µs", 1e6)
@@ -0,0 +1,64 @@
+"""Benchmark de la lecture et du chargement d'un fichier FEC volumineux.
+
+Écrit un FEC de N lignes (séparateur tabulation, ISO-8859-1) sur disque puis
+le lit et le charge par lots dans un miroir SQLite temporaire. Mesure le débit
+de lecture seule, le débit de chargement et la mémoire maximale du processus,
+qui doit rester indépendante de la taille du fichier.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_fec.py [--lines 1000000]
+"""
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+
+from pennylane_mcp.fec import FEC_COLUMNS, load_fec, parse_fec
+from pennylane_mcp.mirror import Mirror
+
+JOURNALS = (("VT", "Ventes"), ("HA", "Achats"), ("BQ", "Banque"), ("OD", "Opérations diverses"))
+
+
+def write_fec(path: str, lines: int, seed: int = 11):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="latin-1", newline="") as file:
+        file.write("\t".join(FEC_COLUMNS) + "\r\n")
+        for number in range(lines // 2):
+            code, label = rng.choice(JOURNALS)
+            day = f"2024{rng.randrange(1, 13):02d}{rng.randrange(1, 29):02d}"
+            amount = f"{rng.randrange(100, 10_000_000) / 100:.2f}".replace(".", ",")
+            for account, debit, credit in (("411000", amount, ""), ("706000", "", amount)):
+                file.write("\t".join((code, label, str(number), day, account, "Compte", "", "", f"P{number}",
+                                      day, f"Écriture {number}", debit, credit, "", "", day, "", "")) + "\r\n")
+
+
+def main(lines: int):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "fec.txt")
+    write_fec(path, lines)
+    size = os.path.getsize(path)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    started = time.perf_counter()
+    parsed = sum(1 for _ in parse_fec(path))
+    parse_seconds = time.perf_counter() - started
+
+    mirror = Mirror(os.path.join(directory, "mirror.db"))
+    started = time.perf_counter()
+    report = load_fec(mirror.db, path, fiscal_year_id=1)
+    load_seconds = time.perf_counter() - started
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    mirror.close()
+
+    print(f"lignes={parsed} fichier={size / 1e6:.1f} Mo équilibré={report['balanced']}")
+    print(f"lecture     {parse_seconds:8.2f} s  {parsed / parse_seconds:10.0f} lignes/s")
+    print(f"chargement  {load_seconds:8.2f} s  {parsed / load_seconds:10.0f} lignes/s")
+    print(f"RSS max     {peak_rss / 1e6:8.1f} Mo (avant lecture : {baseline_rss / 1e6:.1f} Mo)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    main(parser.parse_args().lines)
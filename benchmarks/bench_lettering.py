@@ -0,0 +1,78 @@
+"""Benchmark du moteur de lettrage sur un compte volumineux.
+
+Génère un compte client de N lignes : des factures (débit) réglées par un
+paiement unique, par plusieurs paiements partiels, ou regroupées dans un
+paiement couvrant plusieurs factures, plus des lignes sans contrepartie.
+Mesure le temps de résolution, la taille de l'index et la mémoire maximale du
+processus.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_lettering.py [--lines 100000]
+"""
+import argparse
+import random
+import time
+import resource
+from datetime import date, timedelta
+
+from pennylane_mcp.lettering import LetteringEngine
+
+
+def generate_lines(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    next_id = 0
+
+    def line(cents: int, day: date) -> dict:
+        nonlocal next_id
+        next_id += 1
+        debit, credit = (cents, 0) if cents > 0 else (0, -cents)
+        return {"id": next_id, "debit": f"{debit / 100:.2f}", "credit": f"{credit / 100:.2f}",
+                "date": day.isoformat(), "lettering": None}
+
+    while next_id < count:
+        day = start + timedelta(days=rng.randrange(365))
+        kind = rng.random()
+        if kind < 0.6:
+            amount = rng.randrange(1000, 1_000_000)
+            yield line(amount, day)
+            yield line(-amount, day + timedelta(days=rng.randrange(60)))
+        elif kind < 0.8:
+            amount = rng.randrange(3000, 1_000_000)
+            first = rng.randrange(1000, amount - 1000)
+            yield line(amount, day)
+            yield line(-first, day + timedelta(days=rng.randrange(30)))
+            yield line(-(amount - first), day + timedelta(days=30 + rng.randrange(30)))
+        elif kind < 0.9:
+            amounts = [rng.randrange(1000, 300_000) for _ in range(rng.randrange(2, 4))]
+            for amount in amounts:
+                yield line(amount, day + timedelta(days=rng.randrange(10)))
+            yield line(-sum(amounts), day + timedelta(days=20 + rng.randrange(20)))
+        else:
+            yield line(rng.choice([1, -1]) * rng.randrange(1000, 1_000_000), day)
+
+
+def main(lines: int):
+    engine = LetteringEngine()
+    started = time.perf_counter()
+    for item in generate_lines(lines):
+        engine.add(item)
+    loaded = time.perf_counter()
+    result = engine.solve()
+    solved = time.perf_counter()
+    index_bytes = sum(len(values) * values.itemsize for values in (engine._ids, engine._cents, engine._days))
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    kinds = {}
+    for group in result["groups"]:
+        kinds[group["kind"]] = kinds.get(group["kind"], 0) + 1
+    print(f"lignes={result['lines']} lettrées={result['lettered_lines']} groupes={kinds}")
+    print(f"chargement  {(loaded - started) * 1e3:8.1f} ms")
+    print(f"résolution  {(solved - loaded) * 1e3:8.1f} ms")
+    print(f"index       {index_bytes / 1e6:8.1f} Mo")
+    print(f"RSS max     {peak_rss / 1e6:8.1f} Mo")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    main(parser.parse_args().lines)
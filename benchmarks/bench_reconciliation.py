@@ -0,0 +1,65 @@
+"""Benchmark du moteur de rapprochement transactions ↔ factures.
+
+Génère N factures ouvertes et N transactions (dont une partie correspond à une
+facture, avec un léger décalage de date et de montant) puis mesure
+l'indexation et le calcul des propositions.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_reconciliation.py [--count 20000]
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from pennylane_mcp.reconciliation import ReconciliationEngine
+
+COMPANIES = ["Acme", "Dupont", "Martin", "Bernard", "Durand", "Leroy", "Moreau", "Simon", "Laurent", "Lefebvre"]
+
+
+def make_data(count: int, seed: int = 42) -> tuple[list[dict], list[dict], dict[int, int]]:
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    invoices, transactions, expected = [], [], {}
+    for index in range(count):
+        issued = start + timedelta(days=rng.randrange(365))
+        amount = rng.randrange(1000, 500000) / 100
+        company = f"{rng.choice(COMPANIES)} {rng.randrange(1000)}"
+        invoices.append({
+            "id": index, "invoice_number": f"F-{index:06d}", "label": f"Facture {company}",
+            "date": issued.isoformat(), "deadline": (issued + timedelta(days=30)).isoformat(),
+            "remaining_amount_with_tax": f"{amount:.2f}", "customer": {"id": index % 500, "name": company},
+        })
+        if rng.random() < 0.7:
+            paid = issued + timedelta(days=rng.randrange(45))
+            label = f"VIR SEPA {company.upper()} F-{index:06d}" if rng.random() < 0.5 else f"VIR {company.upper()}"
+            transactions.append({"id": index, "label": label, "date": paid.isoformat(),
+                                 "amount": f"{amount - rng.choice([0, 0, 0, 0.5]):.2f}"})
+            expected[index] = index
+        else:
+            transactions.append({"id": index, "label": f"CB DIVERS {rng.randrange(10**6)}",
+                                 "date": (start + timedelta(days=rng.randrange(365))).isoformat(),
+                                 "amount": f"{rng.randrange(1000, 500000) / 100:.2f}"})
+    return invoices, transactions, expected
+
+
+def main(count: int):
+    invoices, transactions, expected = make_data(count)
+    started = time.perf_counter()
+    engine = ReconciliationEngine(invoices)
+    indexed = time.perf_counter()
+    result = engine.propose(transactions)
+    finished = time.perf_counter()
+    proposals = result["proposals"]
+    correct = sum(1 for proposal in proposals if expected.get(proposal["transaction_id"]) == proposal["invoice_id"])
+    print(f"factures={len(invoices)} transactions={len(transactions)}")
+    print(f"indexation      {(indexed - started) * 1e3:8.1f} ms")
+    print(f"propositions    {(finished - indexed) * 1e3:8.1f} ms  ({len(proposals)} propositions)")
+    print(f"précision       {correct / max(len(proposals), 1):8.1%}")
+    print(f"rappel          {correct / max(len(expected), 1):8.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000)
+    main(parser.parse_args().count)
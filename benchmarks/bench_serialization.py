@@ -0,0 +1,85 @@
+"""Benchmark de la sérialisation des résultats d'outils.
+
+Compare, sur des listes de factures de ~1 Mo et ~10 Mo, l'ancien chemin
+(`json.dumps(indent=2)` puis réencodage de l'enveloppe JSON-RPC par le
+framework) au nouveau (sérialisation compacte puis enveloppe encodée une fois),
+pour chaque backend disponible.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_serialization.py [--repeat 5]
+"""
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from pennylane_mcp.serialization import SERIALIZERS, orjson
+
+
+def make_invoice(index: int) -> dict:
+    return {
+        "id": index,
+        "invoice_number": f"F-2024-{index:06d}",
+        "label": f"Facture n°{index} — prestation de conseil",
+        "date": "2024-03-15",
+        "deadline": "2024-04-15",
+        "amount": "1200.00",
+        "currency_amount": "1200.00",
+        "remaining_amount": "0.00",
+        "status": "paid",
+        "paid": True,
+        "customer": {"id": index % 500, "name": f"Client {index % 500}", "url": "https://example.test/c"},
+        "invoice_lines": [
+            {"label": "Conseil", "quantity": 2, "unit": "jour", "raw_currency_unit_price": "600.00",
+             "vat_rate": "FR_200", "amount": "1200.00"},
+        ],
+        "categories": [{"id": 12, "label": "Ventes", "weight": "1.0"}],
+    }
+
+
+def make_payload(target_bytes: int) -> dict:
+    one = len(json.dumps(make_invoice(0)))
+    count = max(1, target_bytes // one)
+    return {"items": [make_invoice(i) for i in range(count)], "has_more": False, "next_cursor": None}
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def legacy(payload: dict) -> bytes:
+    text = json.dumps(payload, indent=2, ensure_ascii=False)
+    envelope = {"jsonrpc": "2.0", "id": 1, "result": {"content": [{"type": "text", "text": text}]}}
+    # Ce que fait FastAPI pour une réponse dict : jsonable_encoder puis json.dumps
+    return json.dumps(jsonable_encoder(envelope), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def current(serializer, payload: dict) -> bytes:
+    text = serializer.dumps_text(payload)
+    return serializer.dumps({"jsonrpc": "2.0", "id": 1, "result": {"content": [{"type": "text", "text": text}]}})
+
+
+def main(repeat: int):
+    backends = [name for name in SERIALIZERS if name != "orjson" or orjson is not None]
+    print(f"{'taille':>8} {'chemin':<28} {'temps':>10} {'octets':>12}")
+    for label, size in (("1 Mo", 1_000_000), ("10 Mo", 10_000_000)):
+        payload = make_payload(size)
+        rows = [("json indent=2 + FastAPI", lambda: legacy(payload))]
+        for name in backends:
+            serializer = SERIALIZERS[name]()
+            rows.append((f"{name} compact", lambda serializer=serializer: current(serializer, payload)))
+        for name, fn in rows:
+            seconds = best_of(repeat, fn)
+            print(f"{label:>8} {name:<28} {seconds * 1e3:>8.1f}ms {len(fn()):>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args().repeat)
@@ -0,0 +1,156 @@
+"""Benchmark du mode multi-workers de mcp_sse_server.
+
+Lance `uvicorn --workers N` pour chaque valeur de N contre une fausse API
+locale, mesure le débit (appels d'outil par seconde) et la latence p50/p99
+de `/message` sous charge, puis vérifie l'affinité des sessions SSE : chaque
+message posté sur `/message?session_id=...`, quel que soit le worker qui le
+reçoit, doit revenir sur le flux de sa session.
+
+Le gain attendu est à peu près linéaire jusqu'au nombre de cœurs disponibles
+(les workers se partagent le CPU au-delà).
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_workers.py [--workers 1,2,4] [--duration 10] [--concurrency 64]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from mock_api import MockServer, make_app
+
+TOOL_CALL = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+             "params": {"name": "pennylane_list_customers", "arguments": {"limit": 100}}}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, api_url: str, state_dir: str) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = {
+        **os.environ,
+        "PENNYLANE_API_KEY": "bench",
+        "PENNYLANE_BASE_URL": api_url,
+        "PENNYLANE_RATE_LIMIT": "0",
+        "PENNYLANE_WORKERS": str(workers),
+        "PENNYLANE_STATE_BACKEND": f"sqlite:///{state_dir}/state-{workers}.db" if workers > 1 else "memory",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "pennylane_mcp.mcp_sse_server:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url + "/").status_code == 200:
+                # Laisse aux autres workers le temps de démarrer
+                time.sleep(1 + 0.5 * workers)
+                return process, url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"server with {workers} workers did not start")
+
+
+async def load(url: str, duration: float, concurrency: int) -> list[float]:
+    latencies: list[float] = []
+    deadline = time.perf_counter() + duration
+    async with httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_connections=concurrency)) as client:
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.post(url + "/message", json=TOOL_CALL)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def check_sessions(url: str, sessions: int, messages: int) -> tuple[int, int]:
+    """Messages postés sur des sessions SSE et réponses reçues sur leurs flux."""
+    received = 0
+
+    async def session():
+        nonlocal received
+        # Connexions distinctes : flux et POST peuvent arriver sur des workers différents
+        async with httpx.AsyncClient(timeout=30) as stream_client, httpx.AsyncClient(timeout=30) as post_client:
+            async with stream_client.stream("GET", url + "/sse") as stream:
+                lines = stream.aiter_lines()
+                async for line in lines:
+                    if line.startswith("data:"):
+                        endpoint = line[6:].replace("https://", "http://")
+                        break
+                for index in range(messages):
+                    response = await post_client.post(endpoint, json={**TOOL_CALL, "id": index})
+                    response.raise_for_status()
+                pending = set(range(messages))
+                async for line in lines:
+                    if line.startswith("data:"):
+                        pending.discard(json.loads(line[6:]).get("id"))
+                        received += 1
+                        if not pending:
+                            break
+
+    try:
+        await asyncio.wait_for(asyncio.gather(*(session() for _ in range(sessions))), 30)
+    except asyncio.TimeoutError:
+        pass  # messages perdus : le compte reçu le montre
+    return sessions * messages, received
+
+
+def main(worker_counts: list[int], duration: float, concurrency: int):
+    items = [{"id": i, "name": f"Client {i}", "emails": [f"client{i}@example.com"], "billing_iban": None,
+              "reference": f"C{i:05d}", "ledger_account": {"id": 4110000 + i}} for i in range(100)]
+    payload = json.dumps({"items": items, "has_more": False, "next_cursor": None}).encode()
+    print(f"{os.cpu_count()} CPU(s), {concurrency} concurrent clients, {duration:.0f}s per run")
+    print(f"{'workers':>8} {'calls/s':>9} {'speedup':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'sessions':>12}")
+    baseline = None
+    with MockServer(make_app(latency=0.005, payload=payload)) as api, tempfile.TemporaryDirectory() as state_dir:
+        for workers in worker_counts:
+            process, url = start_server(workers, api.base_url, state_dir)
+            try:
+                asyncio.run(load(url, 1.0, concurrency))  # échauffement
+                latencies = asyncio.run(load(url, duration, concurrency))
+                sent, received = asyncio.run(check_sessions(url, 8, 5))
+            finally:
+                process.terminate()
+                process.wait()
+            throughput = len(latencies) / duration
+            baseline = baseline or throughput
+            print(f"{workers:>8} {throughput:>9.0f} {throughput / baseline:>7.2f}x "
+                  f"{statistics.median(latencies) * 1000:>9.1f} {percentile(latencies, 99) * 1000:>9.1f} "
+                  f"{received:>5}/{sent:<6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    main([int(value) for value in args.workers.split(",")], args.duration, args.concurrency)
@@ -0,0 +1,62 @@
+"""Fausse API Pennylane locale pour les benchmarks.
+
+Application ASGI minimale servie par uvicorn dans un thread, qui simule une
+latence serveur fixe et renvoie un petit payload JSON.
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import uvicorn
+
+
+def make_app(latency: float = 0.005, payload: bytes | None = None):
+    """Construit l'application ASGI simulant l'API."""
+    body = payload or json.dumps({"items": [{"id": i, "label": f"item {i}"} for i in range(20)],
+                                  "has_more": False, "next_cursor": None}).encode()
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        await asyncio.sleep(latency)
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class MockServer:
+    """Serveur uvicorn lancé en arrière-plan, utilisable comme context manager."""
+
+    def __init__(self, app):
+        self.port = _free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port,
+                                                    log_level="warning", lifespan="off"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
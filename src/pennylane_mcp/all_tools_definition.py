@@ -1,4 +1,10 @@
-"""Définition de tous les outils MCP Pennylane pour le serveur SSE."""
+"""Définition de tous les outils MCP Pennylane, partagée par tous les serveurs."""
+from .bulk import BULK_CONCURRENCY, BULK_MAX_CONCURRENCY, BULK_MAX_ITEMS
+from .fec import POLL_TIMEOUT as FEC_POLL_TIMEOUT
+from .mirror import QUERY_MAX_ROWS, QUERY_TIMEOUT, RESOURCES as MIRRORED_RESOURCES, describe_tables
+from .paginated_tools import PAGINATED_TOOLS
+from .projection import add_fields_property
+from .shaping import add_shaping_properties
 
 ALL_TOOLS = [
     # FACTURES CLIENTS
@@ -8,16 +14,20 @@ ALL_TOOLS = [
         "inputSchema": {
             "type": "object",
             "properties": {
-                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 20},
+                "limit": {"type": "integer", "description": "Nombre de résultats (1-100)", "default": 20},
                 "cursor": {"type": "string", "description": "Curseur de pagination"},
-                "filter": {"type": "string", "description": "Filtres"},
-                "sort": {"type": "string", "description": "Tri", "default": "-id"}
+                "filter": {"type": "string", "description": "Filtres (ex: 'draft:eq:true' ou 'paid:eq:false')"},
+                "sort": {
+                    "type": "string",
+                    "description": "Tri (ex: '-id' pour desc, 'date' pour asc)",
+                    "default": "-id"
+                }
             }
         }
     },
     {
         "name": "pennylane_get_customer_invoice",
-        "description": "Récupère une facture client par son ID",
+        "description": "Récupère les détails d'une facture client par son ID",
         "inputSchema": {
             "type": "object",
             "properties": {
@@ -45,7 +55,10 @@ ALL_TOOLS = [
                             "raw_currency_unit_price": {"type": "string", "description": "Prix unitaire HT (ex: '750.00')"},
                             "quantity": {"type": "number", "description": "Quantité"},
                             "unit": {"type": "string", "description": "Unité (ex: 'jour', 'unité')"},
-                            "vat_rate": {"type": "string", "description": "Taux TVA (ex: 'FR_200' pour 20%, 'FR_100' pour 10%)"},
+                            "vat_rate": {
+                                "type": "string",
+                                "description": "Taux TVA (ex: 'FR_200' pour 20%, 'FR_100' pour 10%)"
+                            },
                             "description": {"type": "string", "description": "Description détaillée (optionnel)"},
                             "section_rank": {"type": "integer", "description": "Rang de section (optionnel)"},
                             "ledger_account_id": {"type": "integer", "description": "ID compte général (optionnel)"},
@@ -70,7 +83,11 @@ ALL_TOOLS = [
                         "required": ["label", "raw_currency_unit_price", "quantity", "unit", "vat_rate"]
                     }
                 },
-                "draft": {"type": "boolean", "description": "true = brouillon modifiable, false = facture finalisée", "default": True},
+                "draft": {
+                    "type": "boolean",
+                    "description": "true = brouillon modifiable, false = facture finalisée",
+                    "default": True
+                },
                 "currency": {"type": "string", "description": "Devise (EUR, USD, etc.)", "default": "EUR"},
                 "language": {"type": "string", "description": "Langue (fr_FR, en_GB)", "default": "fr_FR"},
                 "customer_invoice_template_id": {"type": "integer", "description": "ID du template de facture (optionnel)"},
@@ -92,7 +109,10 @@ ALL_TOOLS = [
                     "type": "object",
                     "description": "Remise globale (optionnel)",
                     "properties": {
-                        "type": {"type": "string", "description": "Type: 'absolute' (montant) ou 'relative' (pourcentage)"},
+                        "type": {
+                            "type": "string",
+                            "description": "Type: 'absolute' (montant) ou 'relative' (pourcentage)"
+                        },
                         "value": {"type": "string", "description": "Valeur de la remise"}
                     }
                 },
@@ -107,25 +127,143 @@ ALL_TOOLS = [
                             "rank": {"type": "integer"}
                         }
                     }
-                }
+                },
+                "idempotency_key": {"type": "string", "description": "Clé d'idempotence : une nouvelle tentative avec la même clé ne crée pas de doublon (optionnel)", "minLength": 1}
             },
             "required": ["customer_id", "date", "deadline", "invoice_lines", "draft"]
         }
     },
+    {
+        "name": "pennylane_bulk_create_customer_invoices",
+        "description": (
+            "Crée plusieurs factures clients en un appel (import de fin de mois). Chaque facture suit le schéma "
+            "de pennylane_create_customer_invoice et est validée localement avant tout envoi ; les envois sont "
+            "parallélisés dans la limite du quota API. Renvoie un rapport par facture. Chaque facture reçoit une "
+            "clé d'idempotence (idempotency_key de la facture, sinon dérivée du batch_id, de sa position et de son "
+            "contenu). Pour reprendre après un échec, renvoyer les factures listées dans `retry` du rapport, "
+            "chacune avec sa clé dans idempotency_key : les factures déjà créées ne sont pas recréées"
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "invoices": {
+                    "type": "array",
+                    "description": "Factures à créer (mêmes champs que pennylane_create_customer_invoice ; tout autre champ est refusé)",
+                    "items": {"type": "object"},
+                    "minItems": 1,
+                    "maxItems": BULK_MAX_ITEMS
+                },
+                "batch_id": {"type": "string", "description": "Identifiant du lot, à réutiliser pour reprendre un import interrompu (généré et renvoyé dans le rapport si absent)", "minLength": 1},
+                "concurrency": {"type": "integer", "description": "Créations simultanées", "default": BULK_CONCURRENCY, "minimum": 1, "maximum": BULK_MAX_CONCURRENCY},
+                "skip_invalid": {"type": "boolean", "description": "Envoyer les factures valides même si d'autres sont invalides (sinon rien n'est envoyé)", "default": False},
+                "stop_on_error": {"type": "boolean", "description": "Ne plus rien envoyer après la première erreur API", "default": False},
+                "validate_only": {"type": "boolean", "description": "Valider sans rien envoyer", "default": False}
+            },
+            "required": ["invoices"]
+        }
+    },
+    {
+        "name": "pennylane_finalize_customer_invoice",
+        "description": "Finalise une facture client (la rend non modifiable et génère le PDF)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "invoice_id": {"type": "integer", "description": "ID de la facture"}
+            },
+            "required": ["invoice_id"]
+        }
+    },
+    {
+        "name": "pennylane_send_customer_invoice_email",
+        "description": "Envoie une facture client par email",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "invoice_id": {"type": "integer", "description": "ID de la facture"},
+                "recipients": {
+                    "type": "array",
+                    "description": "Liste d'emails destinataires (vide = utilise les emails du client)",
+                    "items": {"type": "string"},
+                    "default": []
+                }
+            },
+            "required": ["invoice_id"]
+        }
+    },
+    {
+        "name": "pennylane_categorize_customer_invoice",
+        "description": "Catégorise une facture client avec des catégories comptables",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "invoice_id": {"type": "integer", "description": "ID de la facture"},
+                "categories": {
+                    "type": "array",
+                    "description": "Liste des catégories avec category_id et weight",
+                    "items": {"type": "object"}
+                }
+            },
+            "required": ["invoice_id", "categories"]
+        }
+    },
+    # FACTURES FOURNISSEURS
+    {
+        "name": "pennylane_list_supplier_invoices",
+        "description": "Liste les factures fournisseurs avec pagination et filtres",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": {"type": "integer", "description": "Nombre de résultats (1-100)", "default": 20},
+                "cursor": {"type": "string", "description": "Curseur de pagination"},
+                "filter": {"type": "string", "description": "Filtres"},
+                "sort": {"type": "string", "description": "Tri", "default": "-id"}
+            }
+        }
+    },
+    {
+        "name": "pennylane_get_supplier_invoice",
+        "description": "Récupère les détails d'une facture fournisseur",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "invoice_id": {"type": "integer", "description": "ID de la facture fournisseur"}
+            },
+            "required": ["invoice_id"]
+        }
+    },
+    {
+        "name": "pennylane_categorize_supplier_invoice",
+        "description": "Catégorise une facture fournisseur",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "invoice_id": {"type": "integer", "description": "ID de la facture"},
+                "categories": {
+                    "type": "array",
+                    "description": "Liste des catégories avec category_id et weight",
+                    "items": {"type": "object"}
+                }
+            },
+            "required": ["invoice_id", "categories"]
+        }
+    },
     # CLIENTS
     {
         "name": "pennylane_list_customers",
-        "description": "Liste tous les clients",
+        "description": "Liste tous les clients (entreprises et particuliers)",
         "inputSchema": {
             "type": "object",
             "properties": {
-                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 20}
+                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 20},
+                "cursor": {"type": "string", "description": "Curseur de pagination"},
+                "filter": {"type": "string", "description": "Filtres"},
+                "sort": {"type": "string", "description": "Tri", "default": "-id"}
             }
         }
     },
     {
         "name": "pennylane_get_customer",
-        "description": "Récupère un client par son ID",
+        "description": "Récupère les détails d'un client (générique)",
         "inputSchema": {
             "type": "object",
             "properties": {
@@ -134,6 +272,28 @@ ALL_TOOLS = [
             "required": ["customer_id"]
         }
     },
+    {
+        "name": "pennylane_get_company_customer",
+        "description": "Récupère les détails d'un client entreprise",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "customer_id": {"type": "integer", "description": "ID du client entreprise"}
+            },
+            "required": ["customer_id"]
+        }
+    },
+    {
+        "name": "pennylane_get_individual_customer",
+        "description": "Récupère les détails d'un client particulier",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "customer_id": {"type": "integer", "description": "ID du client particulier"}
+            },
+            "required": ["customer_id"]
+        }
+    },
     {
         "name": "pennylane_create_customer",
         "description": "Crée un nouveau client",
@@ -147,6 +307,133 @@ ALL_TOOLS = [
             "required": ["name", "customer_type"]
         }
     },
+    {
+        "name": "pennylane_create_company_customer",
+        "description": "Crée un nouveau client entreprise",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Nom de l'entreprise"},
+                "billing_address": {
+                    "type": "object",
+                    "description": "Adresse de facturation",
+                    "properties": {
+                        "address": {"type": "string"},
+                        "postal_code": {"type": "string"},
+                        "city": {"type": "string"},
+                        "country_alpha2": {"type": "string"}
+                    },
+                    "required": ["address", "postal_code", "city", "country_alpha2"]
+                },
+                "delivery_address": {
+                    "type": "object",
+                    "description": "Adresse de livraison",
+                    "properties": {
+                        "address": {"type": "string"},
+                        "postal_code": {"type": "string"},
+                        "city": {"type": "string"},
+                        "country_alpha2": {"type": "string"}
+                    }
+                },
+                "ledger_account": {
+                    "type": "object",
+                    "description": "Compte comptable",
+                    "properties": {
+                        "number": {"type": "string"}
+                    }
+                },
+                "emails": {
+                    "type": "array",
+                    "description": "Liste d'emails",
+                    "items": {"type": "string"}
+                },
+                "phone": {"type": "string", "description": "Téléphone"},
+                "vat_number": {"type": "string", "description": "Numéro de TVA"},
+                "reg_no": {"type": "string", "description": "Numéro SIREN/SIRET"},
+                "billing_iban": {"type": "string", "description": "IBAN de facturation"},
+                "recipient": {"type": "string", "description": "Destinataire"},
+                "reference": {"type": "string", "description": "Référence client"},
+                "notes": {"type": "string", "description": "Notes"},
+                "external_reference": {"type": "string", "description": "Référence externe"},
+                "payment_conditions": {
+                    "type": "string",
+                    "description": "Conditions de paiement",
+                    "enum": ["upon_receipt", "custom", "15_days", "30_days", "45_days", "60_days"],
+                    "default": "30_days"
+                },
+                "billing_language": {
+                    "type": "string",
+                    "description": "Langue de facturation",
+                    "enum": ["fr_FR", "en_GB", "de_DE"],
+                    "default": "fr_FR"
+                }
+            },
+            "required": ["name", "billing_address"]
+        }
+    },
+    {
+        "name": "pennylane_create_individual_customer",
+        "description": "Crée un nouveau client particulier",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "first_name": {"type": "string", "description": "Prénom"},
+                "last_name": {"type": "string", "description": "Nom de famille"},
+                "billing_address": {
+                    "type": "object",
+                    "description": "Adresse de facturation",
+                    "properties": {
+                        "address": {"type": "string"},
+                        "postal_code": {"type": "string"},
+                        "city": {"type": "string"},
+                        "country_alpha2": {"type": "string"}
+                    },
+                    "required": ["address", "postal_code", "city", "country_alpha2"]
+                },
+                "delivery_address": {
+                    "type": "object",
+                    "description": "Adresse de livraison",
+                    "properties": {
+                        "address": {"type": "string"},
+                        "postal_code": {"type": "string"},
+                        "city": {"type": "string"},
+                        "country_alpha2": {"type": "string"}
+                    }
+                },
+                "ledger_account": {
+                    "type": "object",
+                    "description": "Compte comptable",
+                    "properties": {
+                        "number": {"type": "string"}
+                    }
+                },
+                "emails": {
+                    "type": "array",
+                    "description": "Liste d'emails",
+                    "items": {"type": "string"}
+                },
+                "phone": {"type": "string", "description": "Téléphone"},
+                "billing_iban": {"type": "string", "description": "IBAN de facturation"},
+                "recipient": {"type": "string", "description": "Destinataire"},
+                "reference": {"type": "string", "description": "Référence client"},
+                "notes": {"type": "string", "description": "Notes"},
+                "external_reference": {"type": "string", "description": "Référence externe"},
+                "payment_conditions": {
+                    "type": "string",
+                    "description": "Conditions de paiement",
+                    "enum": ["upon_receipt", "custom", "15_days", "30_days", "45_days", "60_days"],
+                    "default": "30_days"
+                },
+                "billing_language": {
+                    "type": "string",
+                    "description": "Langue de facturation",
+                    "enum": ["fr_FR", "en_GB", "de_DE"],
+                    "default": "fr_FR"
+                }
+            },
+            "required": ["first_name", "last_name", "billing_address"]
+        }
+    },
     # DEVIS
     {
         "name": "pennylane_list_quotes",
@@ -154,13 +441,16 @@ ALL_TOOLS = [
         "inputSchema": {
             "type": "object",
             "properties": {
-                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 30}
+                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 30},
+                "cursor": {"type": "string", "description": "Curseur de pagination"},
+                "filter": {"type": "string", "description": "Filtres (ex: 'status:eq:pending', 'customer_id:eq:123')"},
+                "sort": {"type": "string", "description": "Tri", "default": "-id"}
             }
         }
     },
     {
         "name": "pennylane_get_quote",
-        "description": "Récupère un devis par son ID",
+        "description": "Récupère les détails d'un devis",
         "inputSchema": {
             "type": "object",
             "properties": {
@@ -169,6 +459,33 @@ ALL_TOOLS = [
             "required": ["quote_id"]
         }
     },
+    {
+        "name": "pennylane_list_quote_invoice_line_sections",
+        "description": "Liste les sections de lignes d'un devis",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "quote_id": {"type": "integer", "description": "ID du devis"},
+                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 100},
+                "cursor": {"type": "string", "description": "Curseur de pagination"},
+                "sort": {"type": "string", "description": "Tri", "default": "-id"}
+            },
+            "required": ["quote_id"]
+        }
+    },
+    {
+        "name": "pennylane_list_quote_appendices",
+        "description": "Liste les annexes (fichiers joints) d'un devis",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "quote_id": {"type": "integer", "description": "ID du devis"},
+                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 20},
+                "cursor": {"type": "string", "description": "Curseur de pagination"}
+            },
+            "required": ["quote_id"]
+        }
+    },
     {
         "name": "pennylane_create_quote",
         "description": "Crée un nouveau devis",
@@ -176,11 +493,66 @@ ALL_TOOLS = [
             "type": "object",
             "properties": {
                 "customer_id": {"type": "integer", "description": "ID du client"},
-                "date": {"type": "string", "description": "Date (YYYY-MM-DD)"},
+                "invoice_lines": {
+                    "type": "array",
+                    "description": "Lignes du devis",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "label": {"type": "string", "description": "Libellé de la ligne"},
+                            "quantity": {"type": "number", "description": "Quantité"},
+                            "raw_currency_unit_price": {"type": "string", "description": "Prix unitaire HT (jusqu'à 6 décimales)"},
+                            "vat_rate": {
+                                "type": "string",
+                                "description": "Taux de TVA au format Pennylane (ex: FR_200 pour 20% en France, FR_100 pour 10%, FR_55 pour 5.5%, FR_21 pour 2.1%)"
+                            },
+                            "unit": {"type": "string", "description": "Unité (ex: 'unité', 'jour', 'heure')"},
+                            "description": {"type": "string", "description": "Description de la ligne"},
+                            "section_rank": {"type": "integer", "description": "Rang de la section"},
+                            "ledger_account_id": {"type": "integer", "description": "ID du compte comptable"},
+                            "product_id": {"type": "integer", "description": "ID du produit"},
+                            "discount": {"type": "object", "description": "Remise sur la ligne"}
+                        },
+                        "required": ["label", "quantity", "raw_currency_unit_price", "vat_rate", "unit"]
+                    }
+                },
+                "date": {"type": "string", "description": "Date du devis (YYYY-MM-DD)"},
                 "deadline": {"type": "string", "description": "Date limite (YYYY-MM-DD)"},
-                "invoice_lines": {"type": "array", "description": "Lignes du devis"}
+                "currency": {"type": "string", "description": "Devise", "default": "EUR"},
+                "language": {
+                    "type": "string",
+                    "description": "Langue",
+                    "enum": ["fr_FR", "en_GB", "de_DE"],
+                    "default": "fr_FR"
+                },
+                "discount": {
+                    "type": "object",
+                    "description": "Remise globale",
+                    "properties": {
+                        "type": {"type": "string", "enum": ["absolute", "percentage"]},
+                        "value": {"type": "string"}
+                    }
+                },
+                "invoice_line_sections": {
+                    "type": "array",
+                    "description": "Sections de lignes",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "rank": {"type": "integer"},
+                            "title": {"type": "string"},
+                            "description": {"type": "string"}
+                        }
+                    }
+                },
+                "quote_template_id": {"type": "integer", "description": "ID du modèle de devis"},
+                "pdf_invoice_free_text": {"type": "string", "description": "Texte libre sur le PDF"},
+                "pdf_invoice_subject": {"type": "string", "description": "Sujet du PDF"},
+                "pdf_description": {"type": "string", "description": "Description du PDF"},
+                "special_mention": {"type": "string", "description": "Mention spéciale"},
+                "external_reference": {"type": "string", "description": "Référence externe"}
             },
-            "required": ["customer_id", "date", "deadline", "invoice_lines"]
+            "required": ["customer_id", "invoice_lines", "date", "deadline"]
         }
     },
     {
@@ -190,7 +562,27 @@ ALL_TOOLS = [
             "type": "object",
             "properties": {
                 "quote_id": {"type": "integer", "description": "ID du devis"},
-                "deadline": {"type": "string", "description": "Nouvelle date limite"}
+                "customer_id": {"type": "integer", "description": "ID du client"},
+                "invoice_lines": {
+                    "type": "object",
+                    "description": "Lignes du devis (avec create pour ajouter)",
+                    "properties": {
+                        "create": {
+                            "type": "array",
+                            "items": {"type": "object"}
+                        }
+                    }
+                },
+                "date": {"type": "string", "description": "Date du devis (YYYY-MM-DD)"},
+                "deadline": {"type": "string", "description": "Date limite (YYYY-MM-DD)"},
+                "language": {"type": "string", "description": "Langue", "enum": ["fr_FR", "en_GB", "de_DE"]},
+                "discount": {"type": "object", "description": "Remise globale"},
+                "quote_template_id": {"type": "integer", "description": "ID du modèle de devis"},
+                "pdf_invoice_free_text": {"type": "string", "description": "Texte libre sur le PDF"},
+                "pdf_invoice_subject": {"type": "string", "description": "Sujet du PDF"},
+                "pdf_description": {"type": "string", "description": "Description du PDF"},
+                "special_mention": {"type": "string", "description": "Mention spéciale"},
+                "external_reference": {"type": "string", "description": "Référence externe"}
             },
             "required": ["quote_id"]
         }
@@ -202,64 +594,204 @@ ALL_TOOLS = [
             "type": "object",
             "properties": {
                 "quote_id": {"type": "integer", "description": "ID du devis"},
-                "status": {"type": "string", "description": "Statut: pending, accepted, denied, invoiced, expired"}
+                "status": {
+                    "type": "string",
+                    "description": "Nouveau statut du devis",
+                    "enum": ["pending", "accepted", "denied", "invoiced", "expired"]
+                }
             },
             "required": ["quote_id", "status"]
         }
     },
+    # FOURNISSEURS
+    {
+        "name": "pennylane_list_suppliers",
+        "description": "Liste tous les fournisseurs",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": {"type": "integer", "description": "Nombre de résultats (1-100)", "default": 20},
+                "cursor": {"type": "string", "description": "Curseur de pagination"},
+                "filter": {"type": "string", "description": "Filtres (ex: 'name:start_with:Acme')"},
+                "sort": {"type": "string", "description": "Tri", "default": "-id"}
+            }
+        }
+    },
+    {
+        "name": "pennylane_get_supplier",
+        "description": "Récupère les détails d'un fournisseur par son ID",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "supplier_id": {"type": "integer", "description": "ID du fournisseur"}
+            },
+            "required": ["supplier_id"]
+        }
+    },
+    {
+        "name": "pennylane_create_supplier",
+        "description": "Crée un nouveau fournisseur",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Nom du fournisseur"},
+                "postal_address": {
+                    "type": "object",
+                    "description": "Adresse postale (address, postal_code, city, country_alpha2)"
+                },
+                "emails": {
+                    "type": "array",
+                    "description": "Liste d'emails",
+                    "items": {"type": "string"}
+                },
+                "iban": {"type": "string", "description": "IBAN du fournisseur"},
+                "vat_number": {"type": "string", "description": "Numéro de TVA"}
+            },
+            "required": ["name"]
+        }
+    },
     # TRANSACTIONS
     {
         "name": "pennylane_list_transactions",
-        "description": "Liste toutes les transactions bancaires",
+        "description": "Liste les transactions bancaires",
         "inputSchema": {
             "type": "object",
             "properties": {
-                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 20}
+                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 20},
+                "cursor": {"type": "string", "description": "Curseur de pagination"},
+                "filter": {"type": "string", "description": "Filtres (ex: 'bank_account_id:eq:123')"},
+                "sort": {"type": "string", "description": "Tri", "default": "-date"}
             }
         }
     },
+    {
+        "name": "pennylane_get_transaction",
+        "description": "Récupère les détails d'une transaction",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "transaction_id": {"type": "integer", "description": "ID de la transaction"}
+            },
+            "required": ["transaction_id"]
+        }
+    },
     {
         "name": "pennylane_create_transaction",
         "description": "Crée une nouvelle transaction bancaire",
         "inputSchema": {
             "type": "object",
             "properties": {
+                "date": {"type": "string", "description": "Date de la transaction (YYYY-MM-DD)"},
+                "amount": {"type": "string", "description": "Montant (positif pour crédit, négatif pour débit)"},
+                "label": {"type": "string", "description": "Libellé de la transaction"},
                 "bank_account_id": {"type": "integer", "description": "ID du compte bancaire"},
-                "label": {"type": "string", "description": "Libellé"},
-                "date": {"type": "string", "description": "Date (YYYY-MM-DD)"},
-                "amount": {"type": "string", "description": "Montant"},
-                "fee": {"type": "string", "description": "Frais", "default": "0"}
+                "fee": {"type": "string", "description": "Frais de transaction", "default": "0.00"}
             },
-            "required": ["bank_account_id", "label", "date", "amount", "fee"]
+            "required": ["date", "amount", "label", "bank_account_id"]
         }
     },
-    # COMPTABILITÉ
     {
-        "name": "pennylane_list_bank_accounts",
-        "description": "Liste tous les comptes bancaires",
-        "inputSchema": {"type": "object", "properties": {}}
+        "name": "pennylane_update_transaction",
+        "description": "Met à jour une transaction existante",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "transaction_id": {"type": "integer", "description": "ID de la transaction"},
+                "date": {"type": "string", "description": "Nouvelle date (YYYY-MM-DD)"},
+                "amount": {"type": "string", "description": "Nouveau montant"},
+                "label": {"type": "string", "description": "Nouveau libellé"}
+            },
+            "required": ["transaction_id"]
+        }
     },
-    # FOURNISSEURS
     {
-        "name": "pennylane_list_suppliers",
-        "description": "Liste tous les fournisseurs",
+        "name": "pennylane_categorize_transaction",
+        "description": "Catégorise une transaction bancaire",
         "inputSchema": {
             "type": "object",
             "properties": {
-                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 20}
-            }
+                "transaction_id": {"type": "integer", "description": "ID de la transaction"},
+                "categories": {
+                    "type": "array",
+                    "description": "Catégories avec category_id et weight",
+                    "items": {"type": "object"}
+                }
+            },
+            "required": ["transaction_id", "categories"]
         }
     },
     {
-        "name": "pennylane_create_supplier",
-        "description": "Crée un nouveau fournisseur",
+        "name": "pennylane_match_transaction_to_customer_invoice",
+        "description": "Associe une transaction à une facture client",
         "inputSchema": {
             "type": "object",
             "properties": {
-                "name": {"type": "string", "description": "Nom du fournisseur"},
-                "email": {"type": "string", "description": "Email"}
+                "invoice_id": {"type": "integer", "description": "ID de la facture client"},
+                "transaction_id": {"type": "integer", "description": "ID de la transaction"},
+                "amount": {"type": "string", "description": "Montant à associer (optionnel)"}
             },
-            "required": ["name"]
+            "required": ["invoice_id", "transaction_id"]
+        }
+    },
+    {
+        "name": "pennylane_unmatch_transaction_from_customer_invoice",
+        "description": "Dissocie une transaction d'une facture client",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "invoice_id": {"type": "integer", "description": "ID de la facture client"},
+                "transaction_id": {"type": "integer", "description": "ID de la transaction"}
+            },
+            "required": ["invoice_id", "transaction_id"]
+        }
+    },
+    {
+        "name": "pennylane_match_transaction_to_supplier_invoice",
+        "description": "Associe une transaction à une facture fournisseur",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "invoice_id": {"type": "integer", "description": "ID de la facture fournisseur"},
+                "transaction_id": {"type": "integer", "description": "ID de la transaction"},
+                "amount": {"type": "string", "description": "Montant à associer (optionnel)"}
+            },
+            "required": ["invoice_id", "transaction_id"]
+        }
+    },
+    {
+        "name": "pennylane_unmatch_transaction_from_supplier_invoice",
+        "description": "Dissocie une transaction d'une facture fournisseur",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "invoice_id": {"type": "integer", "description": "ID de la facture fournisseur"},
+                "transaction_id": {"type": "integer", "description": "ID de la transaction"}
+            },
+            "required": ["invoice_id", "transaction_id"]
+        }
+    },
+    # COMPTABILITÉ
+    {
+        "name": "pennylane_list_categories",
+        "description": "Liste les catégories comptables disponibles",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": {"type": "integer", "description": "Nombre de résultats (1-100)", "default": 100},
+                "cursor": {"type": "string", "description": "Curseur de pagination"},
+                "filter": {"type": "string", "description": "Filtres"}
+            }
+        }
+    },
+    {
+        "name": "pennylane_list_bank_accounts",
+        "description": "Liste les comptes bancaires de l'entreprise",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": {"type": "integer", "description": "Nombre de résultats (1-100)", "default": 100},
+                "cursor": {"type": "string", "description": "Curseur de pagination"}
+            }
         }
     },
     # JOURNAUX COMPTABLES
@@ -302,13 +834,13 @@ ALL_TOOLS = [
     # COMPTES GÉNÉRAUX (LEDGER ACCOUNTS)
     {
         "name": "pennylane_list_ledger_accounts",
-        "description": "Liste tous les comptes généraux",
+        "description": "Liste les comptes du plan comptable",
         "inputSchema": {
             "type": "object",
             "properties": {
-                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 20},
                 "page": {"type": "integer", "description": "Numéro de page", "default": 1},
-                "filter": {"type": "string", "description": "Filtres (id, number, enabled)"}
+                "per_page": {"type": "integer", "description": "Items par page (1-1000)", "default": 100},
+                "filter": {"type": "string", "description": "Filtres (ex: 'enabled:eq:true')"}
             }
         }
     },
@@ -493,9 +1025,9 @@ ALL_TOOLS = [
             "properties": {
                 "period_start": {"type": "string", "description": "Date de début (YYYY-MM-DD)"},
                 "period_end": {"type": "string", "description": "Date de fin (YYYY-MM-DD)"},
-                "is_auxiliary": {"type": "boolean", "description": "Balance auxiliaire", "default": False},
-                "limit": {"type": "integer", "description": "Nombre de résultats", "default": 20},
-                "page": {"type": "integer", "description": "Numéro de page", "default": 1}
+                "is_auxiliary": {"type": "boolean", "description": "Inclure les comptes auxiliaires", "default": False},
+                "page": {"type": "integer", "description": "Numéro de page", "default": 1},
+                "per_page": {"type": "integer", "description": "Items par page (1-1000)", "default": 100}
             },
             "required": ["period_start", "period_end"]
         }
@@ -510,5 +1042,163 @@ ALL_TOOLS = [
                 "page": {"type": "integer", "description": "Numéro de page", "default": 1}
             }
         }
+    },
+    # RAPPROCHEMENT
+    {
+        "name": "pennylane_reconcile_transactions",
+        "description": "Rapproche en masse les transactions non lettrées et les factures ouvertes : propositions classées (montant, date, libellé/contrepartie) ou application en lot",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "side": {"type": "string", "enum": ["customer", "supplier"], "description": "Factures clients (encaissements) ou fournisseurs (décaissements)", "default": "customer"},
+                "source": {"type": "string", "enum": ["api", "mirror"], "description": "Chargement via l'API ou depuis le miroir local", "default": "api"},
+                "date_from": {"type": "string", "description": "Date minimale des transactions (YYYY-MM-DD)"},
+                "date_to": {"type": "string", "description": "Date maximale des transactions (YYYY-MM-DD)"},
+                "amount_tolerance": {"type": "string", "description": "Écart de montant accepté", "default": "1.00"},
+                "date_window_days": {"type": "integer", "description": "Écart de dates accepté autour de la date et de l'échéance (jours)", "default": 60, "minimum": 0},
+                "min_score": {"type": "number", "description": "Score minimal d'une proposition (0-1)", "default": 0.5, "minimum": 0, "maximum": 1},
+                "alternatives": {"type": "integer", "description": "Alternatives renvoyées par proposition", "default": 2, "minimum": 0},
+                "max_proposals": {"type": "integer", "description": "Nombre maximal de propositions renvoyées", "default": 200, "minimum": 1},
+                "apply": {"type": "boolean", "description": "Associe dans Pennylane les propositions au-dessus de apply_min_score", "default": False},
+                "apply_min_score": {"type": "number", "description": "Score minimal pour l'application automatique", "default": 0.9, "minimum": 0, "maximum": 1}
+            }
+        }
+    },
+    {
+        "name": "pennylane_suggest_lettering",
+        "description": "Cherche les groupes de lignes non lettrées d'un compte qui s'équilibrent (correspondances exactes puis groupes N↔1) et les propose ou les lettre",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "ledger_account_id": {"type": "integer", "description": "ID du compte général"},
+                "max_group_size": {"type": "integer", "description": "Nombre maximal de lignes par groupe", "default": 4, "minimum": 2, "maximum": 6},
+                "date_window_days": {"type": "integer", "description": "Écart de dates maximal entre les lignes d'un groupe (jours)", "default": 90, "minimum": 0},
+                "max_candidates": {"type": "integer", "description": "Lignes examinées par recherche de groupe N↔1", "default": 32, "minimum": 2, "maximum": 256},
+                "max_groups": {"type": "integer", "description": "Nombre maximal de groupes renvoyés", "default": 500, "minimum": 1},
+                "apply": {"type": "boolean", "description": "Lettre les groupes trouvés dans Pennylane", "default": False}
+            },
+            "required": ["ledger_account_id"]
+        }
+    },
+    # MIROIR LOCAL
+    {
+        "name": "pennylane_sync",
+        "description": "Synchronise le miroir local SQLite (clients, fournisseurs, factures, transactions, écritures et lignes) ; incrémental via updated_at",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "resources": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": list(MIRRORED_RESOURCES)},
+                    "description": "Ressources à synchroniser (toutes par défaut)"
+                },
+                "full": {"type": "boolean", "description": "Resynchronisation complète (ignore les filigranes)", "default": False}
+            }
+        }
+    },
+    {
+        "name": "pennylane_sync_status",
+        "description": "État du miroir local : filigranes, dernières synchronisations, erreurs et nombre de lignes par ressource",
+        "inputSchema": {"type": "object", "properties": {}}
+    },
+    {
+        "name": "pennylane_mirror_search",
+        "description": "Recherche instantanée dans le miroir local (sans appel API) par période, libellé, statut ou identifiants liés",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "resource": {"type": "string", "enum": list(MIRRORED_RESOURCES), "description": "Ressource interrogée"},
+                "date_from": {"type": "string", "description": "Date minimale (YYYY-MM-DD)"},
+                "date_to": {"type": "string", "description": "Date maximale (YYYY-MM-DD)"},
+                "text": {"type": "string", "description": "Texte contenu dans le libellé ou le nom"},
+                "status": {"type": "string", "description": "Statut de la facture"},
+                "paid": {"type": "boolean", "description": "Facture payée"},
+                "customer_id": {"type": "integer", "description": "ID du client"},
+                "supplier_id": {"type": "integer", "description": "ID du fournisseur"},
+                "bank_account_id": {"type": "integer", "description": "ID du compte bancaire"},
+                "journal_id": {"type": "integer", "description": "ID du journal"},
+                "ledger_account_id": {"type": "integer", "description": "ID du compte général"},
+                "ledger_entry_id": {"type": "integer", "description": "ID de l'écriture"},
+                "limit": {"type": "integer", "description": "Nombre maximal de lignes", "default": 100},
+                "include_data": {"type": "boolean", "description": "Inclure l'objet API complet (JSON)", "default": False}
+            },
+            "required": ["resource"]
+        }
+    },
+    {
+        "name": "pennylane_query",
+        "description": (
+            "Exécute une requête SQL en lecture seule (SELECT) sur le miroir local SQLite, "
+            "pour agréger sans paginer l'API. Montants en REAL, dates en texte YYYY-MM-DD, "
+            "objet API complet dans `data` (json_extract). Tables : "
+            + describe_tables()
+            + "; sync_state(resource, watermark, last_finished_at, last_status)"
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "sql": {"type": "string", "description": "Requête SELECT (paramètres `?` conseillés)"},
+                "params": {"type": "array", "description": "Valeurs des paramètres `?` de la requête"},
+                "max_rows": {"type": "integer", "description": f"Nombre maximal de lignes (≤ {QUERY_MAX_ROWS})", "default": QUERY_MAX_ROWS, "minimum": 1},
+                "timeout": {"type": "number", "description": f"Délai maximal d'exécution en secondes (≤ {QUERY_TIMEOUT})", "default": QUERY_TIMEOUT}
+            },
+            "required": ["sql"]
+        }
+    },
+    {
+        "name": "pennylane_mirror_aged_balance",
+        "description": "Factures impayées en retard regroupées par client ou fournisseur, calculées sur le miroir local",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "side": {"type": "string", "enum": ["customer", "supplier"], "description": "Factures clients ou fournisseurs", "default": "customer"},
+                "min_days_overdue": {"type": "integer", "description": "Retard minimal après échéance (jours)", "default": 0},
+                "as_of": {"type": "string", "description": "Date de référence (YYYY-MM-DD), aujourd'hui par défaut"}
+            }
+        }
+    },
+    # FEC
+    {
+        "name": "pennylane_export_fec",
+        "description": (
+            "Génère le FEC d'un exercice, attend sa disponibilité, le télécharge sur disque et le charge "
+            "dans la table fec_lines du miroir local ; renvoie les totaux débit/crédit, l'équilibre et le "
+            "nombre de lignes par journal"
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "fiscal_year_id": {"type": "integer", "description": "ID de l'exercice"},
+                "load": {"type": "boolean", "description": "Charger les lignes dans le miroir local", "default": True},
+                "keep_file": {"type": "boolean", "description": "Conserver le fichier téléchargé dans le dossier du serveur", "default": False},
+                "timeout": {"type": "number", "description": "Attente maximale de la génération (secondes)", "default": FEC_POLL_TIMEOUT, "minimum": 1}
+            },
+            "required": ["fiscal_year_id"]
+        }
+    },
+    {
+        "name": "pennylane_list_fec_lines",
+        "description": "Lignes du FEC chargé dans le miroir local, par journal, compte (préfixe), période ou libellé, avec totaux",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "fiscal_year_id": {"type": "integer", "description": "ID de l'exercice"},
+                "journal_code": {"type": "string", "description": "Code journal (ex: VT, HA, BQ)"},
+                "compte_num": {"type": "string", "description": "Numéro de compte ou préfixe (ex: 411, 6)"},
+                "date_from": {"type": "string", "description": "Date d'écriture minimale (YYYY-MM-DD)"},
+                "date_to": {"type": "string", "description": "Date d'écriture maximale (YYYY-MM-DD)"},
+                "text": {"type": "string", "description": "Texte contenu dans le libellé de l'écriture"},
+                "limit": {"type": "integer", "description": "Nombre maximal de lignes", "default": 100, "minimum": 1},
+                "offset": {"type": "integer", "description": "Lignes à sauter", "default": 0, "minimum": 0}
+            },
+            "required": ["fiscal_year_id"]
+        }
     }
 ]
+
+# Listes complètes avec pagination automatique (outils *_all)
+ALL_TOOLS += PAGINATED_TOOLS
+
+# Projection (`fields`) et limitation de taille (`max_bytes`, `max_tokens`) sur tous les outils
+add_fields_property(ALL_TOOLS)
+add_shaping_properties(ALL_TOOLS)
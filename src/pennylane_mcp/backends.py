@@ -0,0 +1,338 @@
+"""État partagé entre plusieurs workers (cache de réponses et sessions SSE).
+
+Avec un seul worker, tout l'état reste en mémoire du processus. Avec
+plusieurs workers (`uvicorn --workers N`), un backend partagé est choisi par
+`PENNYLANE_STATE_BACKEND` :
+
+- `memory` (défaut) : rien n'est partagé ;
+- `sqlite:///chemin/vers/state.db` : fichier SQLite (workers d'une même machine) ;
+- `redis://hôte:6379/0` : serveur Redis ou compatible (nécessite le paquet redis).
+
+Le backend porte le cache des données de référence (entrées séparées par clé
+API) ainsi que le registre des sessions SSE et leur boîte de réception : un
+message posté sur un worker qui ne détient pas la session y est déposé, puis
+relevé et traité par le worker qui détient le flux SSE.
+"""
+import asyncio
+import importlib.util
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Mapping
+
+from .cache import CacheKey, key_string, resource_of
+from .serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+STATE_BACKEND_ENV = "PENNYLANE_STATE_BACKEND"
+
+# Sessions sans signe de vie de leur worker depuis ce délai (s) considérées fermées
+SESSION_TTL = 60.0
+# Entrées de cache SQLite au-delà desquelles les plus proches de l'expiration sont supprimées
+SQLITE_MAX_ENTRIES = 10_000
+SQLITE_PRUNE_EVERY = 256
+SQLITE_BUSY_TIMEOUT = 5.0
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    value BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_resource ON cache(namespace, resource);
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    worker TEXT NOT NULL,
+    heartbeat REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_inbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_session_inbox_session ON session_inbox(session_id);
+"""
+
+
+class SQLiteBackend:
+    """
+    État partagé dans un fichier SQLite (mode WAL).
+
+    Les requêtes sont courtes mais peuvent attendre le verrou d'écriture d'un
+    autre worker : elles sont exécutées hors de la boucle d'événements.
+    """
+
+    def __init__(self, path: str, max_entries: int = SQLITE_MAX_ENTRIES):
+        """
+        Args:
+            path: Fichier de la base, partagé par les workers
+            max_entries: Nombre maximal d'entrées de cache conservées
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.db = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None,
+                                  check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SQLITE_SCHEMA)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def __repr__(self) -> str:
+        return f"SQLiteBackend({self.path!r})"
+
+    async def _run(self, function, *args):
+        def locked():
+            with self._lock:
+                return function(*args)
+        return await asyncio.to_thread(locked)
+
+    # Cache
+
+    def _get(self, namespace: str, key: CacheKey) -> tuple[bool, Any]:
+        row = self.db.execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+            (f"{namespace}|{key_string(key)}", time.time()),
+        ).fetchone()
+        return (False, None) if row is None else (True, loads(row[0]))
+
+    def _set(self, namespace: str, key: CacheKey, value: Any, ttl: float):
+        self.db.execute(
+            "INSERT OR REPLACE INTO cache (key, namespace, resource, expires_at, value) VALUES (?, ?, ?, ?, ?)",
+            (f"{namespace}|{key_string(key)}", namespace, resource_of(key[0]), time.time() + ttl,
+             dumps(value, pretty=False)),
+        )
+        self._writes += 1
+        if self._writes % SQLITE_PRUNE_EVERY == 0:
+            self._prune()
+
+    def _prune(self):
+        self.db.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        excess = self.db.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires_at LIMIT ?)", (excess,)
+            )
+
+    def _invalidate(self, namespace: str, resource: str) -> int:
+        return self.db.execute(
+            "DELETE FROM cache WHERE namespace = ? AND resource = ?", (namespace, resource)
+        ).rowcount
+
+    def _clear(self, namespace: str):
+        self.db.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+
+    async def get(self, namespace: str, key: CacheKey) -> tuple[bool, Any]:
+        return await self._run(self._get, namespace, key)
+
+    async def set(self, namespace: str, key: CacheKey, value: Any, ttl: float):
+        await self._run(self._set, namespace, key, value, ttl)
+
+    async def invalidate(self, namespace: str, resource: str) -> int:
+        return await self._run(self._invalidate, namespace, resource)
+
+    async def clear(self, namespace: str):
+        await self._run(self._clear, namespace)
+
+    # Sessions
+
+    def _register(self, session_id: str, worker: str):
+        self.db.execute("INSERT OR REPLACE INTO sessions (id, worker, heartbeat) VALUES (?, ?, ?)",
+                        (session_id, worker, time.time()))
+
+    def _touch(self, session_ids: list[str]):
+        now = time.time()
+        self.db.executemany("UPDATE sessions SET heartbeat = ? WHERE id = ?",
+                            [(now, session_id) for session_id in session_ids])
+
+    def _unregister(self, session_id: str):
+        self.db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        self.db.execute("DELETE FROM session_inbox WHERE session_id = ?", (session_id,))
+
+    def _owner(self, session_id: str) -> str | None:
+        row = self.db.execute("SELECT worker FROM sessions WHERE id = ? AND heartbeat > ?",
+                              (session_id, time.time() - SESSION_TTL)).fetchone()
+        return None if row is None else row[0]
+
+    def _push(self, session_id: str, payload: bytes):
+        self.db.execute("INSERT INTO session_inbox (session_id, payload) VALUES (?, ?)", (session_id, payload))
+
+    def _pop(self, session_ids: list[str]) -> list[tuple[str, bytes]]:
+        placeholders = ",".join("?" * len(session_ids))
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.db.execute(
+                f"SELECT seq, session_id, payload FROM session_inbox WHERE session_id IN ({placeholders}) ORDER BY seq",
+                session_ids,
+            ).fetchall()
+            if rows:
+                self.db.executemany("DELETE FROM session_inbox WHERE seq = ?", [(row[0],) for row in rows])
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return [(session_id, payload) for _, session_id, payload in rows]
+
+    async def register_session(self, session_id: str, worker: str):
+        await self._run(self._register, session_id, worker)
+
+    async def touch_sessions(self, session_ids: list[str]):
+        await self._run(self._touch, session_ids)
+
+    async def unregister_session(self, session_id: str):
+        await self._run(self._unregister, session_id)
+
+    async def session_owner(self, session_id: str) -> str | None:
+        """Worker détenant une session encore active, sinon None."""
+        return await self._run(self._owner, session_id)
+
+    async def push_message(self, session_id: str, payload: bytes):
+        await self._run(self._push, session_id, payload)
+
+    async def pop_messages(self, session_ids: list[str]) -> list[tuple[str, bytes]]:
+        """Retire et renvoie les messages en attente des sessions données, dans l'ordre de dépôt."""
+        if not session_ids:
+            return []
+        return await self._run(self._pop, session_ids)
+
+    async def close(self):
+        await self._run(self.db.close)
+
+
+class RedisBackend:
+    """
+    État partagé dans Redis (ou un serveur compatible : Valkey, KeyDB, Dragonfly).
+
+    L'expiration des entrées de cache est confiée à Redis ; leur nombre est
+    borné par la politique d'éviction du serveur (`maxmemory-policy`).
+    """
+
+    def __init__(self, url: str, prefix: str = "pennylane-mcp"):
+        """
+        Args:
+            url: URL du serveur (redis://, rediss:// ou unix://)
+            prefix: Préfixe des clés écrites
+        """
+        if importlib.util.find_spec("redis") is None:
+            raise ValueError("Redis state backend requires the 'redis' package (pip install -e \".[redis]\")")
+        import redis.asyncio as redis
+
+        self.url = url
+        self.prefix = prefix
+        self.redis = redis.from_url(url)
+
+    def __repr__(self) -> str:
+        return f"RedisBackend({self.url!r})"
+
+    def _cache_key(self, namespace: str, key: CacheKey) -> str:
+        return f"{self.prefix}:cache:{namespace}:{key_string(key)}"
+
+    def _index_key(self, namespace: str, resource: str) -> str:
+        return f"{self.prefix}:index:{namespace}:{resource}"
+
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.prefix}:session:{session_id}"
+
+    def _inbox_key(self, session_id: str) -> str:
+        return f"{self.prefix}:inbox:{session_id}"
+
+    # Cache
+
+    async def get(self, namespace: str, key: CacheKey) -> tuple[bool, Any]:
+        value = await self.redis.get(self._cache_key(namespace, key))
+        return (False, None) if value is None else (True, loads(value))
+
+    async def set(self, namespace: str, key: CacheKey, value: Any, ttl: float):
+        cache_key = self._cache_key(namespace, key)
+        async with self.redis.pipeline() as pipe:
+            pipe.set(cache_key, dumps(value, pretty=False), px=max(1, int(ttl * 1000)))
+            pipe.sadd(self._index_key(namespace, resource_of(key[0])), cache_key)
+            await pipe.execute()
+
+    async def invalidate(self, namespace: str, resource: str) -> int:
+        index = self._index_key(namespace, resource)
+        keys = await self.redis.smembers(index)
+        await self.redis.delete(index, *keys)
+        return len(keys)
+
+    async def clear(self, namespace: str):
+        for pattern in (f"{self.prefix}:cache:{namespace}:*", f"{self.prefix}:index:{namespace}:*"):
+            keys = [key async for key in self.redis.scan_iter(match=pattern)]
+            if keys:
+                await self.redis.delete(*keys)
+
+    # Sessions
+
+    async def register_session(self, session_id: str, worker: str):
+        await self.redis.set(self._session_key(session_id), worker, ex=int(SESSION_TTL))
+
+    async def touch_sessions(self, session_ids: list[str]):
+        async with self.redis.pipeline() as pipe:
+            for session_id in session_ids:
+                pipe.expire(self._session_key(session_id), int(SESSION_TTL))
+            await pipe.execute()
+
+    async def unregister_session(self, session_id: str):
+        await self.redis.delete(self._session_key(session_id), self._inbox_key(session_id))
+
+    async def session_owner(self, session_id: str) -> str | None:
+        worker = await self.redis.get(self._session_key(session_id))
+        return None if worker is None else worker.decode()
+
+    async def push_message(self, session_id: str, payload: bytes):
+        await self.redis.rpush(self._inbox_key(session_id), payload)
+
+    async def pop_messages(self, session_ids: list[str]) -> list[tuple[str, bytes]]:
+        if not session_ids:
+            return []
+        # MULTI/EXEC : lecture et suppression atomiques de chaque boîte
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for session_id in session_ids:
+                pipe.lrange(self._inbox_key(session_id), 0, -1)
+                pipe.delete(self._inbox_key(session_id))
+            results = await pipe.execute()
+        return [(session_id, payload)
+                for session_id, payloads in zip(session_ids, results[::2])
+                for payload in payloads]
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+StateBackend = SQLiteBackend | RedisBackend
+
+_backends: dict[str, StateBackend] = {}
+
+
+def backend_from_url(url: str | None) -> StateBackend | None:
+    """Crée le backend désigné par une URL (None pour `memory`)."""
+    if not url or url == "memory":
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported {STATE_BACKEND_ENV}: {url} (memory, sqlite:///path or redis://host:port/db)")
+
+
+def shared_backend(environ: Mapping[str, str] | None = None) -> StateBackend | None:
+    """Backend du processus, créé au premier appel (partagé par tous les clients)."""
+    url = (os.environ if environ is None else environ).get(STATE_BACKEND_ENV, "memory")
+    if url not in _backends:
+        backend = backend_from_url(url)
+        if backend is None:
+            return None
+        logger.info(f"Using shared state backend {backend!r}")
+        _backends[url] = backend
+    return _backends[url]
+
+
+async def close_backends():
+    for backend in _backends.values():
+        await backend.close()
+    _backends.clear()
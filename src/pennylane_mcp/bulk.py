@@ -0,0 +1,185 @@
+"""Soumission d'objets par lots : validation locale, parallélisme borné et reprise.
+
+Chaque élément reçoit une clé d'idempotence stable envoyée avec la requête de
+création : sa clé `idempotency_key` si elle est fournie, sinon une clé dérivée
+du `batch_id`, de sa position et d'une empreinte de son contenu. Deux éléments
+identiques d'un même lot ont ainsi des clés distinctes, et un élément renvoyé
+à une autre position ne peut pas reprendre la clé d'un autre élément.
+
+Pour reprendre un lot, le rapport donne la clé de chaque élément à renvoyer
+(`retry`) : renvoyer ces éléments, avec leur clé dans `idempotency_key`, ne crée
+pas de doublon côté API quel que soit leur ordre. Renvoyer le lot entier tel
+quel avec le même `batch_id` fonctionne aussi. Sans `batch_id`, un identifiant
+est tiré au hasard et renvoyé dans le rapport. Les clés des créations réussies
+sont aussi retenues par le processus, par entreprise (`completed_keys`), ce qui
+évite de renvoyer ces éléments lors d'une reprise dans le même processus.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from .client import PennylaneAPIError
+from .validation import Validator
+
+logger = logging.getLogger(__name__)
+
+BULK_MAX_ITEMS = 1000
+BULK_CONCURRENCY = 4
+BULK_MAX_CONCURRENCY = 16
+# Créations réussies retenues pour la reprise (clé d'idempotence -> résumé)
+COMPLETED_CAPACITY = 10_000
+
+# (élément sans clé d'idempotence, clé) -> objet créé
+Submit = Callable[[dict[str, Any], str], Awaitable[dict[str, Any]]]
+
+
+class CompletedKeys:
+    """Clés d'idempotence des créations réussies, bornées en nombre (LRU)."""
+
+    def __init__(self, capacity: int = COMPLETED_CAPACITY):
+        self.capacity = capacity
+        self._items: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        summary = self._items.get(key)
+        if summary is not None:
+            self._items.move_to_end(key)
+        return summary
+
+    def add(self, key: str, summary: dict[str, Any]):
+        self._items[key] = summary
+        self._items.move_to_end(key)
+        if len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+
+_completed: dict[str, CompletedKeys] = {}
+
+
+def completed_keys(tenant: str) -> CompletedKeys:
+    """Créations réussies retenues pour une entreprise (PennylaneClient.tenant_id)."""
+    completed = _completed.get(tenant)
+    if completed is None:
+        completed = _completed[tenant] = CompletedKeys()
+    return completed
+
+
+def item_key(item: dict[str, Any], batch_id: str, index: int) -> str:
+    """Clé d'idempotence d'un élément du lot : clé fournie, sinon `batch_id-position-empreinte`."""
+    if item.get("idempotency_key"):
+        return str(item["idempotency_key"])
+    canonical = json.dumps(item, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return f"{batch_id}-{index}-{hashlib.sha256(canonical.encode()).hexdigest()[:16]}"
+
+
+def _summary(created: Any) -> dict[str, Any]:
+    if not isinstance(created, dict):
+        return {}
+    return {key: created[key] for key in ("id", "invoice_number") if created.get(key) is not None}
+
+
+def _api_error(error: Exception) -> dict[str, Any]:
+    if isinstance(error, PennylaneAPIError):
+        return {"error": error.body[:500], "status_code": error.status_code}
+    return {"error": str(error)}
+
+
+async def submit_bulk(
+    items: list[dict[str, Any]],
+    submit: Submit,
+    validator: Validator,
+    batch_id: str | None = None,
+    concurrency: int = BULK_CONCURRENCY,
+    skip_invalid: bool = False,
+    stop_on_error: bool = False,
+    validate_only: bool = False,
+    path: str = "items",
+    completed: CompletedKeys | None = None,
+) -> dict[str, Any]:
+    """
+    Valide puis soumet un lot d'éléments.
+
+    Tous les éléments sont validés avant le premier envoi. Sauf `skip_invalid`,
+    un seul élément invalide suffit à ne rien envoyer. Les envois se font au
+    plus `concurrency` à la fois (le limiteur du client borne en plus le débit).
+
+    Args:
+        items: Éléments à créer
+        submit: Coroutine de création d'un élément
+        validator: Validateur compilé du schéma d'un élément
+        batch_id: Identifiant du lot (préfixe des clés d'idempotence) ; tiré au hasard si absent
+        concurrency: Créations simultanées
+        skip_invalid: Envoie les éléments valides malgré les invalides
+        stop_on_error: N'envoie plus rien après la première erreur API
+        validate_only: Valide sans rien envoyer
+        path: Nom de l'argument du lot, pour les chemins des erreurs de validation
+        completed: Créations réussies de l'entreprise (reprise) ; aucune reprise locale si None
+
+    Returns:
+        {"total", "batch_id", "counts": {statut: n}, "items": [{"index", "status", "idempotency_key", ...}],
+         "retry": [{"index", "idempotency_key"}], "duration"}
+        Statuts : created, already_created, invalid, error, not_submitted, valid.
+    """
+    started = time.perf_counter()
+    # Renvoyé dans le rapport : c'est lui qu'il faut repasser pour reprendre le lot
+    batch_id = batch_id or f"bulk-{uuid.uuid4().hex}"
+    completed_store = CompletedKeys() if completed is None else completed
+    results: list[dict[str, Any]] = []
+    pending: list[tuple[dict[str, Any], dict[str, Any]]] = []
+    for index, item in enumerate(items):
+        key = item_key(item, batch_id, index)
+        result: dict[str, Any] = {"index": index, "idempotency_key": key}
+        results.append(result)
+        errors = validator(item, f"{path}[{index}]")
+        if errors:
+            result.update(status="invalid", errors=errors)
+            continue
+        done = completed_store.get(key)
+        if done is not None:
+            result.update(status="already_created", **done)
+            continue
+        result["status"] = "valid" if validate_only else "not_submitted"
+        pending.append((result, {name: value for name, value in item.items() if name != "idempotency_key"}))
+
+    invalid = any(result["status"] == "invalid" for result in results)
+    if not validate_only and pending and (skip_invalid or not invalid):
+        semaphore = asyncio.Semaphore(max(1, min(concurrency, BULK_MAX_CONCURRENCY)))
+        stopped = asyncio.Event()
+
+        async def submit_one(result: dict[str, Any], payload: dict[str, Any]):
+            async with semaphore:
+                if stopped.is_set():
+                    return
+                try:
+                    created = await submit(payload, result["idempotency_key"])
+                except Exception as e:
+                    result.update(status="error", **_api_error(e))
+                    if stop_on_error:
+                        stopped.set()
+                    return
+                summary = _summary(created)
+                completed_store.add(result["idempotency_key"], summary)
+                result.update(status="created", **summary)
+
+        await asyncio.gather(*(submit_one(result, payload) for result, payload in pending))
+
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    duration = time.perf_counter() - started
+    logger.info(f"Bulk submission of {len(items)} items in {duration:.2f}s: {counts}")
+    return {
+        "total": len(items),
+        "batch_id": batch_id,
+        "counts": counts,
+        "items": results,
+        # Éléments à renvoyer pour reprendre le lot, chacun avec sa clé dans `idempotency_key`
+        "retry": [{"index": result["index"], "idempotency_key": result["idempotency_key"]}
+                  for result in results if result["status"] in ("error", "not_submitted")],
+        "duration": round(duration, 3),
+    }
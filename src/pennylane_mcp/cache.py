@@ -0,0 +1,251 @@
+"""Cache de réponses pour les données de référence Pennylane.
+
+Le stockage est délégué à un `CacheStore` : `MemoryStore` (LRU propre au
+processus, par défaut) ou un backend partagé entre workers (voir backends.py).
+"""
+import hashlib
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Mapping, Optional, Protocol
+
+from .metrics import CACHE_HIT_RATIO, CACHE_HITS, CACHE_MISSES
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Durée de vie (s) par ressource ; les ressources absentes ne sont pas mises en cache
+DEFAULT_TTLS: dict[str, float] = {
+    "bank_accounts": 300.0,
+    "categories": 300.0,
+    "journals": 600.0,
+    "fiscal_years": 3600.0,
+    "ledger_accounts": 300.0,
+}
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+def resource_of(endpoint: str) -> str:
+    """Ressource racine d'un endpoint (ex: "ledger_accounts/12" -> "ledger_accounts")."""
+    return endpoint.strip("/").split("/", 1)[0]
+
+
+def _normalise(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def make_key(endpoint: str, params: Optional[Mapping[str, Any]] = None) -> CacheKey:
+    """Clé de cache indépendante de l'ordre des paramètres et des valeurs None."""
+    items = tuple(sorted(
+        (name, _normalise(value)) for name, value in (params or {}).items() if value is not None
+    ))
+    return endpoint.strip("/"), items
+
+
+def key_string(key: CacheKey) -> str:
+    """Forme texte d'une clé, pour les stockages partagés."""
+    endpoint, items = key
+    return endpoint + "?" + "&".join(f"{name}={value}" for name, value in items)
+
+
+def key_namespace(api_key: str) -> str:
+    """Espace de noms des entrées d'une clé API dans un stockage partagé."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+
+def parse_ttls(value: str) -> dict[str, float]:
+    """Parse une surcharge de TTL au format "ressource=secondes,ressource=secondes"."""
+    ttls = {}
+    for item in value.split(","):
+        if "=" in item:
+            resource, seconds = item.split("=", 1)
+            ttls[resource.strip()] = float(seconds)
+    return ttls
+
+
+class CacheStore(Protocol):
+    """Stockage des entrées d'un ResponseCache."""
+
+    async def get(self, namespace: str, key: CacheKey) -> tuple[bool, Any]: ...
+
+    async def set(self, namespace: str, key: CacheKey, value: Any, ttl: float): ...
+
+    async def invalidate(self, namespace: str, resource: str) -> int: ...
+
+    async def clear(self, namespace: str): ...
+
+
+class MemoryStore:
+    """Entrées en mémoire du processus, éviction LRU."""
+
+    def __init__(self, max_entries: int = 512):
+        """
+        Args:
+            max_entries: Nombre maximal d'entrées avant éviction LRU
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Le store appartient à un seul cache : l'espace de noms est ignoré
+    async def get(self, namespace: str, key: CacheKey) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    async def set(self, namespace: str, key: CacheKey, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, namespace: str, resource: str) -> int:
+        stale = [key for key in self._entries if resource_of(key[0]) == resource]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    async def clear(self, namespace: str):
+        self._entries.clear()
+
+
+class ResponseCache:
+    """
+    Cache read-through à durée de vie par ressource.
+
+    Les échecs concurrents sur une même clé sont regroupés en un seul
+    chargement (SingleFlight propre au cache, indépendant de
+    PENNYLANE_COALESCE_GETS). Les valeurs renvoyées sont partagées entre
+    appelants et ne doivent pas être modifiées.
+    """
+
+    def __init__(self, ttls: Optional[Mapping[str, float]] = None, max_entries: int = 512,
+                 store: Optional[CacheStore] = None, namespace: str = ""):
+        """
+        Args:
+            ttls: Durée de vie en secondes par ressource (défaut DEFAULT_TTLS)
+            max_entries: Nombre maximal d'entrées avant éviction LRU (store en mémoire)
+            store: Stockage des entrées (défaut MemoryStore propre à ce cache)
+            namespace: Sépare les entrées de plusieurs clés API dans un store partagé
+        """
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.store = MemoryStore(max_entries) if store is None else store
+        self.namespace = namespace
+        self._generations: dict[str, int] = {}
+        # Chargements en cours, par clé d'entrée
+        self._loading = SingleFlight()
+
+    def __len__(self) -> int:
+        return len(self.store) if isinstance(self.store, MemoryStore) else 0
+
+    def ttl_for(self, endpoint: str) -> Optional[float]:
+        """Durée de vie applicable à un endpoint, ou None s'il n'est pas mis en cache."""
+        ttl = self.ttls.get(resource_of(endpoint))
+        return ttl if ttl and ttl > 0 else None
+
+    async def get_or_load(
+        self,
+        endpoint: str,
+        params: Optional[Mapping[str, Any]],
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Renvoie la valeur en cache ou la charge via `loader`."""
+        ttl = self.ttl_for(endpoint)
+        if ttl is None:
+            return await loader()
+
+        key = make_key(endpoint, params)
+        resource = resource_of(endpoint)
+        found, value = await self.store.get(self.namespace, key)
+        (CACHE_HITS if found else CACHE_MISSES).inc(resource=resource)
+        hits = CACHE_HITS.value(resource=resource)
+        CACHE_HIT_RATIO.set(hits / (hits + CACHE_MISSES.value(resource=resource)), resource=resource)
+        if found:
+            return value
+        return await self._loading.do(key, lambda: self._load(key, resource, ttl, loader), resource)
+
+    async def _load(self, key: CacheKey, resource: str, ttl: float, loader: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generations.get(resource, 0)
+        value = await loader()
+        # Une écriture pendant le chargement rend la réponse potentiellement obsolète
+        # (seules les écritures de ce processus sont détectées)
+        if self._generations.get(resource, 0) == generation:
+            await self.store.set(self.namespace, key, value, ttl)
+        return value
+
+    async def invalidate(self, endpoint: str):
+        """Supprime les entrées de la ressource ciblée par une écriture."""
+        resource = resource_of(endpoint)
+        self._generations[resource] = self._generations.get(resource, 0) + 1
+        stale = await self.store.invalidate(self.namespace, resource)
+        if stale:
+            logger.debug(f"Invalidated {stale} cached entries for {resource}")
+
+    async def clear(self):
+        """Vide entièrement le cache."""
+        await self.store.clear(self.namespace)
+
+
+class ValidatorStore:
+    """
+    Validateurs HTTP (ETag, Last-Modified) et corps associés pour les GET conditionnels.
+
+    Borné en taille avec éviction LRU. Le corps mémorisé est lu en même temps
+    que les en-têtes conditionnels : sur une réponse 304, il est resservi sans
+    nouveau téléchargement ni décodage JSON, même si l'entrée a été évincée
+    pendant la requête.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Args:
+            max_entries: Nombre maximal de réponses mémorisées
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, tuple[Optional[str], Optional[str], Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def conditional_headers(self, key: CacheKey) -> tuple[dict[str, str], Any]:
+        """
+        En-têtes If-None-Match / If-Modified-Since à envoyer pour cette clé.
+
+        Returns:
+            (en-têtes, corps mémorisé à resservir sur un 304) ; ({}, None) sans entrée
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return {}, None
+        self._entries.move_to_end(key)
+        etag, last_modified, body = entry
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers, body
+
+    def store(self, key: CacheKey, headers: Mapping[str, str], body: Any):
+        """Mémorise le corps si la réponse porte des validateurs."""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (etag, last_modified, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
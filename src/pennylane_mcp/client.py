@@ -1,82 +1,382 @@
 """Client HTTP pour l'API Pennylane."""
+import os
+import time
+import asyncio
+import importlib.util
 import httpx
-from typing import Any, Optional
+from typing import Any, Mapping, Optional
 import logging
 
+from .backends import shared_backend
+from .cache import ResponseCache, ValidatorStore, key_namespace, make_key, parse_ttls, resource_of
+from .metrics import (CONDITIONAL_HITS, CONDITIONAL_MISSES, RETRIES, RETRIES_EXHAUSTED, UPSTREAM_BYTES,
+                      UPSTREAM_IN_FLIGHT, UPSTREAM_SECONDS)
+from .ratelimit import RateLimiter, parse_retry_after
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 
+class PennylaneAPIError(Exception):
+    """Erreur HTTP renvoyée par l'API Pennylane."""
+
+    def __init__(self, status_code: int, body: str):
+        self.status_code = status_code
+        self.body = body
+        super().__init__(f"API error: {status_code} - {body}")
+
+
+class RateLimitError(PennylaneAPIError):
+    """Quota de requêtes toujours dépassé après les nouvelles tentatives."""
+
+
+def _env_int(environ: Mapping[str, str], name: str, default: int) -> int:
+    value = environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(environ: Mapping[str, str], name: str, default: float) -> float:
+    value = environ.get(name)
+    return float(value) if value else default
+
+
+def _env_bool(environ: Mapping[str, str], name: str, default: bool) -> bool:
+    value = environ.get(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def client_options_from_env(environ: Mapping[str, str] | None = None) -> dict[str, Any]:
+    """
+    Lit la configuration du pool de connexions depuis les variables d'environnement.
+
+    Variables reconnues:
+        PENNYLANE_HTTP_MAX_CONNECTIONS: Connexions simultanées max (défaut 100)
+        PENNYLANE_HTTP_MAX_KEEPALIVE: Connexions keep-alive conservées (défaut 20)
+        PENNYLANE_HTTP_KEEPALIVE_EXPIRY: Durée de vie d'une connexion inactive en s (défaut 30)
+        PENNYLANE_HTTP_CONNECT_TIMEOUT: Timeout de connexion en s (défaut 10)
+        PENNYLANE_HTTP_READ_TIMEOUT: Timeout de lecture en s (défaut 30)
+        PENNYLANE_HTTP_WRITE_TIMEOUT: Timeout d'écriture en s (défaut 30)
+        PENNYLANE_HTTP_POOL_TIMEOUT: Attente max d'une connexion libre en s (défaut 10)
+        PENNYLANE_HTTP2: Active HTTP/2 si "true" (nécessite le paquet h2)
+        PENNYLANE_RATE_LIMIT: Requêtes autorisées par période, 0 pour désactiver (défaut 25)
+        PENNYLANE_WORKERS: Nombre de workers se partageant le quota (défaut 1)
+        PENNYLANE_RATE_PERIOD: Durée de la période de quota en s (défaut 5)
+        PENNYLANE_RATE_LIMIT_MAX_RETRIES: Nouvelles tentatives après un 429 (défaut 3)
+        PENNYLANE_RETRY_MAX_ATTEMPTS: Tentatives max sur erreur transitoire (défaut 3)
+        PENNYLANE_RETRY_BASE_DELAY: Délai de base du backoff en s (défaut 0.5)
+        PENNYLANE_RETRY_MAX_DELAY: Plafond d'un délai de backoff en s (défaut 8)
+        PENNYLANE_RETRY_DEADLINE: Durée totale max d'une requête en s (défaut 30)
+        PENNYLANE_CACHE_ENABLED: Active le cache des données de référence (défaut true)
+        PENNYLANE_CACHE_MAX_ENTRIES: Taille max du cache (défaut 512)
+        PENNYLANE_CACHE_TTLS: Surcharge des TTL, ex: "journals=60,categories=0"
+        PENNYLANE_STATE_BACKEND: Stockage du cache, memory, sqlite:///chemin ou redis://... (défaut memory)
+        PENNYLANE_COALESCE_GETS: Regroupe les GET identiques en cours (défaut true)
+        PENNYLANE_CONDITIONAL_GETS: Taille du stock de réponses pour les GET conditionnels, 0 pour désactiver (défaut 256)
+    """
+    env = os.environ if environ is None else environ
+    return {
+        "max_connections": _env_int(env, "PENNYLANE_HTTP_MAX_CONNECTIONS", 100),
+        "max_keepalive_connections": _env_int(env, "PENNYLANE_HTTP_MAX_KEEPALIVE", 20),
+        "keepalive_expiry": _env_float(env, "PENNYLANE_HTTP_KEEPALIVE_EXPIRY", 30.0),
+        "connect_timeout": _env_float(env, "PENNYLANE_HTTP_CONNECT_TIMEOUT", 10.0),
+        "read_timeout": _env_float(env, "PENNYLANE_HTTP_READ_TIMEOUT", 30.0),
+        "write_timeout": _env_float(env, "PENNYLANE_HTTP_WRITE_TIMEOUT", 30.0),
+        "pool_timeout": _env_float(env, "PENNYLANE_HTTP_POOL_TIMEOUT", 10.0),
+        "http2": _env_bool(env, "PENNYLANE_HTTP2", False),
+        "rate_limit": _worker_share(_env_int(env, "PENNYLANE_RATE_LIMIT", 25), _env_int(env, "PENNYLANE_WORKERS", 1)),
+        "rate_period": _env_float(env, "PENNYLANE_RATE_PERIOD", 5.0),
+        "max_rate_limit_retries": _env_int(env, "PENNYLANE_RATE_LIMIT_MAX_RETRIES", 3),
+        "retry_policy": RetryPolicy(
+            max_attempts=_env_int(env, "PENNYLANE_RETRY_MAX_ATTEMPTS", 3),
+            base_delay=_env_float(env, "PENNYLANE_RETRY_BASE_DELAY", 0.5),
+            max_delay=_env_float(env, "PENNYLANE_RETRY_MAX_DELAY", 8.0),
+            deadline=_env_float(env, "PENNYLANE_RETRY_DEADLINE", 30.0),
+        ),
+        "cache": _cache_from_env(env),
+        "coalesce_gets": _env_bool(env, "PENNYLANE_COALESCE_GETS", True),
+        "conditional_gets": _env_int(env, "PENNYLANE_CONDITIONAL_GETS", 256),
+    }
+
+
+def _worker_share(rate_limit: int, workers: int) -> int:
+    """Part du quota d'un worker : chaque processus a son propre limiteur."""
+    if rate_limit <= 0 or workers <= 1:
+        return rate_limit
+    return max(1, rate_limit // workers)
+
+
+def _cache_from_env(env: Mapping[str, str]) -> Optional[ResponseCache]:
+    if not _env_bool(env, "PENNYLANE_CACHE_ENABLED", True):
+        return None
+    cache = ResponseCache(
+        max_entries=_env_int(env, "PENNYLANE_CACHE_MAX_ENTRIES", 512),
+        store=shared_backend(env),
+    )
+    cache.ttls.update(parse_ttls(env.get("PENNYLANE_CACHE_TTLS", "")))
+    return cache
+
+
 class PennylaneClient:
     """Client pour interagir avec l'API Pennylane."""
-    
-    def __init__(self, api_key: str, base_url: str = "https://app.pennylane.com/api/external/v2"):
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://app.pennylane.com/api/external/v2",
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 30.0,
+        write_timeout: float = 30.0,
+        pool_timeout: float = 10.0,
+        http2: bool = False,
+        rate_limit: int = 25,
+        rate_period: float = 5.0,
+        max_rate_limit_retries: int = 3,
+        retry_policy: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        coalesce_gets: bool = True,
+        conditional_gets: int = 256,
+    ):
         self.api_key = api_key
+        # Identifiant de l'entreprise : sépare caches, miroirs et reprises de lots entre clés API
+        self.tenant_id = key_namespace(api_key)
         self.base_url = base_url.rstrip("/")
+        self.rate_limiter = RateLimiter(rate_limit, rate_period) if rate_limit > 0 else None
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        if cache is not None and not cache.namespace:
+            # Entrées d'un store partagé séparées par clé API
+            cache.namespace = self.tenant_id
+        self.inflight = SingleFlight() if coalesce_gets else None
+        self.validators = ValidatorStore(conditional_gets) if conditional_gets > 0 else None
+
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is missing, falling back to HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+
         self.client = httpx.AsyncClient(
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Accept": "application/json",
                 "Content-Type": "application/json",
             },
-            timeout=30.0,
+            timeout=httpx.Timeout(
+                connect=connect_timeout,
+                read=read_timeout,
+                write=write_timeout,
+                pool=pool_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
         )
-    
-    async def get(self, endpoint: str, params: Optional[dict[str, Any]] = None) -> dict[str, Any]:
-        """Effectue une requête GET."""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        params: Optional[dict[str, Any]],
+        data: Optional[dict[str, Any]],
+        headers: Optional[dict[str, str]],
+        endpoint: str = "",
+    ) -> httpx.Response:
+        """Envoie une seule tentative après avoir obtenu un jeton du limiteur."""
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+        # Ressource racine en étiquette : les identifiants des chemins ne créent pas de séries
+        resource = resource_of(endpoint)
+        status = "error"
+        started = time.perf_counter()
         try:
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            raise Exception(f"API error: {e.response.status_code} - {e.response.text}")
-        except Exception as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise
-    
-    async def post(self, endpoint: str, data: Optional[dict[str, Any]] = None) -> dict[str, Any]:
-        """Effectue une requête POST."""
+            with UPSTREAM_IN_FLIGHT.track():
+                response = await self.client.request(method, url, params=params, json=data, headers=headers)
+            status = str(response.status_code)
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, method=method, endpoint=resource, status=status)
+        UPSTREAM_BYTES.inc(len(response.request.content), endpoint=resource, direction="out")
+        UPSTREAM_BYTES.inc(len(response.content), endpoint=resource, direction="in")
+        if self.rate_limiter:
+            self.rate_limiter.update_from_headers(response.headers)
+        return response
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[dict[str, Any]] = None,
+        data: Optional[dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Envoie une requête en respectant le quota et la politique de retry, et renvoie le JSON décodé."""
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else {}
+        validator_key = make_key(endpoint, params) if method == "GET" and self.validators is not None else None
+        stored_body = None
+        if validator_key is not None:
+            # Corps capturé dès maintenant : l'entrée peut être évincée avant la réponse 304
+            conditional_headers, stored_body = self.validators.conditional_headers(validator_key)
+            headers.update(conditional_headers)
+        conditional = "If-None-Match" in headers or "If-Modified-Since" in headers
+        retryable = self.retry_policy.allows(method, idempotency_key)
+        started = time.monotonic()
+        attempt = 0
+        rate_limit_retries = 0
         try:
-            response = await self.client.post(url, json=data)
+            while True:
+                try:
+                    response = await self._send(method, url, params, data, headers, endpoint)
+                except httpx.TransportError as e:
+                    reason = type(e).__name__
+                    delay = self.retry_policy.next_delay(attempt, time.monotonic() - started) if retryable else None
+                    if delay is None:
+                        if retryable:
+                            RETRIES_EXHAUSTED.inc(method=method, reason=reason)
+                        raise
+                    RETRIES.inc(method=method, reason=reason)
+                    logger.warning(f"{method} {endpoint} failed ({reason}), retry {attempt + 1} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+
+                status = response.status_code
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if status == 429 and rate_limit_retries < self.max_rate_limit_retries:
+                    # La requête n'a pas été traitée : on peut la rejouer quelle que soit la méthode
+                    delay = retry_after if retry_after is not None else (
+                        self.rate_limiter.period if self.rate_limiter else 1.0
+                    )
+                    RETRIES.inc(method=method, reason="429")
+                    logger.warning(f"Rate limited on {method} {endpoint}, retrying in {delay:.1f}s")
+                    if self.rate_limiter:
+                        self.rate_limiter.block_for(delay)
+                    else:
+                        await asyncio.sleep(delay)
+                    rate_limit_retries += 1
+                    continue
+
+                if status in self.retry_policy.retry_statuses and retryable:
+                    delay = self.retry_policy.next_delay(attempt, time.monotonic() - started, retry_after)
+                    if delay is not None:
+                        RETRIES.inc(method=method, reason=str(status))
+                        logger.warning(f"{method} {endpoint} returned {status}, retry {attempt + 1} in {delay:.2f}s")
+                        await asyncio.sleep(delay)
+                        attempt += 1
+                        continue
+                    RETRIES_EXHAUSTED.inc(method=method, reason=str(status))
+                break
+
+            if conditional:
+                if response.status_code == 304:
+                    CONDITIONAL_HITS.inc(resource=resource_of(endpoint))
+                    logger.debug(f"GET {endpoint} not modified, serving stored body")
+                    return stored_body
+                CONDITIONAL_MISSES.inc(resource=resource_of(endpoint))
             response.raise_for_status()
-            return response.json()
+            body = response.json()
+            if validator_key is not None:
+                self.validators.store(validator_key, response.headers, body)
+            return body
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            raise Exception(f"API error: {e.response.status_code} - {e.response.text}")
+            error_class = RateLimitError if e.response.status_code == 429 else PennylaneAPIError
+            raise error_class(e.response.status_code, e.response.text)
         except Exception as e:
             logger.error(f"Request failed: {str(e)}")
             raise
-    
+        finally:
+            if self.cache is not None and method != "GET":
+                await self.cache.invalidate(endpoint)
+
+    async def get(self, endpoint: str, params: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+        """
+        Effectue une requête GET.
+
+        Les données de référence sont servies par le cache et les GET identiques
+        concurrents partagent une seule requête amont.
+        """
+        async def load() -> dict[str, Any]:
+            if self.inflight is None:
+                return await self._request("GET", endpoint, params=params)
+            return await self.inflight.do(
+                make_key(endpoint, params),
+                lambda: self._request("GET", endpoint, params=params),
+                label=resource_of(endpoint),
+            )
+
+        if self.cache is not None:
+            return await self.cache.get_or_load(endpoint, params, load)
+        return await load()
+
+    async def post(
+        self,
+        endpoint: str,
+        data: Optional[dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """
+        Effectue une requête POST.
+
+        Le POST n'est rejoué en cas d'erreur transitoire que si `idempotency_key`
+        est fourni (envoyé dans l'en-tête Idempotency-Key).
+        """
+        return await self._request("POST", endpoint, data=data, idempotency_key=idempotency_key)
+
     async def put(self, endpoint: str, data: Optional[dict[str, Any]] = None) -> dict[str, Any]:
         """Effectue une requête PUT."""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        try:
-            response = await self.client.put(url, json=data)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            raise Exception(f"API error: {e.response.status_code} - {e.response.text}")
-        except Exception as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise
-    
-    async def delete(self, endpoint: str) -> dict[str, Any]:
+        return await self._request("PUT", endpoint, data=data)
+
+    async def delete(self, endpoint: str, data: Optional[dict[str, Any]] = None) -> dict[str, Any]:
         """Effectue une requête DELETE."""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        return await self._request("DELETE", endpoint, data=data)
+
+    async def download(self, url: str, destination: str, chunk_size: int = 1 << 16) -> int:
+        """
+        Télécharge un fichier en flux vers `destination`, sans le charger en mémoire.
+
+        Le fichier est écrit dans `destination.part` puis renommé une fois complet.
+        Les URL extérieures à l'API (liens de stockage signés) sont demandées
+        sans l'en-tête d'authentification.
+
+        Returns:
+            Nombre d'octets écrits
+        """
+        if not url.startswith(("http://", "https://")):
+            url = f"{self.base_url}/{url.lstrip('/')}"
+        request = self.client.build_request("GET", url)
+        if httpx.URL(url).host != httpx.URL(self.base_url).host:
+            del request.headers["Authorization"]
+        elif self.rate_limiter:
+            await self.rate_limiter.acquire()
+        del request.headers["Accept"]
+
+        partial = f"{destination}.part"
+        written = 0
+        response = await self.client.send(request, stream=True, follow_redirects=True)
         try:
-            response = await self.client.delete(url)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            raise Exception(f"API error: {e.response.status_code} - {e.response.text}")
-        except Exception as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise
-    
+            if response.status_code >= 400:
+                body = (await response.aread()).decode("utf-8", errors="replace")
+                raise PennylaneAPIError(response.status_code, body[:1000])
+            with open(partial, "wb") as file:
+                async for chunk in response.aiter_bytes(chunk_size):
+                    file.write(chunk)
+                    written += len(chunk)
+        finally:
+            await response.aclose()
+        os.replace(partial, destination)
+        UPSTREAM_BYTES.inc(written, endpoint="downloads", direction="in")
+        logger.info(f"Downloaded {written} bytes to {destination}")
+        return written
+
     async def close(self):
         """Ferme le client HTTP."""
-        await self.client.aclose()
\ No newline at end of file
+        await self.client.aclose()
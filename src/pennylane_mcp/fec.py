@@ -0,0 +1,346 @@
+"""Export FEC (Fichier des Écritures Comptables) : génération, téléchargement et analyse.
+
+Le pipeline complet :
+1. lance l'export côté Pennylane puis interroge son statut avec un délai
+   croissant (backoff exponentiel plafonné) jusqu'à ce que le fichier soit prêt ;
+2. télécharge le fichier en flux directement sur disque ;
+3. lit le fichier ligne à ligne et produit des enregistrements typés
+   (`FECRecord` : dates, montants `Decimal`) ;
+4. charge les lignes par lots, en une seule transaction, dans la table
+   `fec_lines` du miroir SQLite, indexée par journal et par compte.
+
+Aucune étape ne garde le fichier en mémoire : seuls un lot de lignes et les
+totaux par journal sont conservés, quelle que soit la taille de l'export.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+from functools import lru_cache
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any, Iterator
+
+from .client import PennylaneClient
+
+logger = logging.getLogger(__name__)
+
+# Colonnes réglementaires du FEC (article A47 A-1 du LPF), dans l'ordre du fichier
+FEC_COLUMNS = (
+    "JournalCode", "JournalLib", "EcritureNum", "EcritureDate", "CompteNum", "CompteLib",
+    "CompAuxNum", "CompAuxLib", "PieceRef", "PieceDate", "EcritureLib", "Debit", "Credit",
+    "EcritureLet", "DateLet", "ValidDate", "Montantdevise", "Idevise",
+)
+
+# Interrogation du statut de l'export
+POLL_INITIAL_DELAY = 1.0
+POLL_BACKOFF = 1.5
+POLL_MAX_DELAY = 15.0
+POLL_TIMEOUT = 600.0
+_PENDING_STATUSES = frozenset({"pending", "processing", "in_progress", "queued", "running", "created"})
+_FAILED_STATUSES = frozenset({"error", "failed", "canceled", "cancelled"})
+
+# Lignes insérées par appel à executemany lors du chargement
+LOAD_BATCH_SIZE = 5000
+
+# Dossier des fichiers téléchargés (défaut : dossier temporaire privé du processus)
+FEC_DIR_ENV = "PENNYLANE_FEC_DIR"
+_private_directory: str | None = None
+
+# Octets lus pour déterminer l'encodage du fichier
+_ENCODING_SAMPLE = 1 << 16
+
+
+class FECExportError(Exception):
+    """Échec de la génération de l'export côté Pennylane."""
+
+
+# Un exercice ne compte que quelques centaines de dates distinctes
+@lru_cache(maxsize=4096)
+def _parse_date(value: str) -> date | None:
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        if len(value) == 8 and value.isdigit():
+            return date(int(value[:4]), int(value[4:6]), int(value[6:]))
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+
+def _parse_amount(value: str) -> Decimal:
+    value = value.strip().replace(" ", "").replace(" ", "").replace(",", ".")
+    if not value:
+        return Decimal(0)
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return Decimal(0)
+
+
+class FECRecord:
+    """Ligne d'écriture du FEC, avec dates et montants typés."""
+
+    __slots__ = (
+        "journal_code", "journal_lib", "ecriture_num", "ecriture_date", "compte_num", "compte_lib",
+        "comp_aux_num", "comp_aux_lib", "piece_ref", "piece_date", "ecriture_lib", "debit", "credit",
+        "ecriture_let", "date_let", "valid_date", "montant_devise", "idevise",
+    )
+
+    def __init__(self, fields: list[str]):
+        """
+        Args:
+            fields: Valeurs brutes d'une ligne, dans l'ordre de FEC_COLUMNS
+        """
+        if len(fields) < len(FEC_COLUMNS):
+            fields = fields + [""] * (len(FEC_COLUMNS) - len(fields))
+        self.journal_code = fields[0].strip()
+        self.journal_lib = fields[1].strip()
+        self.ecriture_num = fields[2].strip()
+        self.ecriture_date = _parse_date(fields[3])
+        self.compte_num = fields[4].strip()
+        self.compte_lib = fields[5].strip()
+        self.comp_aux_num = fields[6].strip() or None
+        self.comp_aux_lib = fields[7].strip() or None
+        self.piece_ref = fields[8].strip()
+        self.piece_date = _parse_date(fields[9])
+        self.ecriture_lib = fields[10].strip()
+        self.debit = _parse_amount(fields[11])
+        self.credit = _parse_amount(fields[12])
+        self.ecriture_let = fields[13].strip() or None
+        self.date_let = _parse_date(fields[14])
+        self.valid_date = _parse_date(fields[15])
+        self.montant_devise = _parse_amount(fields[16]) if fields[16].strip() else None
+        self.idevise = fields[17].strip() or None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            name: value.isoformat() if isinstance(value, date) else str(value) if isinstance(value, Decimal) else value
+            for name in self.__slots__
+            for value in (getattr(self, name),)
+        }
+
+
+def _detect_encoding(path: str) -> str:
+    with open(path, "rb") as file:
+        sample = file.read(_ENCODING_SAMPLE)
+    if sample.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Seul un caractère multi-octets coupé en fin d'échantillon est toléré
+        if e.start < len(sample) - 3 or e.reason != "unexpected end of data":
+            return "latin-1"
+    return "utf-8"
+
+
+def parse_fec(path: str) -> Iterator[FECRecord]:
+    """
+    Lit un fichier FEC ligne à ligne.
+
+    Le séparateur (tabulation ou `|`) est déduit de l'en-tête et l'encodage
+    (UTF-8, sinon ISO-8859-1) d'un échantillon du début du fichier.
+    """
+    with open(path, encoding=_detect_encoding(path), newline="") as file:
+        header = file.readline()
+        separator = "\t" if header.count("\t") >= header.count("|") else "|"
+        if not header.split(separator)[0].strip().lower().startswith("journalcode"):
+            raise ValueError(f"Not a FEC file (unexpected header): {header[:80]!r}")
+        for line in file:
+            line = line.rstrip("\r\n")
+            if line:
+                yield FECRecord(line.split(separator))
+
+
+async def wait_for_export(
+    client: PennylaneClient,
+    export: dict[str, Any],
+    timeout: float = POLL_TIMEOUT,
+    initial_delay: float = POLL_INITIAL_DELAY,
+    max_delay: float = POLL_MAX_DELAY,
+) -> dict[str, Any]:
+    """
+    Attend que l'export soit prêt en interrogeant son statut.
+
+    L'intervalle entre deux interrogations est multiplié par `POLL_BACKOFF`
+    à chaque tentative, jusqu'à `max_delay`.
+
+    Args:
+        export: Réponse de la création de l'export (doit contenir `id`)
+        timeout: Durée d'attente maximale (secondes)
+
+    Returns:
+        Dernier état de l'export, avec `file_url`
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    polls = 0
+    while True:
+        status = str(export.get("status") or "").lower()
+        if status in _FAILED_STATUSES:
+            raise FECExportError(f"FEC export {export.get('id')} failed: {export.get('error') or status}")
+        if export.get("file_url") and status not in _PENDING_STATUSES:
+            export["polls"] = polls
+            return export
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"FEC export {export.get('id')} not ready after {timeout}s (status: {status})")
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * POLL_BACKOFF, max_delay)
+        export = await client.get(f"exports/fec/{export['id']}")
+        polls += 1
+
+
+_FEC_TABLE = """
+CREATE TABLE IF NOT EXISTS fec_lines (
+    fiscal_year_id INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    journal_code TEXT,
+    journal_lib TEXT,
+    ecriture_num TEXT,
+    ecriture_date TEXT,
+    compte_num TEXT,
+    compte_lib TEXT,
+    comp_aux_num TEXT,
+    comp_aux_lib TEXT,
+    piece_ref TEXT,
+    piece_date TEXT,
+    ecriture_lib TEXT,
+    debit REAL,
+    credit REAL,
+    ecriture_let TEXT,
+    date_let TEXT,
+    valid_date TEXT,
+    montant_devise REAL,
+    idevise TEXT,
+    PRIMARY KEY (fiscal_year_id, line)
+)
+"""
+
+_FEC_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_fec_lines_journal ON fec_lines (fiscal_year_id, journal_code, ecriture_date)",
+    "CREATE INDEX IF NOT EXISTS idx_fec_lines_compte ON fec_lines (fiscal_year_id, compte_num, ecriture_date)",
+)
+
+_INSERT = f"INSERT INTO fec_lines VALUES ({', '.join('?' * (len(FECRecord.__slots__) + 2))})"
+
+
+def describe_fec_table() -> str:
+    """Table des lignes FEC, pour la description de pennylane_query."""
+    return f"fec_lines(fiscal_year_id, line, {', '.join(FECRecord.__slots__)})"
+
+
+def ensure_fec_table(db: sqlite3.Connection):
+    with db:
+        db.execute(_FEC_TABLE)
+        for statement in _FEC_INDEXES:
+            db.execute(statement)
+
+
+def _row(fiscal_year_id: int, line: int, record: FECRecord) -> tuple[Any, ...]:
+    return (
+        fiscal_year_id, line, record.journal_code, record.journal_lib, record.ecriture_num,
+        record.ecriture_date.isoformat() if record.ecriture_date else None,
+        record.compte_num, record.compte_lib, record.comp_aux_num, record.comp_aux_lib, record.piece_ref,
+        record.piece_date.isoformat() if record.piece_date else None,
+        record.ecriture_lib, float(record.debit), float(record.credit), record.ecriture_let,
+        record.date_let.isoformat() if record.date_let else None,
+        record.valid_date.isoformat() if record.valid_date else None,
+        float(record.montant_devise) if record.montant_devise is not None else None, record.idevise,
+    )
+
+
+def load_fec(db: sqlite3.Connection, path: str, fiscal_year_id: int,
+             batch_size: int = LOAD_BATCH_SIZE) -> dict[str, Any]:
+    """
+    Charge un fichier FEC dans `fec_lines` (remplace l'exercice s'il était déjà chargé).
+
+    Les totaux sont calculés en `Decimal` pendant la lecture. La suppression
+    de l'exercice et toutes les insertions forment une seule transaction,
+    validée une fois le fichier entièrement lu : en cas d'erreur, les lignes
+    déjà chargées restent en place, et un lecteur concurrent ne voit jamais
+    d'exercice à moitié chargé.
+
+    Returns:
+        {"lines", "debit", "credit", "balanced", "journals": {code: {"lines", "debit", "credit"}}}
+    """
+    ensure_fec_table(db)
+    debit = credit = Decimal(0)
+    journals: dict[str, list[Any]] = {}
+    batch: list[tuple[Any, ...]] = []
+    count = 0
+    with db:
+        db.execute("DELETE FROM fec_lines WHERE fiscal_year_id = ?", (fiscal_year_id,))
+        for count, record in enumerate(parse_fec(path), 1):
+            debit += record.debit
+            credit += record.credit
+            totals = journals.get(record.journal_code)
+            if totals is None:
+                totals = journals[record.journal_code] = [0, Decimal(0), Decimal(0)]
+            totals[0] += 1
+            totals[1] += record.debit
+            totals[2] += record.credit
+            batch.append(_row(fiscal_year_id, count, record))
+            if len(batch) >= batch_size:
+                db.executemany(_INSERT, batch)
+                batch.clear()
+        if batch:
+            db.executemany(_INSERT, batch)
+    return {
+        "lines": count,
+        "debit": str(debit),
+        "credit": str(credit),
+        "balanced": debit == credit,
+        "journals": {
+            code: {"lines": lines, "debit": str(journal_debit), "credit": str(journal_credit)}
+            for code, (lines, journal_debit, journal_credit) in sorted(journals.items())
+        },
+    }
+
+
+def export_directory() -> str:
+    """
+    Dossier des fichiers FEC téléchargés, fixé par la configuration du serveur.
+
+    PENNYLANE_FEC_DIR s'il est défini, sinon un dossier temporaire privé
+    (droits 0700) créé une fois par processus.
+    """
+    global _private_directory
+    directory = os.getenv(FEC_DIR_ENV)
+    if directory:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        return directory
+    if _private_directory is None:
+        _private_directory = tempfile.mkdtemp(prefix="pennylane-fec-")
+    return _private_directory
+
+
+async def download_fec_export(
+    client: PennylaneClient,
+    fiscal_year_id: int,
+    export: dict[str, Any],
+    timeout: float = POLL_TIMEOUT,
+) -> dict[str, Any]:
+    """
+    Attend la génération d'un export FEC lancé puis télécharge le fichier dans `export_directory()`.
+
+    Args:
+        fiscal_year_id: ID de l'exercice
+        export: Réponse de la création de l'export (accounting.export_fec)
+        timeout: Attente maximale de la génération (secondes)
+
+    Returns:
+        {"export_id", "path", "bytes", "polls", "duration"}
+    """
+    started = time.perf_counter()
+    export = await wait_for_export(client, export, timeout)
+    path = os.path.join(export_directory(), f"fec_{fiscal_year_id}_{export.get('id', 'export')}.txt")
+    size = await client.download(export["file_url"], path)
+    duration = time.perf_counter() - started
+    logger.info(f"FEC export {export.get('id')} downloaded ({size} bytes) in {duration:.1f}s")
+    return {"export_id": export.get("id"), "path": path, "bytes": size, "polls": export.get("polls", 0),
+            "duration": round(duration, 3)}
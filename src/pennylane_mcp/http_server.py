@@ -1,13 +1,15 @@
 """HTTP wrapper for the MCP server to be deployed on Railway."""
-import os
-import json
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
-from .client import PennylaneClient
-from .tools import invoices, customers, suppliers, transactions, accounting, quotes
+from .backends import close_backends
+from .metrics import PROMETHEUS_CONTENT_TYPE, render as render_metrics
+from .registry import REGISTRY, UnknownToolError, dispatch
+from .serialization import JSON_MEDIA_TYPE, dumps
+from .tenants import MissingCredentialsError, TenantClients
+from .validation import ToolValidationError
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -24,14 +26,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialiser le client Pennylane
-api_key = os.getenv("PENNYLANE_API_KEY")
-base_url = os.getenv("PENNYLANE_BASE_URL", "https://app.pennylane.com/api/external/v2")
-
-if not api_key:
-    raise ValueError("PENNYLANE_API_KEY environment variable is required")
-
-pennylane_client = PennylaneClient(api_key=api_key, base_url=base_url)
+# Initialiser les clients Pennylane (client par défaut + pool multi-tenant)
+tenants = TenantClients.from_env()
+pennylane_client = tenants.default
 
 
 @app.get("/")
@@ -41,7 +38,8 @@ async def root():
         "status": "ok",
         "service": "Pennylane MCP HTTP Server",
         "version": "1.0.0",
-        "tools_count": 38
+        "tools_count": len(REGISTRY),
+        "tenants": tenants.stats()
     }
 
 
@@ -51,23 +49,19 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (tool and upstream latencies, in-flight calls, bytes, cache, retries)."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.get("/api/tools")
 async def list_tools():
     """Liste tous les outils disponibles."""
     return {
         "tools": [
-            {"name": "pennylane_list_customers", "description": "Liste tous les clients"},
-            {"name": "pennylane_get_customer", "description": "Récupère un client"},
-            {"name": "pennylane_list_customer_invoices", "description": "Liste toutes les factures clients"},
-            {"name": "pennylane_get_customer_invoice", "description": "Récupère une facture client"},
-            {"name": "pennylane_create_customer_invoice", "description": "Crée une facture client"},
-            {"name": "pennylane_list_quotes", "description": "Liste tous les devis"},
-            {"name": "pennylane_get_quote", "description": "Récupère un devis"},
-            {"name": "pennylane_create_quote", "description": "Crée un devis"},
-            {"name": "pennylane_update_quote", "description": "Met à jour un devis"},
-            {"name": "pennylane_update_quote_status", "description": "Met à jour le statut d'un devis"},
-            {"name": "pennylane_list_transactions", "description": "Liste toutes les transactions"},
-            {"name": "pennylane_list_bank_accounts", "description": "Liste tous les comptes bancaires"},
+            {"name": spec.name, "description": spec.description}
+            for spec in REGISTRY.values()
         ]
     }
 
@@ -82,100 +76,34 @@ async def call_tool(tool_name: str, request: Request):
         logger.info(f"Calling tool: {tool_name} with arguments: {arguments}")
         
         # Router vers le bon outil
-        result = await route_tool(tool_name, arguments)
+        result = await route_tool(tool_name, arguments, tenants.resolve(request.headers))
         
-        return JSONResponse(content={
-            "success": True,
-            "result": result
-        })
+        # Compact unless ?pretty=1; encoded once without FastAPI's jsonable_encoder pass
+        pretty = request.query_params.get("pretty", "").lower() in ("1", "true", "yes")
+        return Response(
+            content=dumps({"success": True, "result": result}, pretty=pretty or None),
+            media_type=JSON_MEDIA_TYPE
+        )
         
+    except MissingCredentialsError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    except UnknownToolError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ToolValidationError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "errors": e.errors})
     except Exception as e:
         logger.error(f"Error calling tool {tool_name}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def route_tool(name: str, arguments: dict):
-    """Route tool calls to the appropriate handler."""
-    
-    # FACTURES CLIENTS
-    if name == "pennylane_list_customer_invoices":
-        return await invoices.list_customer_invoices(
-            pennylane_client,
-            limit=arguments.get("limit", 20),
-            cursor=arguments.get("cursor"),
-            filter_query=arguments.get("filter"),
-            sort=arguments.get("sort", "-id")
-        )
-    
-    elif name == "pennylane_get_customer_invoice":
-        return await invoices.get_customer_invoice(
-            pennylane_client,
-            arguments["invoice_id"]
-        )
-    
-    elif name == "pennylane_create_customer_invoice":
-        return await invoices.create_customer_invoice(
-            pennylane_client,
-            **arguments
-        )
-    
-    # CLIENTS
-    elif name == "pennylane_list_customers":
-        return await customers.list_customers(
-            pennylane_client,
-            limit=arguments.get("limit", 20),
-            cursor=arguments.get("cursor"),
-            filter_query=arguments.get("filter"),
-            sort=arguments.get("sort", "-id")
-        )
-    
-    elif name == "pennylane_get_customer":
-        return await customers.get_customer(
-            pennylane_client,
-            arguments["customer_id"]
-        )
-    
-    # DEVIS
-    elif name == "pennylane_list_quotes":
-        return await quotes.list_quotes(
-            pennylane_client,
-            limit=arguments.get("limit", 30),
-            cursor=arguments.get("cursor"),
-            filter_query=arguments.get("filter"),
-            sort=arguments.get("sort", "-id")
-        )
-    
-    elif name == "pennylane_get_quote":
-        return await quotes.get_quote(
-            pennylane_client,
-            arguments["quote_id"]
-        )
-    
-    elif name == "pennylane_create_quote":
-        return await quotes.create_quote(
-            pennylane_client,
-            **arguments
-        )
-    
-    # TRANSACTIONS
-    elif name == "pennylane_list_transactions":
-        return await transactions.list_transactions(
-            pennylane_client,
-            limit=arguments.get("limit", 20),
-            cursor=arguments.get("cursor"),
-            filter_query=arguments.get("filter"),
-            sort=arguments.get("sort", "-id")
-        )
-    
-    # COMPTABILITÉ
-    elif name == "pennylane_list_bank_accounts":
-        return await accounting.list_bank_accounts(pennylane_client)
-    
-    else:
-        raise ValueError(f"Unknown tool: {name}")
+async def route_tool(name: str, arguments: dict, api_key: str | None = None):
+    """Route tool calls to the appropriate handler, with the client of `api_key`."""
+    async with tenants.lease(api_key) as client:
+        return await dispatch(client, name, arguments)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
-    await pennylane_client.close()
+    await tenants.close()
+    await close_backends()
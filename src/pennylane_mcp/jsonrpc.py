@@ -0,0 +1,76 @@
+"""Traitement des messages JSON-RPC 2.0, unitaires ou par lots.
+
+Un lot (tableau de messages) est exécuté en parallèle, au plus
+`BATCH_CONCURRENCY` messages à la fois, et les réponses sont renvoyées dans
+l'ordre des requêtes. Conformément à JSON-RPC 2.0, les notifications (messages
+sans `id`), isolées ou dans un lot, sont traitées mais ne reçoivent pas de
+réponse.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable
+
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+# Messages d'un lot exécutés simultanément
+BATCH_CONCURRENCY = int(os.getenv("PENNYLANE_BATCH_CONCURRENCY", "8"))
+MAX_BATCH_SIZE = 100
+
+# Traite un message et renvoie sa réponse (dict, ou JSON déjà encodé)
+Handler = Callable[[dict[str, Any]], Awaitable[dict[str, Any] | bytes]]
+
+
+def error_response(msg_id: Any, code: int, message: str) -> dict[str, Any]:
+    """Réponse d'erreur JSON-RPC."""
+    return {"jsonrpc": "2.0", "id": msg_id, "error": {"code": code, "message": message}}
+
+
+def is_notification(message: Any) -> bool:
+    return isinstance(message, dict) and "id" not in message
+
+
+async def handle_one(message: Any, handle: Handler) -> bytes:
+    """Réponse encodée d'un message ; toute exception devient une erreur JSON-RPC."""
+    if not isinstance(message, dict):
+        return dumps(error_response(None, INVALID_REQUEST, "Invalid Request"))
+    try:
+        response = await handle(message)
+    except Exception as e:
+        logger.error(f"Error handling message: {e}", exc_info=True)
+        response = error_response(message.get("id"), INTERNAL_ERROR, str(e))
+    return response if isinstance(response, bytes) else dumps(response)
+
+
+async def handle_payload(payload: Any, handle: Handler, concurrency: int = BATCH_CONCURRENCY) -> bytes | None:
+    """
+    Traite un corps de requête JSON-RPC (message unique ou lot).
+
+    Returns:
+        Réponse encodée, ou None pour une notification ou un lot ne contenant que des notifications
+    """
+    if not isinstance(payload, list):
+        response = await handle_one(payload, handle)
+        return None if is_notification(payload) else response
+    if not payload:
+        return dumps(error_response(None, INVALID_REQUEST, "Invalid Request: empty batch"))
+    if len(payload) > MAX_BATCH_SIZE:
+        return dumps(error_response(None, INVALID_REQUEST, f"Invalid Request: batch larger than {MAX_BATCH_SIZE}"))
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(message: Any) -> bytes:
+        async with semaphore:
+            return await handle_one(message, handle)
+
+    logger.info(f"Received JSON-RPC batch of {len(payload)} messages")
+    responses = await asyncio.gather(*(run(message) for message in payload))
+    parts = [response for message, response in zip(payload, responses) if not is_notification(message)]
+    return b"[" + b",".join(parts) + b"]" if parts else None
@@ -0,0 +1,283 @@
+"""Recherche de groupes de lettrage sur les lignes d'écriture d'un compte.
+
+Les lignes non lettrées sont stockées sous forme compacte (identifiant, montant
+signé en centimes, date en jours) dans des tableaux `array`, sans conserver les
+objets de l'API : la mémoire reste proportionnelle au nombre de lignes
+(~24 octets par ligne).
+
+La résolution se fait en deux passes :
+1. correspondances exactes 1↔1 : débits de chaque montant triés par date,
+   chaque crédit est associé par dichotomie au débit libre de même montant le
+   plus proche en date (O(n log n), même avec des montants récurrents) ;
+2. groupes N↔1 : pour chaque ligne restante, recherche bornée d'un
+   sous-ensemble de lignes de sens opposé (au plus `max_group_size - 1`
+   lignes, parmi les `max_candidates` plus proches en date) dont la somme
+   l'équilibre exactement. Le nombre de nœuds explorés par recherche est
+   plafonné (`search_budget`), ce qui borne le temps de calcul.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+DEFAULT_MAX_GROUP_SIZE = 4
+DEFAULT_DATE_WINDOW_DAYS = 90
+DEFAULT_MAX_CANDIDATES = 32
+DEFAULT_SEARCH_BUDGET = 5000
+# Lignes parcourues au plus par candidat retenu (borne le balayage de la fenêtre de dates)
+_SCAN_FACTOR = 4
+
+
+def _cents(value: Any) -> int:
+    if value is None or value == "":
+        return 0
+    try:
+        return int((Decimal(str(value)) * 100).to_integral_value())
+    except (InvalidOperation, ValueError):
+        return 0
+
+
+def _format_cents(cents: int) -> str:
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+def _day(line: dict[str, Any]) -> int:
+    value = line.get("date")
+    if value is None and isinstance(line.get("ledger_entry"), dict):
+        value = line["ledger_entry"].get("date")
+    if isinstance(value, str) and len(value) >= 10:
+        try:
+            return date.fromisoformat(value[:10]).toordinal()
+        except ValueError:
+            pass
+    return 0
+
+
+def is_unlettered(line: dict[str, Any]) -> bool:
+    """Ligne non encore lettrée."""
+    return not line.get("lettering") and not line.get("lettering_id")
+
+
+def _free(parent: array, position: int) -> int:
+    """Représentant de `position` : première position libre dans le sens du tableau `parent`."""
+    root = position
+    while parent[root] != root:
+        root = parent[root]
+    while parent[position] != root:
+        parent[position], position = root, parent[position]
+    return root
+
+
+class LetteringEngine:
+    """Accumule les lignes d'un compte puis calcule les groupes qui s'équilibrent."""
+
+    def __init__(
+        self,
+        max_group_size: int = DEFAULT_MAX_GROUP_SIZE,
+        date_window_days: int = DEFAULT_DATE_WINDOW_DAYS,
+        max_candidates: int = DEFAULT_MAX_CANDIDATES,
+        search_budget: int = DEFAULT_SEARCH_BUDGET,
+    ):
+        """
+        Args:
+            max_group_size: Nombre maximal de lignes par groupe (≥ 2)
+            date_window_days: Écart de dates maximal entre les lignes d'un groupe
+            max_candidates: Lignes candidates examinées par recherche de sous-ensemble
+            search_budget: Nœuds explorés au plus par recherche de sous-ensemble
+        """
+        self.max_group_size = max(2, max_group_size)
+        self.date_window_days = date_window_days
+        self.max_candidates = max_candidates
+        self.search_budget = search_budget
+        self._ids = array("q")
+        self._cents = array("q")
+        self._days = array("l")
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, line: dict[str, Any]) -> bool:
+        """Ajoute une ligne (objet de l'API) ; ignore les lignes lettrées ou nulles."""
+        if not is_unlettered(line):
+            return False
+        amount = _cents(line.get("debit")) - _cents(line.get("credit"))
+        if amount == 0:
+            return False
+        self._ids.append(int(line["id"]))
+        self._cents.append(amount)
+        self._days.append(_day(line))
+        return True
+
+    def _in_window(self, first: int, second: int) -> bool:
+        return not first or not second or abs(first - second) <= self.date_window_days
+
+    def _group(self, indexes: list[int], kind: str) -> dict[str, Any]:
+        return {
+            "kind": kind,
+            "line_ids": [self._ids[index] for index in indexes],
+            "amount": _format_cents(sum(self._cents[index] for index in indexes if self._cents[index] > 0)),
+        }
+
+    def _exact_pass(self, used: bytearray) -> list[dict[str, Any]]:
+        # Débits datés triés par (montant, date) dans des tableaux plats ; plage de chaque montant
+        debits = array("q", sorted(
+            (index for index, amount in enumerate(self._cents) if amount > 0 and self._days[index]),
+            key=lambda index: (self._cents[index], self._days[index]),
+        ))
+        days = array("l", (self._days[index] for index in debits))
+        ranges: dict[int, tuple[int, int]] = {}
+        for position, index in enumerate(debits):
+            amount = self._cents[index]
+            ranges[amount] = (ranges.get(amount, (position,))[0], position + 1)
+        undated: dict[int, list[int]] = {}
+        for index, amount in enumerate(self._cents):
+            if amount > 0 and not self._days[index]:
+                undated.setdefault(amount, []).append(index)
+        # Prochain débit libre à droite / à gauche (décalé d'un cran) de chaque position :
+        # union-find avec compression de chemin, les débits associés sont sautés en temps quasi constant
+        right = array("l", range(len(debits) + 1))
+        left = array("l", range(len(debits) + 1))
+
+        groups = []
+        credits = sorted((index for index, amount in enumerate(self._cents) if amount < 0),
+                         key=lambda index: self._days[index])
+        for credit in credits:
+            amount = -self._cents[credit]
+            day = self._days[credit]
+            debit = None
+            spare = undated.get(amount)
+            if not day and spare:
+                # Crédit sans date : un débit sans date est à distance nulle
+                debit = spare.pop()
+            elif amount in ranges:
+                start, end = ranges[amount]
+                position = bisect_left(days, day, start, end)
+                best = None
+                for candidate in (_free(left, position) - 1, _free(right, position)):
+                    if start <= candidate < end and self._in_window(day, days[candidate]) and (
+                            best is None or abs(days[candidate] - day) < abs(days[best] - day)):
+                        best = candidate
+                if best is not None:
+                    debit = debits[best]
+                    right[best] = best + 1
+                    left[best + 1] = best
+            if debit is None and spare:
+                debit = spare.pop()
+            if debit is None:
+                continue
+            used[credit] = used[debit] = 1
+            groups.append(self._group([debit, credit], "exact"))
+        return groups
+
+    def _nearest(self, pool: list[int], pool_days: list[int], pool_amounts: list[int], target: int,
+                 used: bytearray) -> list[int]:
+        """Lignes du pool non utilisées, de montant inférieur à la cible, les plus proches en date."""
+        magnitude = abs(self._cents[target])
+        day = self._days[target]
+        if day:
+            low = bisect_left(pool_days, day - self.date_window_days)
+            high = bisect_right(pool_days, day + self.date_window_days)
+        else:
+            low, high = 0, len(pool)
+        right = min(max(bisect_left(pool_days, day), low), high)
+        left = right - 1
+        found: list[int] = []
+        wanted = self.max_candidates
+        scans = wanted * _SCAN_FACTOR
+        while scans and (left >= low or right < high):
+            scans -= 1
+            if right < high and (left < low or pool_days[right] - day <= day - pool_days[left]):
+                position = right
+                right += 1
+            else:
+                position = left
+                left -= 1
+            if pool_amounts[position] < magnitude and not used[pool[position]]:
+                found.append(pool[position])
+                if len(found) == wanted:
+                    break
+        return found
+
+    def _subset(self, candidates: list[int], target: int) -> list[int] | None:
+        """
+        Sous-ensemble de 2 à `max_group_size - 1` lignes dont la somme vaut exactement la cible.
+
+        Les premières lignes sont énumérées (montants décroissants, avec
+        élagage) et la dernière est cherchée dans un index des montants :
+        O(k^(m-2)) pour k candidats et des groupes de m lignes, plafonné
+        par `search_budget`. Les plus petits groupes sont essayés d'abord.
+        """
+        order = sorted(candidates, key=lambda index: -abs(self._cents[index]))
+        amounts = [abs(self._cents[index]) for index in order]
+        negated = [-amount for amount in amounts]  # ordre croissant, pour bisect
+        by_amount: dict[int, list[int]] = {}
+        for position, amount in enumerate(amounts):
+            by_amount.setdefault(amount, []).append(position)
+        budget = self.search_budget
+
+        def find(start: int, remaining: int, slots: int) -> list[int] | None:
+            nonlocal budget
+            # Premier montant strictement inférieur au reste à couvrir
+            for position in range(max(start, bisect_right(negated, -remaining)), len(amounts) - slots + 1):
+                amount = amounts[position]
+                if amount * slots < remaining:
+                    break  # montants décroissants : la somme n'est plus atteignable
+                budget -= 1
+                if budget <= 0:
+                    return None
+                rest = remaining - amount
+                if slots == 2:
+                    # Dernière ligne : recherche directe du montant manquant
+                    for other in by_amount.get(rest, ()):
+                        if other > position:
+                            return [position, other]
+                else:
+                    found = find(position + 1, rest, slots - 1)
+                    if found is not None:
+                        return [position, *found]
+            return None
+
+        magnitude = abs(self._cents[target])
+        for size in range(2, self.max_group_size):
+            found = find(0, magnitude, size)
+            if found is not None:
+                return [order[position] for position in found]
+        return None
+
+    def _subset_pass(self, used: bytearray) -> list[dict[str, Any]]:
+        if self.max_group_size < 3:
+            return []
+        remaining = sorted((index for index in range(len(self)) if not used[index]), key=lambda index: self._days[index])
+        pools = {
+            sign: [index for index in remaining if (self._cents[index] > 0) == sign] for sign in (True, False)
+        }
+        pool_days = {sign: [self._days[index] for index in pool] for sign, pool in pools.items()}
+        pool_amounts = {sign: [abs(self._cents[index]) for index in pool] for sign, pool in pools.items()}
+        groups = []
+        for target in sorted(remaining, key=lambda index: -abs(self._cents[index])):
+            if used[target]:
+                continue
+            opposite = self._cents[target] < 0
+            candidates = self._nearest(pools[opposite], pool_days[opposite], pool_amounts[opposite], target, used)
+            if len(candidates) < 2:
+                continue
+            subset = self._subset(candidates, target)
+            if subset:
+                used[target] = 1
+                for index in subset:
+                    used[index] = 1
+                groups.append(self._group([target, *subset], "subset"))
+        return groups
+
+    def solve(self) -> dict[str, Any]:
+        """
+        Calcule les groupes de lettrage.
+
+        Returns:
+            {"groups": [{"kind", "line_ids", "amount"}], "lines": n, "lettered_lines": n}
+        """
+        used = bytearray(len(self))
+        groups = self._exact_pass(used)
+        groups.extend(self._subset_pass(used))
+        return {"groups": groups, "lines": len(self), "lettered_lines": sum(used)}
@@ -4,13 +4,20 @@ import json
 import asyncio
 from typing import Any
 from fastapi import FastAPI, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
+from .backends import close_backends, shared_backend
 from .client import PennylaneClient
-from .tools import invoices, customers, quotes, transactions, accounting, suppliers, journals
-from .all_tools_definition import ALL_TOOLS
+from .jsonrpc import METHOD_NOT_FOUND, PARSE_ERROR, error_response, handle_payload, is_notification
+from .metrics import PROMETHEUS_CONTENT_TYPE, render as render_metrics
+from .registry import UnknownToolError, dispatch, tool_definitions
+from .serialization import JSON_MEDIA_TYPE, dumps, dumps_text, tool_result_envelope
+from .sessions import SessionManager
+from .streaming import PARTIAL_RESULTS_CAPABILITY, ProgressReporter
+from .tenants import MissingCredentialsError, TenantClients
+from .validation import ToolValidationError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,14 +32,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialiser le client Pennylane
-api_key = os.getenv("PENNYLANE_API_KEY")
-base_url = os.getenv("PENNYLANE_BASE_URL", "https://app.pennylane.com/api/external/v2")
+# Initialiser les clients Pennylane (client par défaut + pool multi-tenant)
+tenants = TenantClients.from_env()
+pennylane_client = tenants.default
 
-if not api_key:
-    raise ValueError("PENNYLANE_API_KEY environment variable is required")
+TOOL_DEFINITIONS = tool_definitions()
 
-pennylane_client = PennylaneClient(api_key=api_key, base_url=base_url)
+# With several workers, sessions are registered in the shared state backend so that
+# messages posted to any worker reach the one holding the SSE stream
+sessions = SessionManager(shared_backend())
+if sessions.backend is None and int(os.getenv("PENNYLANE_WORKERS", "1")) > 1:
+    logger.warning("Several workers without PENNYLANE_STATE_BACKEND: SSE sessions are not shared")
+
+# Seconds without a message before a heartbeat comment is sent
+HEARTBEAT_INTERVAL = 30
 
 
 @app.get("/")
@@ -42,20 +55,38 @@ async def root():
         "status": "ok",
         "service": "Pennylane MCP SSE Server",
         "protocol": "mcp/sse",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        **sessions.stats(),
+        "tenants": tenants.stats()
     }
 
 
+def unauthorized(error: MissingCredentialsError) -> Response:
+    return Response(content=dumps({"error": str(error)}), status_code=401, media_type=JSON_MEDIA_TYPE)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (tool and upstream latencies, in-flight calls, bytes, cache, retries)."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.get("/sse")
 async def sse_endpoint(request: Request):
-    """SSE endpoint for MCP protocol."""
+    """SSE endpoint for MCP protocol: one session per connection, results pushed on the stream."""
+    # The API key sent when connecting is used for every message of the session
+    try:
+        api_key = tenants.resolve(request.headers)
+    except MissingCredentialsError as e:
+        return unauthorized(e)
     
     async def event_stream():
         """Generate SSE events for MCP protocol."""
+        session = await sessions.open(api_key)
         try:
             # Get the base URL from request (use https for Railway)
             base_url = str(request.base_url).rstrip('/').replace('http://', 'https://')
-            endpoint_url = f"{base_url}/message"
+            endpoint_url = f"{base_url}/message?session_id={session.id}"
             
             # Send endpoint event - just the URL string
             yield f"event: endpoint\n"
@@ -63,16 +94,18 @@ async def sse_endpoint(request: Request):
             
             logger.info(f"SSE connection established, endpoint: {endpoint_url}")
             
-            # Keep connection alive with heartbeat
+            # Forward responses as they are queued; heartbeat when idle
             while True:
                 if await request.is_disconnected():
                     logger.info("Client disconnected from SSE")
                     break
-                await asyncio.sleep(30)
-                yield f": heartbeat\n\n"
+                message = await session.next_message(HEARTBEAT_INTERVAL)
+                yield sse_message(message) if message is not None else ": heartbeat\n\n"
                 
         except Exception as e:
             logger.error(f"SSE error: {e}")
+        finally:
+            await sessions.close(session.id)
     
     return StreamingResponse(
         event_stream(),
@@ -85,200 +118,207 @@ async def sse_endpoint(request: Request):
     )
 
 
+def sse_message(message: bytes) -> str:
+    """Frame an encoded JSON-RPC message as an SSE `message` event."""
+    data = "".join(f"data: {line}\n" for line in message.decode("utf-8").split("\n"))
+    return f"event: message\n{data}\n"
+
+
 @app.post("/message")
 async def handle_message(request: Request):
-    """Handle MCP JSON-RPC messages."""
+    """
+    Handle MCP JSON-RPC messages (a single message or a batch).
+
+    With a `session_id` (the URL sent in the `endpoint` event), the request is
+    acknowledged with 202 and the response is pushed on that session's SSE
+    stream, forwarding the message to the worker holding the stream if needed.
+    Without it, the response is returned in the HTTP response body.
+    The Pennylane API key is the session's one, or else the request's one.
+    """
     try:
-        body = await request.json()
-        method = body.get("method")
-        params = body.get("params", {})
-        msg_id = body.get("id")
-        
-        logger.info(f"Received MCP message: {method} (id: {msg_id})")
-        logger.debug(f"Full request body: {body}")
-        
-        if method == "initialize":
-            return {
-                "jsonrpc": "2.0",
-                "id": msg_id,
-                "result": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "tools": {}
-                    },
-                    "serverInfo": {
-                        "name": "pennylane-mcp",
-                        "version": "1.0.0"
-                    }
-                }
-            }
-        
-        elif method == "tools/list":
-            return {
-                "jsonrpc": "2.0",
-                "id": msg_id,
-                "result": {
-                    "tools": ALL_TOOLS
-                }
-            }
-        
-        elif method == "tools/call":
-            tool_name = params.get("name")
-            arguments = params.get("arguments", {})
-            
-            result_text = await call_tool(tool_name, arguments)
-            
-            return {
-                "jsonrpc": "2.0",
-                "id": msg_id,
-                "result": {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": result_text
-                        }
-                    ]
-                }
-            }
-        
-        else:
-            return {
-                "jsonrpc": "2.0",
-                "id": msg_id,
-                "error": {
-                    "code": -32601,
-                    "message": f"Method not found: {method}"
+        payload = json.loads(await request.body())
+    except ValueError as e:
+        return Response(
+            content=dumps(error_response(None, PARSE_ERROR, f"Parse error: {e}")),
+            media_type=JSON_MEDIA_TYPE
+        )
+    session_id = request.query_params.get("session_id")
+    session = sessions.get(session_id) if session_id else None
+    if session_id and session is None:
+        if await sessions.forward(session_id, payload):
+            return Response(status_code=202)
+        return Response(
+            content=dumps({"error": f"Unknown or closed session: {session_id}"}),
+            status_code=404,
+            media_type=JSON_MEDIA_TYPE
+        )
+    if session is None:
+        try:
+            api_key = tenants.resolve(request.headers)
+        except MissingCredentialsError as e:
+            return unauthorized(e)
+    else:
+        api_key = session.api_key
+    if session is not None:
+        session.submit(lambda: handle_tenant_payload(payload, api_key))
+        return Response(status_code=202)
+    content = await handle_tenant_payload(payload, api_key)
+    if content is None:
+        # Notification (or batch made only of notifications): nothing to answer
+        return Response(status_code=202)
+    return Response(content=content, media_type=JSON_MEDIA_TYPE)
+
+
+@app.post("/mcp")
+async def streamable_http(request: Request):
+    """
+    Streamable HTTP transport (single MCP endpoint).
+
+    A `tools/call` request from a client accepting `text/event-stream` gets an
+    SSE stream: `notifications/progress` as pages arrive for `*_all` tools when
+    the client sent `params._meta.progressToken`, `notifications/partial_result`
+    (a server extension, not part of MCP) with each page's items when
+    `params._meta.partialResults` is true, then the JSON-RPC response. Anything
+    else gets a plain JSON response (202 when there is nothing to answer).
+    """
+    try:
+        payload = json.loads(await request.body())
+    except ValueError as e:
+        return Response(
+            content=dumps(error_response(None, PARSE_ERROR, f"Parse error: {e}")),
+            status_code=400,
+            media_type=JSON_MEDIA_TYPE
+        )
+    if is_notification(payload):
+        return Response(status_code=202)
+    try:
+        api_key = tenants.resolve(request.headers)
+    except MissingCredentialsError as e:
+        return unauthorized(e)
+    accepts_stream = "text/event-stream" in request.headers.get("accept", "")
+    if (accepts_stream and isinstance(payload, dict) and payload.get("method") == "tools/call"
+            and "id" in payload):
+        return StreamingResponse(
+            stream_tool_call(payload, api_key),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    content = await handle_tenant_payload(payload, api_key)
+    if content is None:
+        return Response(status_code=202)
+    return Response(content=content, media_type=JSON_MEDIA_TYPE)
+
+
+@app.get("/mcp")
+async def streamable_http_get():
+    """No standalone server-to-client stream on the streamable endpoint (use /sse)."""
+    return Response(status_code=405, headers={"Allow": "POST"})
+
+
+async def stream_tool_call(message: dict[str, Any], api_key: str | None = None):
+    """SSE events of one tool call: progress and partial results, then the response."""
+    params = message.get("params") or {}
+    meta = params.get("_meta") or {}
+    reporter = ProgressReporter(message["id"], meta.get("progressToken"), bool(meta.get("partialResults")))
+    # The client is leased for the whole stream, not just until the response headers
+    async with tenants.lease(api_key) as client:
+        call = call_tool(params.get("name"), params.get("arguments", {}), client)
+        task = asyncio.create_task(reporter.run(call))
+        try:
+            async for notification in reporter.events(task):
+                yield sse_message(dumps(notification))
+            yield sse_message(tool_result_envelope(message["id"], *task.result()))
+        finally:
+            # Client gone before the end: stop paginating
+            task.cancel()
+
+
+async def handle_tenant_payload(payload: Any, api_key: str | None) -> bytes | None:
+    """Handle a JSON-RPC payload with the Pennylane client of `api_key`."""
+    async with tenants.lease(api_key) as client:
+        return await handle_payload(payload, lambda message: process_message(message, client))
+
+
+async def process_message(body: dict[str, Any], client: PennylaneClient | None = None) -> dict[str, Any] | bytes:
+    """Process one MCP JSON-RPC message and return its response."""
+    method = body.get("method")
+    params = body.get("params", {})
+    msg_id = body.get("id")
+    
+    logger.info(f"Received MCP message: {method} (id: {msg_id})")
+    logger.debug(f"Full request body: {body}")
+    
+    if method == "initialize":
+        return {
+            "jsonrpc": "2.0",
+            "id": msg_id,
+            "result": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {
+                    "tools": {},
+                    # Server extension, see streaming.py: opt-in per call with _meta.partialResults
+                    "experimental": {PARTIAL_RESULTS_CAPABILITY: {}}
+                },
+                "serverInfo": {
+                    "name": "pennylane-mcp",
+                    "version": "1.0.0"
                 }
             }
+        }
     
-    except Exception as e:
-        logger.error(f"Error handling message: {e}", exc_info=True)
+    elif method == "tools/list":
         return {
             "jsonrpc": "2.0",
-            "id": body.get("id") if 'body' in locals() else None,
-            "error": {
-                "code": -32603,
-                "message": str(e)
+            "id": msg_id,
+            "result": {
+                "tools": TOOL_DEFINITIONS
             }
         }
+    
+    elif method == "tools/call":
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        
+        result_text, is_error = await call_tool(tool_name, arguments, client)
+        
+        # Encoded once here; FastAPI would otherwise walk and re-encode the payload
+        return tool_result_envelope(msg_id, result_text, is_error)
+    
+    else:
+        return error_response(msg_id, METHOD_NOT_FOUND, f"Method not found: {method}")
 
 
-async def call_tool(name: str, arguments: dict[str, Any]) -> str:
-    """Execute a tool and return result as JSON string."""
+async def call_tool(name: str, arguments: dict[str, Any],
+                    client: PennylaneClient | None = None) -> tuple[str, bool]:
+    """
+    Execute a tool (with the default client unless `client` is given).
+
+    Returns the result as a JSON string and whether it is an error, to be
+    reported with `isError` in the `tools/call` result.
+    """
     try:
-        # FACTURES CLIENTS
-        if name == "pennylane_list_customer_invoices":
-            result = await invoices.list_customer_invoices(pennylane_client, **arguments)
-        elif name == "pennylane_get_customer_invoice":
-            result = await invoices.get_customer_invoice(pennylane_client, arguments["invoice_id"])
-        elif name == "pennylane_create_customer_invoice":
-            result = await invoices.create_customer_invoice(pennylane_client, **arguments)
-        
-        # CLIENTS
-        elif name == "pennylane_list_customers":
-            result = await customers.list_customers(pennylane_client, limit=arguments.get("limit", 20))
-        elif name == "pennylane_get_customer":
-            result = await customers.get_customer(pennylane_client, arguments["customer_id"])
-        elif name == "pennylane_create_customer":
-            result = await customers.create_customer(pennylane_client, **arguments)
-        
-        # DEVIS
-        elif name == "pennylane_list_quotes":
-            result = await quotes.list_quotes(pennylane_client, limit=arguments.get("limit", 30))
-        elif name == "pennylane_get_quote":
-            result = await quotes.get_quote(pennylane_client, arguments["quote_id"])
-        elif name == "pennylane_create_quote":
-            result = await quotes.create_quote(pennylane_client, **arguments)
-        elif name == "pennylane_update_quote":
-            result = await quotes.update_quote(pennylane_client, **arguments)
-        elif name == "pennylane_update_quote_status":
-            result = await quotes.update_quote_status(pennylane_client, arguments["quote_id"], arguments["status"])
-        
-        # TRANSACTIONS
-        elif name == "pennylane_list_transactions":
-            result = await transactions.list_transactions(pennylane_client, limit=arguments.get("limit", 20))
-        elif name == "pennylane_create_transaction":
-            result = await transactions.create_transaction(pennylane_client, **arguments)
-        
-        # COMPTABILITÉ
-        elif name == "pennylane_list_bank_accounts":
-            result = await accounting.list_bank_accounts(pennylane_client)
-        
-        # FOURNISSEURS
-        elif name == "pennylane_list_suppliers":
-            result = await suppliers.list_suppliers(pennylane_client, limit=arguments.get("limit", 20))
-        elif name == "pennylane_create_supplier":
-            result = await suppliers.create_supplier(pennylane_client, **arguments)
-        
-        # JOURNAUX COMPTABLES
-        elif name == "pennylane_list_journals":
-            result = await journals.list_journals(pennylane_client, **arguments)
-        elif name == "pennylane_get_journal":
-            result = await journals.get_journal(pennylane_client, arguments["journal_id"])
-        elif name == "pennylane_create_journal":
-            result = await journals.create_journal(pennylane_client, arguments["code"], arguments["label"])
-        
-        # COMPTES GÉNÉRAUX
-        elif name == "pennylane_list_ledger_accounts":
-            result = await journals.list_ledger_accounts(pennylane_client, **arguments)
-        elif name == "pennylane_get_ledger_account":
-            result = await journals.get_ledger_account(pennylane_client, arguments["account_id"])
-        elif name == "pennylane_create_ledger_account":
-            result = await journals.create_ledger_account(pennylane_client, **arguments)
-        
-        # ÉCRITURES COMPTABLES
-        elif name == "pennylane_list_ledger_entries":
-            result = await journals.list_ledger_entries(pennylane_client, **arguments)
-        elif name == "pennylane_list_ledger_entry_lines":
-            result = await journals.list_ledger_entry_lines(pennylane_client, arguments["ledger_entry_id"], 
-                                                           limit=arguments.get("limit", 20), 
-                                                           page=arguments.get("page", 1))
-        elif name == "pennylane_create_ledger_entry":
-            result = await journals.create_ledger_entry(pennylane_client, **arguments)
-        elif name == "pennylane_update_ledger_entry":
-            result = await journals.update_ledger_entry(pennylane_client, **arguments)
-        
-        # LIGNES D'ÉCRITURE
-        elif name == "pennylane_list_all_ledger_entry_lines":
-            result = await journals.list_all_ledger_entry_lines(pennylane_client, **arguments)
-        elif name == "pennylane_get_ledger_entry_line":
-            result = await journals.get_ledger_entry_line(pennylane_client, arguments["line_id"])
-        elif name == "pennylane_list_lettered_ledger_entry_lines":
-            result = await journals.list_lettered_ledger_entry_lines(pennylane_client, arguments["line_id"],
-                                                                     limit=arguments.get("limit", 20),
-                                                                     page=arguments.get("page", 1))
-        elif name == "pennylane_list_ledger_entry_line_categories":
-            result = await journals.list_ledger_entry_line_categories(pennylane_client, arguments["line_id"],
-                                                                      limit=arguments.get("limit", 20),
-                                                                      page=arguments.get("page", 1))
-        elif name == "pennylane_link_categories_to_ledger_entry_line":
-            result = await journals.link_categories_to_ledger_entry_line(pennylane_client, arguments["line_id"], arguments["categories"])
-        elif name == "pennylane_letter_ledger_entry_lines":
-            result = await journals.letter_ledger_entry_lines(pennylane_client, arguments["ledger_entry_lines"],
-                                                             arguments.get("unbalanced_lettering_strategy", "none"))
-        elif name == "pennylane_unletter_ledger_entry_lines":
-            result = await journals.unletter_ledger_entry_lines(pennylane_client, arguments["ledger_entry_lines"],
-                                                               arguments.get("unbalanced_lettering_strategy", "none"))
-        
-        # BALANCE ET EXERCICES FISCAUX
-        elif name == "pennylane_get_trial_balance":
-            result = await journals.get_trial_balance(pennylane_client, **arguments)
-        elif name == "pennylane_list_fiscal_years":
-            result = await journals.list_fiscal_years(pennylane_client, 
-                                                     limit=arguments.get("limit", 20),
-                                                     page=arguments.get("page", 1))
-        
-        else:
-            return json.dumps({"error": f"Unknown tool: {name}"})
-        
-        return json.dumps(result, indent=2, ensure_ascii=False)
+        result = await dispatch(client or pennylane_client, name, arguments)
+        return dumps_text(result), False
     
+    except UnknownToolError as e:
+        return dumps_text({"error": str(e)}), True
+    except ToolValidationError as e:
+        logger.info(f"Rejected call to {name}: {e}")
+        return dumps_text({"error": str(e), "validation_errors": e.errors}), True
     except Exception as e:
         logger.error(f"Error calling tool {name}: {e}", exc_info=True)
-        return json.dumps({"error": str(e)})
+        return dumps_text({"error": str(e)}), True
+
+
+@app.on_event("startup")
+async def startup():
+    """Pick up messages forwarded by other workers to this worker's sessions."""
+    sessions.start(lambda session, payload: handle_tenant_payload(payload, session.api_key))
 
 
 @app.on_event("shutdown")
 async def shutdown():
     """Cleanup."""
-    await pennylane_client.close()
+    await sessions.stop()
+    await tenants.close()
+    await close_backends()
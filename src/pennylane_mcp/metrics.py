@@ -0,0 +1,234 @@
+"""Métriques internes du serveur MCP Pennylane, exposées au format Prometheus.
+
+Chaque processus a ses propres valeurs : avec plusieurs workers, `/metrics`
+renvoie celles du worker qui répond.
+"""
+import bisect
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+from typing import Iterator
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bornes (s) des histogrammes de latence
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Metric(ABC):
+    """Base des métriques : nom, description et étiquettes."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abstractmethod
+    def render(self) -> Iterator[str]:
+        """Lignes d'exposition Prometheus de la métrique."""
+
+
+class Counter(Metric):
+    """Compteur monotone, éventuellement étiqueté."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        """Incrémente le compteur pour les étiquettes données."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] += amount
+
+    def value(self, **labels: str) -> float:
+        """Valeur courante pour les étiquettes données."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[tuple[dict[str, str], float]]:
+        """Itère sur les couples (étiquettes, valeur)."""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield dict(zip(self.labelnames, key)), value
+
+    def render(self) -> Iterator[str]:
+        for labels, value in self.samples():
+            yield f"{self.name}{_labels(labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    """Valeur instantanée (appels en cours, ratio...)."""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        """Incrémente la jauge pendant la durée du bloc."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    """Distribution d'observations (latences) par intervalles cumulés."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Étiquettes -> [effectif par intervalle (+Inf compris), somme, nombre]
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def render(self) -> Iterator[str]:
+        with self._lock:
+            items = [(key, list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()]
+        for key, counts, total, count in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                yield f"{self.name}_bucket{_labels({**labels, 'le': le})} {cumulative}"
+            yield f"{self.name}_sum{_labels(labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(labels)} {count}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render() -> str:
+    """Toutes les métriques au format texte Prometheus 0.0.4."""
+    lines = []
+    for metric in REGISTRY:
+        help_text = metric.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+        lines.append(f"# HELP {metric.name} {help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY: list[Metric] = []
+
+RETRIES = Counter(
+    "pennylane_client_retries_total",
+    "Nouvelles tentatives de requêtes vers l'API Pennylane",
+    ("method", "reason"),
+)
+RETRIES_EXHAUSTED = Counter(
+    "pennylane_client_retries_exhausted_total",
+    "Requêtes abandonnées après épuisement des tentatives",
+    ("method", "reason"),
+)
+CACHE_HITS = Counter(
+    "pennylane_cache_hits_total",
+    "Lectures servies par le cache de réponses",
+    ("resource",),
+)
+CACHE_MISSES = Counter(
+    "pennylane_cache_misses_total",
+    "Lectures absentes du cache de réponses",
+    ("resource",),
+)
+COALESCED_REQUESTS = Counter(
+    "pennylane_client_coalesced_requests_total",
+    "Requêtes GET évitées en rejoignant une requête identique en cours",
+    ("resource",),
+)
+CONDITIONAL_HITS = Counter(
+    "pennylane_client_conditional_hits_total",
+    "GET conditionnels ayant reçu un 304 (corps resservi localement)",
+    ("resource",),
+)
+CONDITIONAL_MISSES = Counter(
+    "pennylane_client_conditional_misses_total",
+    "GET conditionnels dont la ressource avait changé",
+    ("resource",),
+)
+VALIDATIONS = Counter(
+    "pennylane_tool_validations_total",
+    "Validations locales des arguments d'outils",
+    ("tool", "result"),
+)
+VALIDATION_SECONDS = Counter(
+    "pennylane_tool_validation_seconds_total",
+    "Temps cumulé passé à valider les arguments d'outils",
+    ("tool",),
+)
+CACHE_HIT_RATIO = Gauge(
+    "pennylane_cache_hit_ratio",
+    "Part des lectures servies par le cache de réponses",
+    ("resource",),
+)
+TOOL_CALL_SECONDS = Histogram(
+    "pennylane_tool_call_duration_seconds",
+    "Durée des appels d'outils (validation, appels API et mise en forme du résultat)",
+    ("tool", "status"),
+)
+TOOL_CALLS_IN_FLIGHT = Gauge(
+    "pennylane_tool_calls_in_flight",
+    "Appels d'outils en cours",
+    ("tool",),
+)
+UPSTREAM_SECONDS = Histogram(
+    "pennylane_upstream_request_duration_seconds",
+    "Durée des requêtes HTTP vers l'API Pennylane (une observation par tentative)",
+    ("method", "endpoint", "status"),
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "pennylane_upstream_requests_in_flight",
+    "Requêtes HTTP vers l'API Pennylane en cours",
+)
+UPSTREAM_BYTES = Counter(
+    "pennylane_upstream_bytes_total",
+    "Octets échangés avec l'API Pennylane (direction in : reçus, out : envoyés)",
+    ("endpoint", "direction"),
+)
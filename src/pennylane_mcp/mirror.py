@@ -0,0 +1,494 @@
+"""Miroir local SQLite des données Pennylane, synchronisé de manière incrémentale.
+
+Chaque ressource (clients, fournisseurs, factures, transactions, écritures et
+lignes d'écriture) est copiée dans une table : l'objet complet en JSON
+(`data`) et quelques colonnes extraites pour les requêtes (dates, montants,
+identifiants liés, statut).
+
+Pour chaque ressource, un filigrane (`watermark`) retient le plus grand
+`updated_at` déjà copié ; la synchronisation suivante ne demande que les objets
+modifiés depuis (filtre `updated_at >= watermark`). L'état de synchronisation
+est conservé dans la table `sync_state`.
+
+Tous les accès à la connexion principale (`Mirror.run`) passent par un verrou
+et s'exécutent hors de la boucle d'événements : une synchronisation volumineuse
+ou un chargement FEC ne bloque pas les autres sessions, et deux threads
+n'utilisent jamais la connexion en même temps.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+from urllib.parse import quote
+
+from .client import PennylaneClient
+from .fec import describe_fec_table, ensure_fec_table
+from .pagination import Paginated
+from .tools import invoices, customers, suppliers, transactions, journals
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIRROR_PATH = "pennylane_mirror.db"
+
+# Nombre d'objets demandés par page lors de la synchronisation
+SYNC_PAGE_SIZE = 100
+
+# Colonnes indexées dans chaque table qui les possède
+INDEXED_COLUMNS = ("date", "customer_id", "supplier_id", "ledger_account_id", "status")
+
+# Garde-fous de pennylane_query
+QUERY_TIMEOUT = 2.0
+QUERY_MAX_ROWS = 1000
+# Requêtes compilées conservées par la connexion de lecture (cache du module sqlite3)
+QUERY_STATEMENT_CACHE = 256
+# Instructions SQLite exécutées entre deux vérifications du délai
+_PROGRESS_INTERVAL = 10_000
+
+# Opérations autorisées par la connexion de lecture ; tout le reste est refusé
+_READ_ONLY_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION,
+                      getattr(sqlite3, "SQLITE_RECURSIVE", 33)}
+
+# Fabrique d'itérateur : (client, filtre) -> Paginated
+Iterate = Callable[[PennylaneClient, str | None], Paginated]
+
+
+class MirroredResource:
+    """
+    Ressource copiée dans le miroir.
+
+    `columns` associe chaque colonne extraite à son type SQL et aux chemins
+    candidats dans l'objet de l'API (le premier non nul est retenu), par
+    exemple ("REAL", ("remaining_amount_with_tax", "remaining_amount")).
+    """
+
+    __slots__ = ("name", "iterate", "columns", "_paths")
+
+    def __init__(self, name: str, iterate: Iterate, columns: dict[str, tuple[str, tuple[str, ...]]]):
+        self.name = name
+        self.iterate = iterate
+        self.columns = columns
+        self._paths = [
+            [tuple(path.split(".")) for path in paths] for _, paths in columns.values()
+        ]
+
+    def index_statements(self) -> list[str]:
+        return [
+            f"CREATE INDEX IF NOT EXISTS idx_{self.name}_{column} ON {self.name} ({column})"
+            for column in INDEXED_COLUMNS if column in self.columns
+        ]
+
+    def create_statement(self) -> str:
+        extracted = "".join(f", {column} {sql_type}" for column, (sql_type, _) in self.columns.items())
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.name} "
+            f"(id INTEGER PRIMARY KEY, updated_at TEXT{extracted}, data TEXT NOT NULL)"
+        )
+
+    def upsert_statement(self) -> str:
+        names = ["id", "updated_at", *self.columns, "data"]
+        return f"INSERT OR REPLACE INTO {self.name} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+
+    def row(self, item: dict[str, Any]) -> tuple[Any, ...]:
+        """Ligne SQL pour un objet de l'API."""
+        values = [item.get("id"), item.get("updated_at")]
+        for (sql_type, _), candidates in zip(self.columns.values(), self._paths):
+            value = None
+            for path in candidates:
+                value = _lookup(item, path)
+                if value is not None:
+                    break
+            values.append(_coerce(value, sql_type))
+        values.append(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+        return tuple(values)
+
+
+def _lookup(item: Any, path: tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(item, dict):
+            return None
+        item = item.get(key)
+    return item
+
+
+def _coerce(value: Any, sql_type: str) -> Any:
+    if value is None:
+        return None
+    if sql_type == "REAL":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if sql_type == "INTEGER":
+        if isinstance(value, bool):
+            return int(value)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def updated_since_filter(watermark: str) -> str:
+    """Filtre API v2 (JSON) sur les objets modifiés depuis `watermark`."""
+    return json.dumps([{"field": "updated_at", "operator": "gteq", "value": watermark}])
+
+
+def _invoice_columns(party: str) -> dict[str, tuple[str, tuple[str, ...]]]:
+    return {
+        "invoice_number": ("TEXT", ("invoice_number",)),
+        "label": ("TEXT", ("label",)),
+        "date": ("TEXT", ("date",)),
+        "deadline": ("TEXT", ("deadline",)),
+        "status": ("TEXT", ("status",)),
+        "paid": ("INTEGER", ("paid",)),
+        f"{party}_id": ("INTEGER", (f"{party}.id", f"{party}_id")),
+        "currency": ("TEXT", ("currency",)),
+        "amount": ("REAL", ("amount", "currency_amount")),
+        "remaining_amount": ("REAL", ("remaining_amount_with_tax", "remaining_amount")),
+    }
+
+
+RESOURCES: dict[str, MirroredResource] = {
+    resource.name: resource for resource in (
+        MirroredResource(
+            "customers",
+            lambda client, filter_query: customers.iter_all_customers(
+                client, filter_query=filter_query, limit=SYNC_PAGE_SIZE),
+            {"name": ("TEXT", ("name",)), "customer_type": ("TEXT", ("customer_type",))},
+        ),
+        MirroredResource(
+            "suppliers",
+            lambda client, filter_query: suppliers.iter_all_suppliers(
+                client, filter_query=filter_query, limit=SYNC_PAGE_SIZE),
+            {"name": ("TEXT", ("name",))},
+        ),
+        MirroredResource(
+            "customer_invoices",
+            lambda client, filter_query: invoices.iter_all_customer_invoices(
+                client, filter_query=filter_query, limit=SYNC_PAGE_SIZE),
+            _invoice_columns("customer"),
+        ),
+        MirroredResource(
+            "supplier_invoices",
+            lambda client, filter_query: invoices.iter_all_supplier_invoices(
+                client, filter_query=filter_query, limit=SYNC_PAGE_SIZE),
+            _invoice_columns("supplier"),
+        ),
+        MirroredResource(
+            "transactions",
+            lambda client, filter_query: transactions.iter_all_transactions(
+                client, filter_query=filter_query, limit=SYNC_PAGE_SIZE),
+            {
+                "label": ("TEXT", ("label",)),
+                "date": ("TEXT", ("date",)),
+                "amount": ("REAL", ("amount", "currency_amount")),
+                "currency": ("TEXT", ("currency",)),
+                "bank_account_id": ("INTEGER", ("bank_account.id", "bank_account_id")),
+            },
+        ),
+        MirroredResource(
+            "ledger_entries",
+            lambda client, filter_query: journals.iter_all_ledger_entries(
+                client, filter_query=filter_query, limit=SYNC_PAGE_SIZE),
+            {
+                "label": ("TEXT", ("label",)),
+                "date": ("TEXT", ("date",)),
+                "journal_id": ("INTEGER", ("journal.id", "journal_id")),
+                "piece_number": ("TEXT", ("piece_number",)),
+            },
+        ),
+        MirroredResource(
+            "ledger_entry_lines",
+            lambda client, filter_query: journals.iter_all_ledger_entry_lines(
+                client, filter_query=filter_query, limit=SYNC_PAGE_SIZE),
+            {
+                "label": ("TEXT", ("label",)),
+                "date": ("TEXT", ("date", "ledger_entry.date")),
+                "ledger_entry_id": ("INTEGER", ("ledger_entry.id", "ledger_entry_id")),
+                "ledger_account_id": ("INTEGER", ("ledger_account.id", "ledger_account_id")),
+                "debit": ("REAL", ("debit",)),
+                "credit": ("REAL", ("credit",)),
+            },
+        ),
+    )
+}
+
+def describe_tables() -> str:
+    """Tables et colonnes du miroir, pour la description de pennylane_query."""
+    return "; ".join(
+        [f"{name}(id, updated_at, {', '.join(resource.columns)}, data)" for name, resource in RESOURCES.items()]
+        + [describe_fec_table()]
+    )
+
+
+_STATE_TABLE = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    resource TEXT PRIMARY KEY,
+    watermark TEXT,
+    last_started_at TEXT,
+    last_finished_at TEXT,
+    last_status TEXT,
+    last_error TEXT,
+    last_synced INTEGER,
+    last_duration REAL
+)
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def fetch_rows(db: sqlite3.Connection, sql: str,
+               params: tuple[Any, ...] | dict[str, Any] = ()) -> list[dict[str, Any]]:
+    """Exécute une requête de lecture et renvoie les lignes sous forme de dicts."""
+    return [dict(row) for row in db.execute(sql, params)]
+
+
+class Mirror:
+    """Base SQLite du miroir et moteur de synchronisation."""
+
+    def __init__(self, path: str = DEFAULT_MIRROR_PATH):
+        """
+        Args:
+            path: Fichier SQLite (":memory:" pour un miroir en mémoire)
+        """
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            for resource in RESOURCES.values():
+                self.db.execute(resource.create_statement())
+                for statement in resource.index_statements():
+                    self.db.execute(statement)
+            self.db.execute(_STATE_TABLE)
+        ensure_fec_table(self.db)
+        # Une seule synchronisation à la fois par ressource
+        self._locks = {name: asyncio.Lock() for name in RESOURCES}
+        # Accès exclusif à la connexion principale
+        self._db_lock = threading.Lock()
+        self._reader: sqlite3.Connection | None = None
+        self._reader_lock = threading.Lock()
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Exécute `function(db, *args)` sur la connexion principale, hors de la boucle d'événements."""
+        def locked():
+            with self._db_lock:
+                return function(self.db, *args)
+        return await asyncio.to_thread(locked)
+
+    def _read_connection(self) -> sqlite3.Connection:
+        """
+        Connexion dédiée aux requêtes libres : ouverte en lecture seule, avec
+        un autorisateur qui ne laisse passer que les lectures.
+        """
+        if self._reader is None:
+            if self.path == ":memory:":
+                reader = self.db  # une base en mémoire n'est visible que par sa connexion
+            else:
+                reader = sqlite3.connect(f"file:{quote(self.path)}?mode=ro", uri=True,
+                                         check_same_thread=False, cached_statements=QUERY_STATEMENT_CACHE)
+                reader.execute("PRAGMA query_only=ON")
+            self._reader = reader
+        return self._reader
+
+    def _run_query(self, sql: str, params: list[Any] | dict[str, Any], max_rows: int,
+                   timeout: float) -> dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        with self._reader_lock:
+            reader = self._read_connection()
+            reader.set_authorizer(
+                lambda action, *_: sqlite3.SQLITE_OK if action in _READ_ONLY_ACTIONS else sqlite3.SQLITE_DENY
+            )
+            reader.set_progress_handler(lambda: time.monotonic() > deadline, _PROGRESS_INTERVAL)
+            started = time.perf_counter()
+            try:
+                cursor = reader.execute(sql, params)
+                columns = [column[0] for column in cursor.description or ()]
+                rows = cursor.fetchmany(max_rows + 1)
+            except sqlite3.OperationalError as e:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Query exceeded {timeout}s timeout") from e
+                raise ValueError(f"Query rejected: {e}") from e
+            except sqlite3.DatabaseError as e:
+                raise ValueError(f"Query rejected: {e}") from e
+            finally:
+                reader.set_progress_handler(None, 0)
+                reader.set_authorizer(None)
+        return {
+            "columns": columns,
+            "rows": [list(row) for row in rows[:max_rows]],
+            "count": min(len(rows), max_rows),
+            "truncated": len(rows) > max_rows,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    async def query(self, sql: str, params: list[Any] | dict[str, Any] | None = None,
+                    max_rows: int = QUERY_MAX_ROWS, timeout: float = QUERY_TIMEOUT) -> dict[str, Any]:
+        """
+        Exécute une requête SQL en lecture seule sur le miroir.
+
+        La requête est refusée si elle tente autre chose qu'une lecture
+        (écriture, PRAGMA, ATTACH...) et interrompue au-delà de `timeout`
+        secondes ; au plus `max_rows` lignes sont renvoyées. Les requêtes
+        compilées sont réutilisées d'un appel à l'autre (paramètres liés
+        conseillés plutôt que des valeurs dans le texte SQL).
+        """
+        if self.path == ":memory:":
+            # Le lecteur est la connexion principale : même verrou que les autres accès
+            return await self.run(lambda _: self._run_query(sql, params or [], max_rows, timeout))
+        return await asyncio.to_thread(self._run_query, sql, params or [], max_rows, timeout)
+
+    @staticmethod
+    def _watermark(db: sqlite3.Connection, resource: str) -> str | None:
+        row = db.execute("SELECT watermark FROM sync_state WHERE resource = ?", (resource,)).fetchone()
+        return row["watermark"] if row else None
+
+    async def watermark(self, resource: str) -> str | None:
+        return await self.run(self._watermark, resource)
+
+    @staticmethod
+    def _write_state(db: sqlite3.Connection, resource: str, values: dict[str, Any]):
+        names = ", ".join(values)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in values)
+        with db:
+            db.execute(
+                f"INSERT INTO sync_state (resource, {names}) VALUES (?{', ?' * len(values)}) "
+                f"ON CONFLICT(resource) DO UPDATE SET {updates}",
+                (resource, *values.values()),
+            )
+
+    async def _set_state(self, resource: str, **values: Any):
+        await self.run(self._write_state, resource, values)
+
+    @staticmethod
+    def _upsert(db: sqlite3.Connection, statement: str, rows: list[tuple[Any, ...]]):
+        with db:
+            db.executemany(statement, rows)
+
+    async def sync_resource(self, client: PennylaneClient, name: str, full: bool = False) -> dict[str, Any]:
+        """
+        Synchronise une ressource et renvoie son rapport.
+
+        Args:
+            client: Client API
+            name: Nom de la ressource (voir RESOURCES)
+            full: Ignore le filigrane et recopie toute la ressource
+        """
+        resource = RESOURCES[name]
+        async with self._locks[name]:
+            watermark = None if full else await self.watermark(name)
+            started = time.perf_counter()
+            await self._set_state(name, last_started_at=_now(), last_status="running", last_error=None)
+            statement = resource.upsert_statement()
+            synced = 0
+            newest = watermark
+            pages = resource.iterate(client, updated_since_filter(watermark) if watermark else None).iter_pages()
+            try:
+                async for page in pages:
+                    rows = [resource.row(item) for item in page.get("items", [])]
+                    await self.run(self._upsert, statement, rows)
+                    synced += len(rows)
+                    for row in rows:
+                        if row[1] and (newest is None or row[1] > newest):
+                            newest = row[1]
+            except Exception as e:
+                # Le filigrane n'avance pas : les objets déjà copiés seront simplement recopiés
+                await self._set_state(name, last_finished_at=_now(), last_status="error", last_error=str(e),
+                                last_synced=synced, last_duration=time.perf_counter() - started)
+                logger.error(f"Mirror sync of {name} failed after {synced} objects: {e}")
+                raise
+            finally:
+                await pages.aclose()
+            duration = time.perf_counter() - started
+            await self._set_state(name, watermark=newest, last_finished_at=_now(), last_status="ok",
+                            last_synced=synced, last_duration=duration)
+            logger.info(f"Mirror sync of {name}: {synced} objects in {duration:.2f}s")
+            return {"resource": name, "synced": synced, "watermark": newest, "incremental": watermark is not None,
+                    "duration": round(duration, 3)}
+
+    async def sync(self, client: PennylaneClient, resources: list[str] | None = None,
+                   full: bool = False) -> dict[str, Any]:
+        """
+        Synchronise plusieurs ressources en parallèle (débit borné par le limiteur du client).
+
+        Returns:
+            {"resources": [rapport par ressource], "errors": {ressource: message}}
+        """
+        names = resources or list(RESOURCES)
+        unknown = [name for name in names if name not in RESOURCES]
+        if unknown:
+            raise ValueError(f"Unknown mirrored resources: {unknown}")
+        results = await asyncio.gather(
+            *(self.sync_resource(client, name, full) for name in names), return_exceptions=True
+        )
+        report: dict[str, Any] = {"resources": [], "errors": {}}
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                report["errors"][name] = str(result)
+            else:
+                report["resources"].append(result)
+        return report
+
+    def _status(self, db: sqlite3.Connection) -> dict[str, Any]:
+        states = {row["resource"]: dict(row) for row in db.execute("SELECT * FROM sync_state")}
+        resources = []
+        for name in RESOURCES:
+            count = db.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+            state = states.get(name, {"resource": name, "last_status": "never"})
+            resources.append({**state, "rows": count})
+        return {"path": self.path, "resources": resources}
+
+    async def status(self) -> dict[str, Any]:
+        """État de synchronisation et nombre de lignes de chaque ressource."""
+        return await self.run(self._status)
+
+    async def fetch(self, sql: str, params: tuple[Any, ...] | dict[str, Any] = ()) -> list[dict[str, Any]]:
+        """Exécute une requête de lecture et renvoie les lignes sous forme de dicts."""
+        return await self.run(fetch_rows, sql, params)
+
+    def close(self):
+        with self._db_lock:
+            if self._reader is not None and self._reader is not self.db:
+                self._reader.close()
+            self.db.close()
+
+
+# (fichier, entreprise) -> miroir ; l'entreprise distingue les miroirs en mémoire
+_mirrors: dict[tuple[str, str], Mirror] = {}
+_mirrors_lock = threading.Lock()
+
+
+def mirror_path(client: PennylaneClient) -> str:
+    """
+    Fichier du miroir d'une entreprise.
+
+    Le client de PENNYLANE_API_KEY utilise PENNYLANE_MIRROR_PATH ; en mode
+    multi-tenant, chaque autre clé API a son propre fichier, suffixé par son
+    identifiant (ex: pennylane_mirror-3f2a9c0d1b4e.db). Un miroir ":memory:"
+    reste en mémoire, un par entreprise.
+    """
+    path = os.getenv("PENNYLANE_MIRROR_PATH", DEFAULT_MIRROR_PATH)
+    if path == ":memory:" or client.api_key == os.getenv("PENNYLANE_API_KEY"):
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}-{client.tenant_id}{extension or '.db'}"
+
+
+def get_mirror(client: PennylaneClient) -> Mirror:
+    """Miroir de l'entreprise du client, ouvert au premier usage."""
+    path = mirror_path(client)
+    key = (path, client.tenant_id)
+    with _mirrors_lock:
+        mirror = _mirrors.get(key)
+        if mirror is None:
+            mirror = _mirrors[key] = Mirror(path)
+    return mirror
@@ -0,0 +1,173 @@
+"""Outils MCP `*_all` : listes complètes avec pagination automatique."""
+from typing import Any, Callable
+
+from .client import PennylaneClient
+from .pagination import Paginated
+from .projection import Projection
+from .streaming import current_reporter
+from .tools import invoices, customers, suppliers, quotes, transactions, accounting, journals
+
+DEFAULT_MAX_ITEMS = 1000
+DEFAULT_MAX_PAGES = 50
+
+
+def _schema(properties: dict[str, Any] | None = None, required: list[str] | None = None,
+            sortable: bool = True, filterable: bool = True) -> dict[str, Any]:
+    props: dict[str, Any] = dict(properties or {})
+    if filterable:
+        props["filter"] = {"type": "string", "description": "Filtres"}
+    if sortable:
+        props["sort"] = {"type": "string", "description": "Tri"}
+    props["max_items"] = {
+        "type": "integer",
+        "description": "Nombre maximal d'items renvoyés",
+        "default": DEFAULT_MAX_ITEMS,
+    }
+    props["max_pages"] = {
+        "type": "integer",
+        "description": "Nombre maximal de pages parcourues",
+        "default": DEFAULT_MAX_PAGES,
+    }
+    schema: dict[str, Any] = {"type": "object", "properties": props}
+    if required:
+        schema["required"] = required
+    return schema
+
+
+def _sort_filter(arguments: dict[str, Any]) -> dict[str, Any]:
+    kwargs = {"filter_query": arguments.get("filter")}
+    if arguments.get("sort"):
+        kwargs["sort"] = arguments["sort"]
+    return kwargs
+
+
+# nom de l'outil -> (description, schéma, fabrique du Paginated)
+_PAGINATED: dict[str, tuple[str, dict[str, Any], Callable[[PennylaneClient, dict[str, Any], int], Paginated]]] = {
+    "pennylane_list_customer_invoices_all": (
+        "Liste toutes les factures clients (pagination automatique)",
+        _schema(),
+        lambda client, args, max_pages: invoices.iter_all_customer_invoices(
+            client, max_pages=max_pages, **_sort_filter(args)),
+    ),
+    "pennylane_list_supplier_invoices_all": (
+        "Liste toutes les factures fournisseurs (pagination automatique)",
+        _schema(),
+        lambda client, args, max_pages: invoices.iter_all_supplier_invoices(
+            client, max_pages=max_pages, **_sort_filter(args)),
+    ),
+    "pennylane_list_customers_all": (
+        "Liste tous les clients (pagination automatique)",
+        _schema(),
+        lambda client, args, max_pages: customers.iter_all_customers(
+            client, max_pages=max_pages, **_sort_filter(args)),
+    ),
+    "pennylane_list_suppliers_all": (
+        "Liste tous les fournisseurs (pagination automatique)",
+        _schema(),
+        lambda client, args, max_pages: suppliers.iter_all_suppliers(
+            client, max_pages=max_pages, **_sort_filter(args)),
+    ),
+    "pennylane_list_quotes_all": (
+        "Liste tous les devis (pagination automatique)",
+        _schema(),
+        lambda client, args, max_pages: quotes.iter_all_quotes(
+            client, max_pages=max_pages, **_sort_filter(args)),
+    ),
+    "pennylane_list_transactions_all": (
+        "Liste toutes les transactions bancaires (pagination automatique)",
+        _schema(),
+        lambda client, args, max_pages: transactions.iter_all_transactions(
+            client, max_pages=max_pages, **_sort_filter(args)),
+    ),
+    "pennylane_list_categories_all": (
+        "Liste toutes les catégories comptables (pagination automatique)",
+        _schema(),
+        lambda client, args, max_pages: accounting.iter_all_categories(
+            client, max_pages=max_pages, **_sort_filter(args)),
+    ),
+    "pennylane_list_bank_accounts_all": (
+        "Liste tous les comptes bancaires (pagination automatique)",
+        _schema(filterable=False),
+        lambda client, args, max_pages: accounting.iter_all_bank_accounts(
+            client, max_pages=max_pages, sort=args.get("sort") or "-id"),
+    ),
+    "pennylane_list_journals_all": (
+        "Liste tous les journaux comptables (pagination automatique)",
+        _schema(),
+        lambda client, args, max_pages: journals.iter_all_journals(
+            client, max_pages=max_pages, **_sort_filter(args)),
+    ),
+    "pennylane_list_ledger_accounts_all": (
+        "Liste tous les comptes généraux (pagination automatique)",
+        _schema(sortable=False),
+        lambda client, args, max_pages: journals.iter_all_ledger_accounts(
+            client, max_pages=max_pages, filter_query=args.get("filter")),
+    ),
+    "pennylane_list_ledger_entries_all": (
+        "Liste toutes les écritures comptables (pagination automatique)",
+        _schema(),
+        lambda client, args, max_pages: journals.iter_all_ledger_entries(
+            client, max_pages=max_pages, **_sort_filter(args)),
+    ),
+    "pennylane_list_all_ledger_entry_lines_all": (
+        "Liste toutes les lignes d'écriture (pagination automatique)",
+        _schema(),
+        lambda client, args, max_pages: journals.iter_all_ledger_entry_lines(
+            client, max_pages=max_pages, **_sort_filter(args)),
+    ),
+    "pennylane_get_trial_balance_all": (
+        "Récupère la balance générale complète (pagination automatique)",
+        _schema(
+            {
+                "period_start": {"type": "string", "description": "Date de début (YYYY-MM-DD)"},
+                "period_end": {"type": "string", "description": "Date de fin (YYYY-MM-DD)"},
+                "is_auxiliary": {"type": "boolean", "description": "Balance auxiliaire", "default": False},
+            },
+            required=["period_start", "period_end"],
+            sortable=False,
+            filterable=False,
+        ),
+        lambda client, args, max_pages: journals.iter_all_trial_balance(
+            client, args["period_start"], args["period_end"],
+            is_auxiliary=args.get("is_auxiliary", False), max_pages=max_pages),
+    ),
+    "pennylane_list_fiscal_years_all": (
+        "Liste tous les exercices fiscaux (pagination automatique)",
+        _schema(sortable=False, filterable=False),
+        lambda client, args, max_pages: journals.iter_all_fiscal_years(client, max_pages=max_pages),
+    ),
+}
+
+PAGINATED_TOOLS: list[dict[str, Any]] = [
+    {"name": name, "description": description, "inputSchema": schema}
+    for name, (description, schema, _) in _PAGINATED.items()
+]
+
+
+async def call_paginated_tool(client: PennylaneClient, name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+    """
+    Exécute un outil `*_all` et renvoie la liste complète.
+
+    Si `fields` est fourni, chaque item est projeté à la réception de sa page :
+    les pages complètes ne sont pas conservées jusqu'à la fin de la collecte.
+    Si l'appel est diffusé en flux (voir streaming), chaque page est aussi
+    signalée au reporter ; avec les résultats partiels, les items sont
+    envoyés page par page et la réponse finale n'en contient plus
+    (`"streamed": true`).
+
+    Returns:
+        {"items": [...], "count": n, "pages": p, "truncated": bool}
+    """
+    _, _, factory = _PAGINATED[name]
+    max_items = arguments.get("max_items", DEFAULT_MAX_ITEMS)
+    max_pages = arguments.get("max_pages", DEFAULT_MAX_PAGES)
+    fields = arguments.get("fields")
+    transform = Projection(fields).item if fields else None
+    paginated = factory(client, arguments, max_pages)
+    reporter = current_reporter()
+    if reporter is None:
+        return await paginated.collect(max_items, transform)
+    result = await paginated.collect(max_items, transform, reporter.on_page, keep_items=not reporter.partial)
+    if reporter.partial:
+        result["streamed"] = True
+    return result
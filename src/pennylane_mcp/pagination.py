@@ -0,0 +1,168 @@
+"""Pagination automatique des listes de l'API Pennylane."""
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+# Récupère une page à partir d'un curseur (None pour la première) ou d'un numéro de page
+PageFetcher = Callable[[Any], Awaitable[dict[str, Any]]]
+
+# Appelé après chaque page avec ses items (transformés) et l'itérateur
+PageCallback = Callable[[list[Any], "Paginated"], Awaitable[None]]
+
+# Pages numérotées demandées simultanément une fois le nombre total connu
+DEFAULT_PAGE_CONCURRENCY = 4
+
+
+def page_has_more(page: dict[str, Any]) -> bool:
+    """Indique si une page (à curseur ou numérotée) a des pages suivantes."""
+    if "has_more" in page:
+        return bool(page["has_more"]) and bool(page.get("next_cursor"))
+    current = page.get("current_page")
+    total = page.get("total_pages")
+    return current is not None and total is not None and current < total
+
+
+class Paginated:
+    """
+    Itérateur asynchrone sur tous les items d'une liste, toutes pages confondues.
+
+    La page suivante est demandée dès que la page courante est reçue, pendant
+    que l'appelant consomme ses items. Deux modes sont gérés :
+    - "cursor" : réponses {"items", "has_more", "next_cursor"}
+    - "page" : réponses {"items", "current_page", "total_pages"}
+
+    En mode "page", dès que la première page donne le nombre total de pages,
+    les suivantes sont demandées en parallèle (fenêtre de `concurrency` pages)
+    et restituées dans l'ordre. Le débit reste borné par le limiteur du client.
+    """
+
+    def __init__(
+        self,
+        fetch_page: PageFetcher,
+        mode: str = "cursor",
+        max_pages: Optional[int] = None,
+        concurrency: int = DEFAULT_PAGE_CONCURRENCY,
+    ):
+        """
+        Args:
+            fetch_page: Fonction renvoyant une page pour un curseur ou un numéro de page
+            mode: "cursor" ou "page"
+            max_pages: Nombre maximal de pages à parcourir (None = toutes)
+            concurrency: Pages numérotées demandées simultanément (mode "page")
+        """
+        if mode not in ("cursor", "page"):
+            raise ValueError(f"Unknown pagination mode: {mode}")
+        self.fetch_page = fetch_page
+        self.mode = mode
+        self.max_pages = max_pages
+        self.concurrency = max(1, concurrency)
+        self.pages = 0
+        self.has_more = False
+
+    def _next_token(self, page: dict[str, Any]) -> Any:
+        if self.mode == "cursor":
+            return page.get("next_cursor")
+        return page.get("current_page", self.pages) + 1
+
+    def iter_pages(self) -> AsyncIterator[dict[str, Any]]:
+        """Itère sur les pages brutes, dans l'ordre."""
+        if self.mode == "page" and self.concurrency > 1:
+            return self._iter_numbered_pages()
+        return self._iter_sequential_pages()
+
+    async def _iter_sequential_pages(self) -> AsyncIterator[dict[str, Any]]:
+        """Récupère les pages une à une en préchargeant la suivante."""
+        self.pages = 0
+        next_task: Optional[asyncio.Task] = asyncio.ensure_future(
+            self.fetch_page(None if self.mode == "cursor" else 1)
+        )
+        try:
+            while next_task is not None:
+                page = await next_task
+                next_task = None
+                self.pages += 1
+                self.has_more = page_has_more(page)
+                if self.has_more and (self.max_pages is None or self.pages < self.max_pages):
+                    next_task = asyncio.ensure_future(self.fetch_page(self._next_token(page)))
+                yield page
+        finally:
+            if next_task is not None:
+                next_task.cancel()
+
+    async def _iter_numbered_pages(self) -> AsyncIterator[dict[str, Any]]:
+        """Récupère la page 1, puis les pages 2..N en parallèle et dans l'ordre."""
+        self.pages = 0
+        first = await self.fetch_page(1)
+        self.pages = 1
+        total = first.get("total_pages") or 1
+        last = total if self.max_pages is None else min(total, self.max_pages)
+        self.has_more = total > 1
+        yield first
+
+        window: deque[asyncio.Task] = deque()
+        next_number = 2
+        try:
+            while next_number <= last or window:
+                while next_number <= last and len(window) < self.concurrency:
+                    window.append(asyncio.ensure_future(self.fetch_page(next_number)))
+                    next_number += 1
+                page = await window.popleft()
+                self.pages += 1
+                self.has_more = self.pages < total
+                yield page
+        finally:
+            for task in window:
+                task.cancel()
+
+    async def _iter_items(self) -> AsyncIterator[dict[str, Any]]:
+        async for page in self.iter_pages():
+            for item in page.get("items", []):
+                yield item
+
+    def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        return self._iter_items()
+
+    async def collect(
+        self,
+        max_items: Optional[int] = None,
+        transform: Optional[Callable[[Any], Any]] = None,
+        on_page: Optional[PageCallback] = None,
+        keep_items: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Rassemble les items de toutes les pages.
+
+        Args:
+            max_items: Nombre maximal d'items (None = tous)
+            transform: Fonction appliquée à chaque item au fil des pages (ex: projection)
+            on_page: Coroutine appelée avec les items de chaque page dès sa réception
+            keep_items: Conserve les items dans le résultat (False si `on_page` les consomme)
+
+        Returns:
+            {"items": [...], "count": n, "pages": p, "truncated": bool}
+            `truncated` indique qu'il restait des items au-delà des limites.
+        """
+        items: list[dict[str, Any]] = []
+        count = 0
+        truncated = False
+        pages = self.iter_pages()
+        try:
+            async for page in pages:
+                chunk = []
+                for item in page.get("items", []):
+                    if max_items is not None and count >= max_items:
+                        truncated = True
+                        break
+                    chunk.append(item if transform is None else transform(item))
+                    count += 1
+                if keep_items:
+                    items.extend(chunk)
+                if on_page is not None:
+                    await on_page(chunk, self)
+                if truncated:
+                    break
+            else:
+                truncated = self.has_more
+        finally:
+            await pages.aclose()
+        return {"items": items, "count": count, "pages": self.pages, "truncated": truncated}
@@ -0,0 +1,85 @@
+"""Projection des résultats d'outils sur une liste de champs (`fields`).
+
+Les chemins pointés (`customer.name`) sont compilés en arbre une seule fois
+par appel. La projection ne construit de nouveaux dicts/listes que le long
+des chemins demandés : les valeurs retenues sont partagées avec la réponse
+d'origine, qui n'est ni copiée en profondeur ni modifiée (elle peut provenir
+du cache).
+"""
+from typing import Any, Iterable
+
+# Propriété ajoutée au schéma de chaque outil
+FIELDS_PROPERTY = {
+    "type": "array",
+    "items": {"type": "string"},
+    "description": (
+        "Champs à conserver dans le résultat, chemins pointés acceptés "
+        "(ex: ['id', 'invoice_number', 'customer.name']). Pour une liste, "
+        "s'applique à chaque item."
+    ),
+}
+
+# Tree: nom de champ -> sous-arbre, ou None pour conserver la valeur entière
+FieldTree = dict[str, Any]
+
+
+def compile_fields(fields: Iterable[str]) -> FieldTree:
+    """Compile des chemins pointés en arbre de projection."""
+    tree: FieldTree = {}
+    for path in fields:
+        node = tree
+        parts = [part for part in path.split(".") if part]
+        for index, part in enumerate(parts):
+            last = index == len(parts) - 1
+            if part in node and node[part] is None:
+                break  # un parent est déjà conservé en entier
+            if last:
+                node[part] = None
+            else:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def project(value: Any, tree: FieldTree | None) -> Any:
+    """Projette une valeur : les dicts sont filtrés, les listes projetées élément par élément."""
+    if tree is None:
+        return value
+    if isinstance(value, dict):
+        return {key: project(value[key], subtree) for key, subtree in tree.items() if key in value}
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    return value
+
+
+class Projection:
+    """Projection compilée d'un appel d'outil."""
+
+    __slots__ = ("tree",)
+
+    def __init__(self, fields: Iterable[str]):
+        self.tree = compile_fields(fields)
+
+    def item(self, item: Any) -> Any:
+        """Projette un item de liste."""
+        return project(item, self.tree)
+
+    def apply(self, result: Any) -> Any:
+        """
+        Projette un résultat d'outil.
+
+        Pour une réponse de liste ({"items": [...], ...}), la projection
+        s'applique à chaque item et les métadonnées (curseur, pagination,
+        compteurs) sont conservées telles quelles.
+        """
+        if isinstance(result, dict) and isinstance(result.get("items"), list):
+            projected = dict(result)
+            projected["items"] = [project(item, self.tree) for item in result["items"]]
+            return projected
+        return project(result, self.tree)
+
+
+def add_fields_property(tools: list[dict[str, Any]]):
+    """Ajoute l'argument `fields` au schéma de chaque outil."""
+    for tool in tools:
+        schema = tool["inputSchema"]
+        schema.setdefault("properties", {}).setdefault("fields", FIELDS_PROPERTY)
@@ -0,0 +1,109 @@
+"""Ordonnancement des requêtes selon les quotas de l'API Pennylane."""
+import asyncio
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _header_number(headers: Mapping[str, str], *names: str) -> Optional[float]:
+    """Retourne la première valeur numérique trouvée parmi les en-têtes donnés."""
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Convertit un en-tête Retry-After en nombre de secondes à attendre.
+
+    Accepte un nombre de secondes ou une date HTTP.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RateLimiter:
+    """
+    Seau à jetons asynchrone partagé par toutes les requêtes d'un client.
+
+    Les appelants en excès sont mis en file d'attente dans leur ordre d'arrivée
+    (asyncio.Lock est FIFO). Le quota est recalé sur les en-têtes `ratelimit-*`
+    renvoyés par l'API et suspendu après un 429.
+    """
+
+    def __init__(self, rate: int = 25, period: float = 5.0):
+        """
+        Args:
+            rate: Nombre de requêtes autorisées par période
+            period: Durée de la période en secondes
+        """
+        self.capacity = float(rate)
+        self.period = period
+        self.tokens = float(rate)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def refill_rate(self) -> float:
+        """Jetons regagnés par seconde."""
+        return self.capacity / self.period
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+
+    async def acquire(self):
+        """Attend qu'un jeton soit disponible puis le consomme."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.refill_rate)
+
+    def block_for(self, seconds: float):
+        """Suspend toutes les requêtes pendant `seconds` secondes."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Recale le seau sur les en-têtes de quota renvoyés par l'API."""
+        limit = _header_number(headers, "ratelimit-limit", "x-ratelimit-limit")
+        remaining = _header_number(headers, "ratelimit-remaining", "x-ratelimit-remaining")
+        reset = _header_number(headers, "ratelimit-reset", "x-ratelimit-reset")
+
+        if limit and limit != self.capacity:
+            logger.info(f"Rate limit updated from headers: {limit:g} requests / {self.period:g}s")
+            self.capacity = limit
+        if remaining is not None:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, remaining)
+            if remaining <= 0 and reset:
+                # Valeur relative (secondes) ou timestamp absolu selon les versions de l'API
+                wait = reset - time.time() if reset > 1_000_000_000 else reset
+                self.block_for(max(0.0, wait))
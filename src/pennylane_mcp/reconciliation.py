@@ -0,0 +1,227 @@
+"""Rapprochement transactions bancaires ↔ factures ouvertes.
+
+Le moteur indexe les factures par montant restant (liste triée, recherche par
+dichotomie dans la fenêtre de tolérance) puis filtre les candidats par fenêtre
+de dates. Chaque paire candidate reçoit un score entre 0 et 1 :
+
+- montant : 1 pour un montant identique, décroissant jusqu'à la tolérance ;
+- date : 1 si la transaction tombe entre la date et l'échéance de la facture,
+  décroissant jusqu'à `date_window_days` jours d'écart ;
+- libellé : recouvrement des mots du libellé de la transaction avec le numéro,
+  le libellé et la contrepartie de la facture (1 si le numéro y figure).
+
+Les propositions sont ensuite attribuées de façon gloutonne par score
+décroissant, chaque transaction et chaque facture n'étant utilisée qu'une fois.
+"""
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any, Iterable
+
+# Pondération des composantes du score
+AMOUNT_WEIGHT = 0.5
+DATE_WEIGHT = 0.2
+LABEL_WEIGHT = 0.3
+
+DEFAULT_AMOUNT_TOLERANCE = Decimal("1.00")
+DEFAULT_DATE_WINDOW_DAYS = 60
+DEFAULT_MIN_SCORE = 0.5
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Mots trop courants dans les libellés bancaires pour être discriminants
+_STOPWORDS = frozenset({"vir", "virement", "sepa", "prlv", "prelevement", "cb", "carte", "facture",
+                        "fact", "inv", "invoice", "ref", "the", "les", "des", "sas", "sarl", "eurl"})
+
+
+def _normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _tokens(*texts: str | None) -> frozenset[str]:
+    words = set()
+    for text in texts:
+        if text:
+            words.update(word for word in _WORD.findall(_normalize(text))
+                         if len(word) >= 3 and word not in _STOPWORDS)
+    return frozenset(words)
+
+
+def _cents(value: Any) -> int | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int((Decimal(str(value)) * 100).to_integral_value())
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _ordinal(value: Any) -> int | None:
+    if not isinstance(value, str) or len(value) < 10:
+        return None
+    try:
+        return date.fromisoformat(value[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+def _first(item: dict[str, Any], *keys: str) -> Any:
+    for key in keys:
+        if item.get(key) is not None:
+            return item[key]
+    return None
+
+
+def _counterparty_name(invoice: dict[str, Any]) -> str | None:
+    for key in ("customer", "supplier", "thirdparty"):
+        party = invoice.get(key)
+        if isinstance(party, dict) and party.get("name"):
+            return party["name"]
+    return invoice.get("counterparty_name")
+
+
+def is_open_invoice(invoice: dict[str, Any]) -> bool:
+    """Facture restant à régler (montant restant positif, ou non payée si absent)."""
+    remaining = _cents(_first(invoice, "remaining_amount_with_tax", "remaining_amount"))
+    if remaining is not None:
+        return remaining != 0
+    return not invoice.get("paid", False)
+
+
+def is_unmatched_transaction(transaction: dict[str, Any]) -> bool:
+    """Transaction sans facture associée (d'après les champs disponibles)."""
+    matched = transaction.get("matched_invoices")
+    if isinstance(matched, list) and matched:
+        return False
+    outstanding = _cents(transaction.get("outstanding_balance"))
+    return outstanding is None or outstanding != 0
+
+
+class _Invoice:
+    __slots__ = ("id", "cents", "start", "end", "tokens", "reference", "number")
+
+    def __init__(self, invoice: dict[str, Any]):
+        self.id = invoice["id"]
+        self.cents = abs(_cents(_first(invoice, "remaining_amount_with_tax", "remaining_amount",
+                                        "amount", "currency_amount")) or 0)
+        self.start = _ordinal(invoice.get("date"))
+        self.end = _ordinal(invoice.get("deadline")) or self.start
+        self.number = invoice.get("invoice_number")
+        self.reference = "".join(_WORD.findall(_normalize(self.number))) if self.number else ""
+        self.tokens = _tokens(self.number, invoice.get("label"), _counterparty_name(invoice))
+
+
+class ReconciliationEngine:
+    """Index des factures ouvertes et calcul des propositions de rapprochement."""
+
+    def __init__(
+        self,
+        invoices: Iterable[dict[str, Any]],
+        amount_tolerance: Decimal | str | float = DEFAULT_AMOUNT_TOLERANCE,
+        date_window_days: int = DEFAULT_DATE_WINDOW_DAYS,
+    ):
+        """
+        Args:
+            invoices: Factures ouvertes (objets de l'API)
+            amount_tolerance: Écart de montant accepté (en devise)
+            date_window_days: Écart de dates accepté hors de [date, échéance] (jours)
+        """
+        indexed = sorted((_Invoice(invoice) for invoice in invoices), key=lambda invoice: invoice.cents)
+        self._invoices = indexed
+        self._amounts = [invoice.cents for invoice in indexed]
+        self.tolerance = abs(_cents(amount_tolerance) or 0)
+        self.date_window_days = date_window_days
+
+    def __len__(self) -> int:
+        return len(self._invoices)
+
+    def _score(self, cents: int, day: int | None, tokens: frozenset[str], text: str,
+               invoice: _Invoice) -> tuple[float, dict[str, float]] | None:
+        difference = abs(invoice.cents - cents)
+        amount_score = 1.0 - difference / (self.tolerance + 1)
+
+        if day is None or invoice.start is None:
+            date_score = 0.5
+        else:
+            gap = invoice.start - day if day < invoice.start else max(0, day - invoice.end)
+            if gap > self.date_window_days:
+                return None
+            date_score = 1.0 - gap / (self.date_window_days + 1)
+
+        if invoice.reference and len(invoice.reference) >= 4 and invoice.reference in text:
+            label_score = 1.0
+        elif tokens and invoice.tokens:
+            label_score = len(tokens & invoice.tokens) / len(tokens | invoice.tokens)
+        else:
+            label_score = 0.0
+
+        score = AMOUNT_WEIGHT * amount_score + DATE_WEIGHT * date_score + LABEL_WEIGHT * label_score
+        return score, {"amount": round(amount_score, 3), "date": round(date_score, 3), "label": round(label_score, 3)}
+
+    def candidates(self, transaction: dict[str, Any], min_score: float = DEFAULT_MIN_SCORE,
+                   limit: int = 3) -> list[dict[str, Any]]:
+        """Factures candidates pour une transaction, par score décroissant."""
+        cents = abs(_cents(_first(transaction, "amount", "currency_amount")) or 0)
+        day = _ordinal(transaction.get("date"))
+        label = transaction.get("label") or ""
+        tokens = _tokens(label)
+        text = "".join(_WORD.findall(_normalize(label)))
+        low = bisect_left(self._amounts, cents - self.tolerance)
+        high = bisect_right(self._amounts, cents + self.tolerance)
+        scored = []
+        for invoice in self._invoices[low:high]:
+            result = self._score(cents, day, tokens, text, invoice)
+            if result is not None and result[0] >= min_score:
+                scored.append((result[0], invoice, result[1]))
+        scored.sort(key=lambda candidate: -candidate[0])
+        return [
+            {"invoice_id": invoice.id, "invoice_number": invoice.number, "score": round(score, 3), "details": details}
+            for score, invoice, details in scored[:limit]
+        ]
+
+    def propose(self, transactions: Iterable[dict[str, Any]], min_score: float = DEFAULT_MIN_SCORE,
+                alternatives: int = 3) -> dict[str, Any]:
+        """
+        Propose un rapprochement un-pour-un entre transactions et factures.
+
+        Returns:
+            {"proposals": [...], "unmatched_transactions": n, "examined": n}
+            Chaque proposition contient la facture retenue et les alternatives.
+        """
+        ranked = []
+        examined = 0
+        for transaction in transactions:
+            examined += 1
+            candidates = self.candidates(transaction, min_score, alternatives + 1)
+            if candidates:
+                ranked.append((transaction, candidates))
+
+        # Attribution gloutonne : meilleures paires d'abord, chaque facture une seule fois
+        pairs = sorted(
+            ((candidate["score"], index, candidate) for index, (_, candidates) in enumerate(ranked)
+             for candidate in candidates),
+            key=lambda pair: -pair[0],
+        )
+        assigned: dict[int, dict[str, Any]] = {}
+        used_invoices: set[Any] = set()
+        for _, index, candidate in pairs:
+            if index in assigned or candidate["invoice_id"] in used_invoices:
+                continue
+            assigned[index] = candidate
+            used_invoices.add(candidate["invoice_id"])
+
+        proposals = []
+        for index, candidate in assigned.items():
+            transaction, candidates = ranked[index]
+            proposals.append({
+                "transaction_id": transaction.get("id"),
+                "transaction_label": transaction.get("label"),
+                "transaction_date": transaction.get("date"),
+                "transaction_amount": transaction.get("amount"),
+                **candidate,
+                "alternatives": [other for other in candidates if other is not candidate][:alternatives],
+            })
+        proposals.sort(key=lambda proposal: -proposal["score"])
+        return {"proposals": proposals, "unmatched_transactions": examined - len(proposals), "examined": examined}
@@ -0,0 +1,299 @@
+"""Registre des outils MCP partagé par tous les serveurs.
+
+Chaque outil associe un nom à son schéma (ALL_TOOLS), à la fonction de
+`tools/` qui l'exécute et à un adaptateur qui convertit les arguments MCP
+en arguments Python. Un nouvel outil s'ajoute dans ALL_TOOLS et dans
+_HANDLERS ; la répartition est une simple recherche dans un dict.
+"""
+import time
+import logging
+from typing import Any, Awaitable, Callable
+
+from .client import PennylaneClient
+from .metrics import TOOL_CALL_SECONDS, TOOL_CALLS_IN_FLIGHT, VALIDATIONS, VALIDATION_SECONDS
+from .validation import ToolValidationError, Validator, compile_schema
+from .all_tools_definition import ALL_TOOLS
+from .paginated_tools import PAGINATED_TOOLS, call_paginated_tool
+from .projection import Projection
+from .shaping import ResponseShaper, resolve_continuation
+from .tools import bulk, invoices, customers, suppliers, quotes, transactions, accounting, journals, lettering, mirror, reconciliation, fec
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[..., Awaitable[Any]]
+# Convertit les arguments MCP en (args positionnels, kwargs) pour le handler
+Adapter = Callable[[dict[str, Any]], tuple[tuple[Any, ...], dict[str, Any]]]
+
+
+class ToolSpec:
+    """Définition d'un outil : schéma, validateur compilé, handler et adaptateur d'arguments."""
+
+    __slots__ = ("name", "description", "input_schema", "handler", "adapter", "validator", "projects_fields")
+
+    def __init__(self, name: str, description: str, input_schema: dict[str, Any],
+                 handler: Handler, adapter: Adapter, projects_fields: bool = False):
+        self.name = name
+        self.description = description
+        self.input_schema = input_schema
+        self.handler = handler
+        self.adapter = adapter
+        self.validator: Validator = compile_schema(input_schema)
+        # Le handler applique lui-même `fields` (projection au fil des pages)
+        self.projects_fields = projects_fields
+
+    def definition(self) -> dict[str, Any]:
+        """Définition MCP de l'outil (name, description, inputSchema)."""
+        return {"name": self.name, "description": self.description, "inputSchema": self.input_schema}
+
+    def validate(self, arguments: dict[str, Any]):
+        """Valide les arguments localement ; lève ToolValidationError s'ils sont invalides."""
+        started = time.perf_counter()
+        errors = self.validator(arguments, "")
+        elapsed = time.perf_counter() - started
+        VALIDATION_SECONDS.inc(elapsed, tool=self.name)
+        VALIDATIONS.inc(tool=self.name, result="invalid" if errors else "valid")
+        logger.debug(f"Validated arguments for {self.name} in {elapsed * 1e6:.1f}µs")
+        if errors:
+            raise ToolValidationError(self.name, errors)
+
+    async def __call__(self, client: PennylaneClient, arguments: dict[str, Any]) -> Any:
+        args, kwargs = self.adapter(arguments)
+        return await self.handler(client, *args, **kwargs)
+
+
+# ==================== ADAPTATEURS ====================
+
+def _passthrough(arguments: dict[str, Any]) -> tuple[tuple[Any, ...], dict[str, Any]]:
+    """Transmet les arguments tels quels en kwargs."""
+    return (), dict(arguments)
+
+
+def _by_id(key: str) -> Adapter:
+    """Transmet un identifiant en argument positionnel."""
+    return lambda arguments: ((arguments[key],), {})
+
+
+def _renamed(**renames: str) -> Adapter:
+    """Transmet les arguments en renommant certaines clés (ex: filter -> filter_query)."""
+    def adapt(arguments: dict[str, Any]) -> tuple[tuple[Any, ...], dict[str, Any]]:
+        return (), {renames.get(key, key): value for key, value in arguments.items()}
+    return adapt
+
+
+def _cursor_list(limit: int, sort: str) -> Adapter:
+    """Arguments d'une liste paginée par curseur (limit, cursor, filter, sort)."""
+    def adapt(arguments: dict[str, Any]) -> tuple[tuple[Any, ...], dict[str, Any]]:
+        return (), {
+            "limit": arguments.get("limit", limit),
+            "cursor": arguments.get("cursor"),
+            "filter_query": arguments.get("filter"),
+            "sort": arguments.get("sort", sort),
+        }
+    return adapt
+
+
+def _with(**fixed: Any) -> Adapter:
+    """Transmet les arguments en ajoutant des valeurs fixes."""
+    return lambda arguments: ((), {**arguments, **fixed})
+
+
+def _pick(*names: str) -> Adapter:
+    """Ne transmet que les arguments listés."""
+    return lambda arguments: ((), {name: arguments[name] for name in names if name in arguments})
+
+
+def _paginated(name: str) -> tuple[Handler, Adapter]:
+    return call_paginated_tool, lambda arguments: ((name, arguments), {})
+
+
+_HANDLERS: dict[str, tuple[Handler, Adapter]] = {
+    # FACTURES CLIENTS
+    "pennylane_list_customer_invoices": (invoices.list_customer_invoices, _cursor_list(20, "-id")),
+    "pennylane_get_customer_invoice": (invoices.get_customer_invoice, _by_id("invoice_id")),
+    "pennylane_create_customer_invoice": (invoices.create_customer_invoice, _passthrough),
+    "pennylane_bulk_create_customer_invoices": (
+        bulk.bulk_create_customer_invoices, _renamed(invoices="invoices_data")),
+    "pennylane_finalize_customer_invoice": (invoices.finalize_customer_invoice, _by_id("invoice_id")),
+    "pennylane_send_customer_invoice_email": (invoices.send_customer_invoice_by_email, _passthrough),
+    "pennylane_categorize_customer_invoice": (invoices.categorize_invoice, _with(invoice_type="customer")),
+    # FACTURES FOURNISSEURS
+    "pennylane_list_supplier_invoices": (invoices.list_supplier_invoices, _cursor_list(20, "-id")),
+    "pennylane_get_supplier_invoice": (invoices.get_supplier_invoice, _by_id("invoice_id")),
+    "pennylane_categorize_supplier_invoice": (invoices.categorize_invoice, _with(invoice_type="supplier")),
+    # CLIENTS
+    "pennylane_list_customers": (customers.list_customers, _cursor_list(20, "-id")),
+    "pennylane_get_customer": (customers.get_customer, _by_id("customer_id")),
+    "pennylane_get_company_customer": (customers.get_company_customer, _by_id("customer_id")),
+    "pennylane_get_individual_customer": (customers.get_individual_customer, _by_id("customer_id")),
+    "pennylane_create_customer": (customers.create_customer, _passthrough),
+    "pennylane_create_company_customer": (customers.create_company_customer, _pick(
+        "name", "billing_address", "payment_conditions", "billing_language", "emails", "phone",
+        "vat_number", "reg_no", "billing_iban", "recipient", "reference", "notes",
+        "external_reference", "delivery_address", "ledger_account",
+    )),
+    "pennylane_create_individual_customer": (customers.create_individual_customer, _pick(
+        "first_name", "last_name", "billing_address", "payment_conditions", "billing_language",
+        "emails", "phone", "billing_iban", "recipient", "reference", "notes",
+        "external_reference", "delivery_address", "ledger_account",
+    )),
+    # DEVIS
+    "pennylane_list_quotes": (quotes.list_quotes, _cursor_list(30, "-id")),
+    "pennylane_get_quote": (quotes.get_quote, _by_id("quote_id")),
+    "pennylane_list_quote_invoice_line_sections": (quotes.list_quote_invoice_line_sections, _passthrough),
+    "pennylane_list_quote_appendices": (quotes.list_quote_appendices, _passthrough),
+    "pennylane_create_quote": (quotes.create_quote, _pick(
+        "customer_id", "invoice_lines", "date", "deadline", "currency", "language",
+        "discount", "invoice_line_sections", "quote_template_id", "pdf_invoice_free_text",
+        "pdf_invoice_subject", "pdf_description", "special_mention", "external_reference",
+    )),
+    "pennylane_update_quote": (quotes.update_quote, _passthrough),
+    "pennylane_update_quote_status": (quotes.update_quote_status, _passthrough),
+    # FOURNISSEURS
+    "pennylane_list_suppliers": (suppliers.list_suppliers, _cursor_list(20, "-id")),
+    "pennylane_get_supplier": (suppliers.get_supplier, _by_id("supplier_id")),
+    "pennylane_create_supplier": (suppliers.create_supplier, _passthrough),
+    # TRANSACTIONS
+    "pennylane_list_transactions": (transactions.list_transactions, _cursor_list(20, "-date")),
+    "pennylane_get_transaction": (transactions.get_transaction, _by_id("transaction_id")),
+    "pennylane_create_transaction": (transactions.create_transaction, _passthrough),
+    "pennylane_update_transaction": (transactions.update_transaction, _passthrough),
+    "pennylane_categorize_transaction": (transactions.categorize_transaction, _passthrough),
+    "pennylane_match_transaction_to_customer_invoice": (
+        transactions.match_transaction_to_customer_invoice, _passthrough),
+    "pennylane_unmatch_transaction_from_customer_invoice": (
+        transactions.unmatch_transaction_from_customer_invoice, _passthrough),
+    "pennylane_match_transaction_to_supplier_invoice": (
+        transactions.match_transaction_to_supplier_invoice, _passthrough),
+    "pennylane_unmatch_transaction_from_supplier_invoice": (
+        transactions.unmatch_transaction_from_supplier_invoice, _passthrough),
+    # COMPTABILITÉ
+    "pennylane_list_categories": (accounting.list_categories, _cursor_list(100, "-id")),
+    "pennylane_list_bank_accounts": (accounting.list_bank_accounts, _passthrough),
+    # JOURNAUX COMPTABLES
+    "pennylane_list_journals": (journals.list_journals, _renamed(filter="filter_query")),
+    "pennylane_get_journal": (journals.get_journal, _by_id("journal_id")),
+    "pennylane_create_journal": (journals.create_journal, _passthrough),
+    # COMPTES GÉNÉRAUX
+    "pennylane_list_ledger_accounts": (accounting.list_ledger_accounts, _renamed(filter="filter_query")),
+    "pennylane_get_ledger_account": (journals.get_ledger_account, _by_id("account_id")),
+    "pennylane_create_ledger_account": (journals.create_ledger_account, _passthrough),
+    # ÉCRITURES COMPTABLES
+    "pennylane_list_ledger_entries": (journals.list_ledger_entries, _renamed(filter="filter_query")),
+    "pennylane_list_ledger_entry_lines": (journals.list_ledger_entry_lines, _passthrough),
+    "pennylane_create_ledger_entry": (journals.create_ledger_entry, _passthrough),
+    "pennylane_update_ledger_entry": (journals.update_ledger_entry, _passthrough),
+    # LIGNES D'ÉCRITURE
+    "pennylane_list_all_ledger_entry_lines": (journals.list_all_ledger_entry_lines, _renamed(filter="filter_query")),
+    "pennylane_get_ledger_entry_line": (journals.get_ledger_entry_line, _by_id("line_id")),
+    "pennylane_list_lettered_ledger_entry_lines": (journals.list_lettered_ledger_entry_lines, _passthrough),
+    "pennylane_list_ledger_entry_line_categories": (journals.list_ledger_entry_line_categories, _passthrough),
+    "pennylane_link_categories_to_ledger_entry_line": (journals.link_categories_to_ledger_entry_line, _passthrough),
+    "pennylane_letter_ledger_entry_lines": (journals.letter_ledger_entry_lines, _passthrough),
+    "pennylane_unletter_ledger_entry_lines": (journals.unletter_ledger_entry_lines, _passthrough),
+    # BALANCE ET EXERCICES FISCAUX
+    "pennylane_get_trial_balance": (accounting.get_trial_balance, _passthrough),
+    "pennylane_list_fiscal_years": (journals.list_fiscal_years, _passthrough),
+    # RAPPROCHEMENT
+    "pennylane_reconcile_transactions": (reconciliation.reconcile_transactions, _passthrough),
+    "pennylane_suggest_lettering": (lettering.suggest_lettering, _passthrough),
+    # MIROIR LOCAL
+    "pennylane_sync": (mirror.sync_mirror, _passthrough),
+    "pennylane_sync_status": (mirror.get_sync_status, _passthrough),
+    "pennylane_mirror_search": (mirror.search_mirror, _passthrough),
+    "pennylane_query": (mirror.query_mirror, _passthrough),
+    "pennylane_mirror_aged_balance": (mirror.aged_balance, _passthrough),
+    # FEC
+    "pennylane_export_fec": (fec.export_fec_lines, _passthrough),
+    "pennylane_list_fec_lines": (fec.list_fec_lines, _passthrough),
+    # LISTES COMPLÈTES
+    **{tool["name"]: _paginated(tool["name"]) for tool in PAGINATED_TOOLS},
+}
+
+
+def _build_registry() -> dict[str, ToolSpec]:
+    registry = {}
+    for tool in ALL_TOOLS:
+        name = tool["name"]
+        if name not in _HANDLERS:
+            raise RuntimeError(f"No handler registered for tool {name}")
+        handler, adapter = _HANDLERS[name]
+        registry[name] = ToolSpec(name, tool["description"], tool["inputSchema"], handler, adapter,
+                                  projects_fields=handler is call_paginated_tool)
+    missing = set(_HANDLERS) - set(registry)
+    if missing:
+        raise RuntimeError(f"Handlers without tool definition: {sorted(missing)}")
+    return registry
+
+
+REGISTRY: dict[str, ToolSpec] = _build_registry()
+
+
+class UnknownToolError(ValueError):
+    """Outil absent du registre."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Unknown tool: {name}")
+        self.name = name
+
+
+def get_tool(name: str) -> ToolSpec:
+    """Renvoie la définition d'un outil ou lève UnknownToolError."""
+    spec = REGISTRY.get(name)
+    if spec is None:
+        raise UnknownToolError(name)
+    return spec
+
+
+async def dispatch(client: PennylaneClient, name: str, arguments: dict[str, Any] | None) -> Any:
+    """
+    Exécute l'outil `name` avec les arguments MCP et renvoie son résultat brut.
+
+    Les arguments sont validés contre le schéma de l'outil avant tout appel à
+    l'API ; ToolValidationError est levée en cas d'erreur. L'argument `fields`
+    est retiré avant l'appel au handler et le résultat est projeté dessus.
+    Les arguments `max_bytes`/`max_tokens`/`continuation` limitent ensuite la
+    taille du résultat (voir shaping.ResponseShaper).
+
+    Chaque appel alimente TOOL_CALL_SECONDS, étiqueté par outil et par statut
+    (ok, invalid ou error).
+    """
+    spec = get_tool(name)
+    status = "error"
+    started = time.perf_counter()
+    try:
+        with TOOL_CALLS_IN_FLIGHT.track(tool=spec.name):
+            result = await _run(spec, client, arguments or {})
+        status = "ok"
+        return result
+    except ToolValidationError:
+        status = "invalid"
+        raise
+    finally:
+        TOOL_CALL_SECONDS.observe(time.perf_counter() - started, tool=spec.name, status=status)
+
+
+async def _run(spec: ToolSpec, client: PennylaneClient, arguments: dict[str, Any]) -> Any:
+    """Validation, appel du handler, projection et mise en forme du résultat."""
+    shaper = None
+    shaped = ResponseShaper.requested(arguments)
+    skip = 0
+    if shaped:
+        arguments, skip = resolve_continuation(spec.name, arguments)
+    # Une seule validation, sur les arguments effectifs (y compris ceux du jeton)
+    spec.validate(arguments)
+    if shaped:
+        shaper = ResponseShaper(spec.name, arguments, skip)
+        arguments = shaper.arguments
+    if spec.projects_fields or "fields" not in arguments:
+        result = await spec(client, arguments)
+    else:
+        fields = arguments["fields"]
+        result = await spec(client, {key: value for key, value in arguments.items() if key != "fields"})
+        if fields:
+            result = Projection(fields).apply(result)
+    return shaper.apply(result) if shaper is not None else result
+
+
+def tool_definitions() -> list[dict[str, Any]]:
+    """Définitions MCP de tous les outils, dans l'ordre d'ALL_TOOLS."""
+    return [spec.definition() for spec in REGISTRY.values()]
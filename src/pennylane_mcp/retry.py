@@ -0,0 +1,63 @@
+"""Politique de nouvelles tentatives pour les appels à l'API Pennylane."""
+import random
+from typing import Optional
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUSES = frozenset({500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """
+    Backoff exponentiel avec gigue complète, borné en tentatives et en durée.
+
+    Seules les méthodes idempotentes sont rejouées. Un POST ne l'est que
+    s'il porte une clé d'idempotence.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        deadline: float = 30.0,
+        retry_statuses: frozenset[int] = RETRYABLE_STATUSES,
+    ):
+        """
+        Args:
+            max_attempts: Nombre total de tentatives (1 = pas de nouvelle tentative)
+            base_delay: Délai de base du backoff en secondes
+            max_delay: Plafond d'un délai de backoff en secondes
+            deadline: Durée totale maximale d'une requête, tentatives comprises
+            retry_statuses: Codes HTTP considérés comme transitoires
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_statuses = retry_statuses
+
+    def allows(self, method: str, idempotency_key: Optional[str] = None) -> bool:
+        """Indique si une requête de cette méthode peut être rejouée."""
+        return method in IDEMPOTENT_METHODS or (method == "POST" and bool(idempotency_key))
+
+    def backoff(self, attempt: int) -> float:
+        """Délai avant la tentative `attempt + 1` (gigue complète)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def next_delay(self, attempt: int, elapsed: float, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Délai avant une nouvelle tentative, ou None si la politique l'interdit.
+
+        Args:
+            attempt: Numéro de la tentative qui vient d'échouer (à partir de 0)
+            elapsed: Temps écoulé depuis la première tentative
+            retry_after: Délai minimal imposé par le serveur (Retry-After)
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if elapsed + delay >= self.deadline:
+            return None
+        return delay
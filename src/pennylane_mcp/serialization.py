@@ -0,0 +1,110 @@
+"""Sérialisation JSON des résultats d'outils.
+
+Le backend est interchangeable : orjson (compact, rapide) s'il est installé,
+sinon le module `json` de la bibliothèque standard. La sortie est compacte par
+défaut ; l'indentation n'est produite que sur demande (`pretty=True` ou
+variable d'environnement PENNYLANE_JSON_PRETTY).
+"""
+import json
+import os
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+class JSONSerializer:
+    """Backend `json` de la bibliothèque standard."""
+
+    name = "json"
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        return self.dumps_text(obj, pretty).encode("utf-8")
+
+    def dumps_text(self, obj: Any, pretty: bool = False) -> str:
+        if pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False, default=str)
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    """Backend orjson : encode directement en UTF-8, sans passer par str."""
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("orjson is not installed")
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        options = self._options | orjson.OPT_INDENT_2 if pretty else self._options
+        return orjson.dumps(obj, default=str, option=options)
+
+    def dumps_text(self, obj: Any, pretty: bool = False) -> str:
+        return self.dumps(obj, pretty).decode("utf-8")
+
+    def loads(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+
+SERIALIZERS = {
+    "json": JSONSerializer,
+    "orjson": OrjsonSerializer,
+}
+
+
+def get_serializer(name: str | None = None) -> JSONSerializer | OrjsonSerializer:
+    """
+    Renvoie le sérialiseur demandé (ou le meilleur disponible).
+
+    Args:
+        name: "orjson", "json" ou None pour PENNYLANE_JSON_BACKEND / orjson si présent
+    """
+    name = name or os.getenv("PENNYLANE_JSON_BACKEND") or ("orjson" if orjson is not None else "json")
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    if name == "orjson" and orjson is None:
+        return JSONSerializer()
+    return SERIALIZERS[name]()
+
+
+# Sérialiseur par défaut du processus
+SERIALIZER = get_serializer()
+
+# Indentation des résultats d'outils, désactivée par défaut
+PRETTY = os.getenv("PENNYLANE_JSON_PRETTY", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def dumps(obj: Any, pretty: bool | None = None) -> bytes:
+    """Sérialise en JSON UTF-8 avec le backend par défaut."""
+    return SERIALIZER.dumps(obj, PRETTY if pretty is None else pretty)
+
+
+def dumps_text(obj: Any, pretty: bool | None = None) -> str:
+    """Sérialise en texte JSON (contenu `text` des réponses MCP)."""
+    return SERIALIZER.dumps_text(obj, PRETTY if pretty is None else pretty)
+
+
+def loads(data: bytes | str) -> Any:
+    """Désérialise un JSON avec le backend par défaut."""
+    return SERIALIZER.loads(data)
+
+
+def tool_result_envelope(msg_id: Any, text: str, is_error: bool = False) -> bytes:
+    """
+    Réponse JSON-RPC `tools/call` encodée en UTF-8, `text` formant son unique contenu de type texte.
+
+    Avec `is_error`, le résultat porte `isError: true` (erreur d'exécution de l'outil).
+    """
+    result: dict[str, Any] = {"content": [{"type": "text", "text": text}]}
+    if is_error:
+        result["isError"] = True
+    return SERIALIZER.dumps({"jsonrpc": "2.0", "id": msg_id, "result": result})
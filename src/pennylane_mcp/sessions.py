@@ -0,0 +1,174 @@
+"""Sessions SSE : file de messages par connexion et traitements en cours.
+
+Chaque connexion `/sse` ouvre une session identifiée par `session_id`. Les
+messages postés sur `/message?session_id=...` sont acquittés immédiatement
+(202) puis traités en tâche de fond ; leurs réponses sont déposées dans la
+file de la session et envoyées sur le flux SSE. Une session peut ainsi avoir
+plusieurs appels longs en cours sans bloquer de requête HTTP.
+
+Avec plusieurs workers, le flux SSE d'une session est tenu par un seul
+d'entre eux. Un message posté sur un autre worker est déposé dans la boîte de
+réception de la session (backend partagé, voir backends.py) puis relevé par
+le worker détenteur, qui le traite et répond sur le flux.
+"""
+import asyncio
+import logging
+import os
+import secrets
+import socket
+import time
+from typing import Any, Awaitable, Callable
+
+from .serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Réponses en attente d'envoi par session (au-delà, les traitements attendent le client)
+SESSION_QUEUE_SIZE = int(os.getenv("PENNYLANE_SESSION_QUEUE_SIZE", "256"))
+# Traitements simultanés par session
+SESSION_MAX_IN_FLIGHT = int(os.getenv("PENNYLANE_SESSION_MAX_IN_FLIGHT", "16"))
+# Intervalle (s) de relève des messages déposés par les autres workers
+INBOX_POLL_INTERVAL = float(os.getenv("PENNYLANE_SESSION_POLL_INTERVAL", "0.02"))
+# Intervalle (s) de renouvellement des sessions dans le backend partagé
+SESSION_HEARTBEAT = 10.0
+
+# Traite un message relevé pour une session et renvoie sa réponse éventuelle
+InboxHandler = Callable[["Session", Any], Awaitable[bytes | None]]
+
+
+class Session:
+    """Session SSE : file des messages à envoyer et tâches en cours."""
+
+    __slots__ = ("id", "api_key", "queue", "tasks", "semaphore", "created_at", "last_activity")
+
+    def __init__(self, session_id: str, api_key: str | None = None):
+        self.id = session_id
+        # Clé API fournie à la connexion (None = client par défaut)
+        self.api_key = api_key
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=SESSION_QUEUE_SIZE)
+        self.tasks: set[asyncio.Task] = set()
+        self.semaphore = asyncio.Semaphore(SESSION_MAX_IN_FLIGHT)
+        self.created_at = time.time()
+        self.last_activity = self.created_at
+
+    def submit(self, work: Callable[[], Awaitable[bytes | None]]) -> asyncio.Task:
+        """Lance un traitement en tâche de fond ; sa réponse éventuelle est mise en file."""
+        self.last_activity = time.time()
+
+        async def run():
+            async with self.semaphore:
+                message = await work()
+            if message is not None:
+                await self.queue.put(message)
+
+        task = asyncio.create_task(run())
+        self.tasks.add(task)
+        task.add_done_callback(self._finished)
+        return task
+
+    def _finished(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Session {self.id} task failed: {task.exception()}")
+
+    async def next_message(self, timeout: float) -> bytes | None:
+        """Prochain message à envoyer, ou None si rien n'arrive avant `timeout`."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        for task in list(self.tasks):
+            task.cancel()
+
+
+class SessionManager:
+    """Sessions ouvertes du processus, enregistrées dans le backend partagé s'il y en a un."""
+
+    def __init__(self, backend: Any = None, worker_id: str | None = None):
+        """
+        Args:
+            backend: Backend partagé entre workers (None : un seul worker)
+            worker_id: Identifiant de ce worker dans le backend
+        """
+        self._sessions: dict[str, Session] = {}
+        self.backend = backend
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.forwarded = 0
+        self._poller: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def open(self, api_key: str | None = None) -> Session:
+        session = Session(secrets.token_urlsafe(16), api_key)
+        self._sessions[session.id] = session
+        if self.backend is not None:
+            await self.backend.register_session(session.id, self.worker_id)
+        logger.info(f"SSE session {session.id} opened ({len(self._sessions)} active)")
+        return session
+
+    def get(self, session_id: str) -> Session | None:
+        return self._sessions.get(session_id)
+
+    async def close(self, session_id: str):
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.close()
+            if self.backend is not None:
+                await self.backend.unregister_session(session_id)
+            logger.info(f"SSE session {session_id} closed ({len(self._sessions)} active)")
+
+    async def forward(self, session_id: str, payload: Any) -> bool:
+        """
+        Dépose un message pour une session tenue par un autre worker.
+
+        Returns:
+            False si aucun worker ne détient la session
+        """
+        if self.backend is None or await self.backend.session_owner(session_id) is None:
+            return False
+        await self.backend.push_message(session_id, dumps(payload, pretty=False))
+        self.forwarded += 1
+        return True
+
+    def start(self, handler: InboxHandler):
+        """Lance la relève des messages déposés par les autres workers (backend partagé)."""
+        if self.backend is not None and self._poller is None:
+            self._poller = asyncio.create_task(self._poll_inbox(handler))
+
+    async def stop(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        for session_id in list(self._sessions):
+            await self.close(session_id)
+
+    async def _poll_inbox(self, handler: InboxHandler):
+        last_heartbeat = time.monotonic()
+        while True:
+            await asyncio.sleep(INBOX_POLL_INTERVAL)
+            if not self._sessions:
+                continue
+            try:
+                session_ids = list(self._sessions)
+                if time.monotonic() - last_heartbeat >= SESSION_HEARTBEAT:
+                    await self.backend.touch_sessions(session_ids)
+                    last_heartbeat = time.monotonic()
+                for session_id, payload in await self.backend.pop_messages(session_ids):
+                    session = self._sessions.get(session_id)
+                    if session is not None:
+                        message = loads(payload)
+                        session.submit(lambda session=session, message=message: handler(session, message))
+            except Exception as e:
+                logger.error(f"Session inbox polling failed: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "worker": self.worker_id,
+            "forwarded": self.forwarded,
+            "sessions": len(self._sessions),
+            "in_flight": sum(len(session.tasks) for session in self._sessions.values()),
+            "queued": sum(session.queue.qsize() for session in self._sessions.values()),
+        }
@@ -0,0 +1,254 @@
+"""Limitation de la taille des résultats d'outils (`max_bytes` / `max_tokens`).
+
+Lorsqu'un résultat de liste dépasse le budget demandé, seuls les premiers items
+qui tiennent dans le budget sont renvoyés, accompagnés :
+- d'un résumé calculé sur tous les items (nombre, sommes des montants, plage de dates) ;
+- d'un jeton `continuation` à repasser à l'outil pour obtenir la suite.
+
+La taille est estimée item par item, sans sérialiser le résultat complet :
+l'estimation s'arrête dès que le budget est atteint.
+"""
+import base64
+import binascii
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+from .validation import ToolValidationError
+
+# Approximation usuelle pour du JSON : ~4 octets par token
+BYTES_PER_TOKEN = 4
+
+# Place réservée aux métadonnées, au résumé et au jeton de continuation ; plafonnée
+# au quart de `max_bytes` pour que les petites limites gardent un budget positif
+ENVELOPE_RESERVE = 1024
+
+# Champs de date utilisés pour la plage de dates du résumé, par ordre de préférence
+DATE_FIELDS = ("date", "deadline", "created_at")
+
+# Arguments traités par la couche de dispatch, jamais transmis aux handlers
+SHAPING_ARGUMENTS = ("max_bytes", "max_tokens", "continuation")
+
+SHAPING_PROPERTIES = {
+    "max_bytes": {
+        "type": "integer",
+        "minimum": 256,
+        "description": "Taille maximale du résultat en octets ; les listes plus longues sont tronquées",
+    },
+    "max_tokens": {
+        "type": "integer",
+        "minimum": 64,
+        "description": "Taille maximale du résultat en tokens (~4 octets par token)",
+    },
+    "continuation": {
+        "type": "string",
+        "description": "Jeton renvoyé par un résultat tronqué, pour obtenir les items suivants",
+    },
+}
+
+
+def add_shaping_properties(tools: list[dict[str, Any]]):
+    """Ajoute les arguments max_bytes, max_tokens et continuation au schéma de chaque outil."""
+    for tool in tools:
+        properties = tool["inputSchema"].setdefault("properties", {})
+        for name, schema in SHAPING_PROPERTIES.items():
+            properties.setdefault(name, schema)
+
+
+def estimate_size(value: Any, limit: int | None = None) -> int:
+    """
+    Estime la taille JSON compacte d'une valeur, en octets.
+
+    Les chaînes sont comptées en caractères (approximation basse pour le
+    non-ASCII, sans échappements). Si `limit` est donné, l'estimation s'arrête
+    dès qu'elle le dépasse et renvoie une valeur supérieure à `limit`.
+    """
+    if isinstance(value, str):
+        return len(value) + 2
+    if value is None or value is True:
+        return 4
+    if value is False:
+        return 5
+    if isinstance(value, (int, float)):
+        return len(repr(value))
+    if isinstance(value, dict):
+        size = 2 + max(len(value) - 1, 0)
+        for key, item in value.items():
+            size += len(str(key)) + 3 + estimate_size(item, None if limit is None else limit - size)
+            if limit is not None and size > limit:
+                return size
+        return size
+    if isinstance(value, (list, tuple)):
+        size = 2 + max(len(value) - 1, 0)
+        for item in value:
+            size += estimate_size(item, None if limit is None else limit - size)
+            if limit is not None and size > limit:
+                return size
+        return size
+    return len(str(value)) + 2
+
+
+def _to_decimal(value: Any) -> Decimal | None:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value))
+    if isinstance(value, str):
+        try:
+            return Decimal(value)
+        except InvalidOperation:
+            return None
+    return None
+
+
+def _is_amount_field(name: str) -> bool:
+    return "amount" in name or name in ("debit", "credit", "debits", "credits", "balance")
+
+
+def summarize(items: list[Any]) -> dict[str, Any]:
+    """
+    Résume une liste d'items : nombre, sommes des champs de montant et plage de dates.
+
+    Seuls les champs de premier niveau sont examinés.
+    """
+    sums: dict[str, Decimal] = {}
+    date_field = None
+    first_date = last_date = None
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        for name, value in item.items():
+            if _is_amount_field(name):
+                amount = _to_decimal(value)
+                if amount is not None:
+                    sums[name] = sums.get(name, Decimal(0)) + amount
+        if date_field is None:
+            date_field = next((name for name in DATE_FIELDS if name in item), None)
+        date = item.get(date_field) if date_field else None
+        if isinstance(date, str):
+            first_date = date if first_date is None or date < first_date else first_date
+            last_date = date if last_date is None or date > last_date else last_date
+    summary: dict[str, Any] = {"count": len(items)}
+    if sums:
+        summary["sums"] = {name: str(total) for name, total in sums.items()}
+    if first_date is not None:
+        summary["date_range"] = {"field": date_field, "from": first_date, "to": last_date}
+    return summary
+
+
+def encode_continuation(tool: str, arguments: dict[str, Any], skip: int) -> str:
+    payload = json.dumps({"t": tool, "a": arguments, "s": skip}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_continuation(tool: str, token: str) -> tuple[dict[str, Any], int]:
+    """Décode un jeton de continuation ; lève ToolValidationError s'il est invalide."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        arguments, skip = payload["a"], int(payload["s"])
+        valid = payload.get("t") == tool and isinstance(arguments, dict) and skip >= 0
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        raise ToolValidationError(tool, [{
+            "path": "continuation", "keyword": "format", "message": "is not a valid continuation token for this tool",
+        }])
+    return arguments, skip
+
+
+def resolve_continuation(tool: str, arguments: dict[str, Any]) -> tuple[dict[str, Any], int]:
+    """
+    Remplace un jeton de continuation par les arguments qu'il porte.
+
+    Le jeton n'est pas signé : les arguments renvoyés (ceux du jeton et les
+    limites de taille de l'appel) doivent encore être validés.
+
+    Returns:
+        (arguments effectifs, nombre d'items déjà renvoyés)
+    """
+    token = arguments.get("continuation")
+    if not token or not isinstance(token, str):
+        # Pas de jeton (ou jeton mal typé, signalé par la validation)
+        return arguments, 0
+    decoded, skip = decode_continuation(tool, token)
+    limits = {key: value for key, value in arguments.items() if key in SHAPING_ARGUMENTS and key != "continuation"}
+    return {**decoded, **limits}, skip
+
+
+class ResponseShaper:
+    """
+    Budget de taille d'un appel d'outil.
+
+    Construit à partir des arguments MCP validés, jeton de continuation déjà
+    résolu (voir resolve_continuation) : `arguments` contient les arguments à
+    transmettre à l'outil, sans les arguments de mise en forme.
+    """
+
+    __slots__ = ("tool", "arguments", "max_bytes", "skip")
+
+    def __init__(self, tool: str, arguments: dict[str, Any], skip: int = 0):
+        self.tool = tool
+        limits = []
+        if arguments.get("max_bytes"):
+            limits.append(arguments["max_bytes"])
+        if arguments.get("max_tokens"):
+            limits.append(arguments["max_tokens"] * BYTES_PER_TOKEN)
+        self.max_bytes: int | None = min(limits) if limits else None
+        self.skip = skip
+        self.arguments = {key: value for key, value in arguments.items() if key not in SHAPING_ARGUMENTS}
+
+    @staticmethod
+    def requested(arguments: dict[str, Any]) -> bool:
+        """Indique si l'appel contient des arguments de mise en forme."""
+        return any(name in arguments for name in SHAPING_ARGUMENTS)
+
+    def apply(self, result: Any) -> Any:
+        """
+        Applique la reprise (continuation) et le budget à un résultat.
+
+        Seules les listes (résultat de type liste ou réponse {"items": [...]})
+        sont tronquées ; les autres résultats sont renvoyés tels quels. Au moins
+        un item est toujours renvoyé pour que la reprise progresse. Le résumé
+        porte sur tous les items restants (renvoyés et omis).
+        """
+        if isinstance(result, list):
+            envelope: dict[str, Any] = {}
+            items = result
+        elif isinstance(result, dict) and isinstance(result.get("items"), list):
+            envelope = {key: value for key, value in result.items() if key != "items"}
+            items = result["items"]
+        else:
+            return result
+
+        if self.skip:
+            items = items[self.skip:]
+        kept = self._fitting_count(envelope, items)
+        if kept == len(items):
+            if not self.skip:
+                return result
+            return items if isinstance(result, list) else {**envelope, "items": items}
+
+        shaped = dict(envelope)
+        shaped["items"] = items[:kept]
+        shaped["shaped"] = {
+            "truncated": True,
+            "returned": kept,
+            "omitted": len(items) - kept,
+            "summary": summarize(items),
+            "continuation": encode_continuation(self.tool, self.arguments, self.skip + kept),
+        }
+        return shaped
+
+    def _fitting_count(self, envelope: dict[str, Any], items: list[Any]) -> int:
+        """Nombre d'items qui tiennent dans le budget, estimé de proche en proche."""
+        if self.max_bytes is None:
+            return len(items)
+        reserve = min(ENVELOPE_RESERVE, self.max_bytes // 4)
+        budget = self.max_bytes - estimate_size(envelope, self.max_bytes) - reserve
+        size = 0
+        for index, item in enumerate(items):
+            size += estimate_size(item, budget - size) + 1
+            if size > budget:
+                return max(index, 1)
+        return len(items)
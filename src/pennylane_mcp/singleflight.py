@@ -0,0 +1,72 @@
+"""Regroupement des requêtes identiques en cours (single-flight)."""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from .metrics import COALESCED_REQUESTS
+
+
+class _Flight:
+    """Appel amont partagé et nombre d'appelants qui l'attendent."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Partage un seul appel amont entre les appelants concurrents d'une même clé.
+
+    Tant qu'un appel est en cours pour une clé, les appels suivants attendent
+    son résultat (ou son exception) au lieu d'en lancer un nouveau. Le résultat
+    est partagé et ne doit pas être modifié par les appelants.
+
+    L'appel s'exécute dans sa propre tâche : l'annulation d'un appelant, y
+    compris celui qui l'a lancé, n'interrompt pas les autres. L'appel n'est
+    annulé que lorsque plus personne ne l'attend.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, _Flight] = {}
+        self.saved = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], label: str = "") -> Any:
+        """
+        Exécute `fn` ou rejoint l'exécution déjà en cours pour `key`.
+
+        Args:
+            key: Clé identifiant la requête
+            fn: Fabrique de la coroutine à exécuter
+            label: Étiquette de métrique (ressource)
+        """
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.saved += 1
+            COALESCED_REQUESTS.inc(resource=label)
+        else:
+            flight = self._inflight[key] = _Flight(asyncio.ensure_future(fn()))
+            flight.task.add_done_callback(lambda task: self._done(key, flight))
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # Plus personne n'attend : un nouvel appelant relancera l'appel
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def _done(self, key: Hashable, flight: _Flight):
+        self._forget(key, flight)
+        if not flight.task.cancelled():
+            # Évite l'avertissement "exception never retrieved" si tous les appelants sont partis
+            flight.task.exception()
@@ -1,17 +1,22 @@
 """SSE MCP Server for Dust integration."""
-import os
 import json
 import asyncio
 from typing import Any
 from fastapi import FastAPI, Request
+from fastapi.responses import Response
 from sse_starlette.sse import EventSourceResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from mcp.server import Server
 from mcp.types import Tool, TextContent
+from .backends import close_backends
 from .client import PennylaneClient
-from .tools import invoices, customers, suppliers, transactions, accounting, quotes
+from .jsonrpc import METHOD_NOT_FOUND, PARSE_ERROR, error_response, handle_payload
+from .registry import UnknownToolError, dispatch, tool_definitions
+from .serialization import JSON_MEDIA_TYPE, dumps, dumps_text
+from .tenants import MissingCredentialsError, TenantClients
+from .validation import ToolValidationError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,89 +31,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialiser le client Pennylane
-api_key = os.getenv("PENNYLANE_API_KEY")
-base_url = os.getenv("PENNYLANE_BASE_URL", "https://app.pennylane.com/api/external/v2")
-
-if not api_key:
-    raise ValueError("PENNYLANE_API_KEY environment variable is required")
-
-pennylane_client = PennylaneClient(api_key=api_key, base_url=base_url)
+# Initialiser les clients Pennylane (client par défaut + pool multi-tenant)
+tenants = TenantClients.from_env()
+pennylane_client = tenants.default
 
 # Créer le serveur MCP
 mcp_server = Server("pennylane-mcp")
 
+TOOLS = [Tool(**tool) for tool in tool_definitions()]
+
 
 @mcp_server.list_tools()
 async def list_tools() -> list[Tool]:
     """Liste tous les outils disponibles."""
-    return [
-        Tool(
-            name="pennylane_list_customers",
-            description="Liste tous les clients Pennylane",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "limit": {"type": "integer", "description": "Nombre de résultats", "default": 20},
-                },
-            },
-        ),
-        Tool(
-            name="pennylane_list_quotes",
-            description="Liste tous les devis Pennylane",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "limit": {"type": "integer", "description": "Nombre de résultats", "default": 30},
-                },
-            },
-        ),
-        Tool(
-            name="pennylane_create_quote",
-            description="Crée un nouveau devis Pennylane",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "customer_id": {"type": "integer", "description": "ID du client"},
-                    "date": {"type": "string", "description": "Date du devis (YYYY-MM-DD)"},
-                    "deadline": {"type": "string", "description": "Date limite (YYYY-MM-DD)"},
-                    "invoice_lines": {"type": "array", "description": "Lignes du devis"},
-                },
-                "required": ["customer_id", "date", "deadline", "invoice_lines"],
-            },
-        ),
-    ]
+    return TOOLS
 
 
 @mcp_server.call_tool()
-async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
-    """Exécute un outil."""
+async def call_tool(name: str, arguments: dict[str, Any],
+                    client: PennylaneClient | None = None) -> list[TextContent]:
+    """Exécute un outil (avec le client par défaut si `client` n'est pas fourni)."""
+    text, _ = await run_tool(name, arguments, client)
+    return [TextContent(type="text", text=text)]
+
+
+async def run_tool(name: str, arguments: dict[str, Any],
+                   client: PennylaneClient | None = None) -> tuple[str, bool]:
+    """
+    Exécute un outil et renvoie son résultat texte.
+
+    Returns:
+        Le texte du résultat et s'il s'agit d'une erreur (`isError` du résultat
+        `tools/call`). Les arguments invalides renvoient les erreurs de
+        validation structurées, comme le 422 du serveur HTTP.
+    """
     logger.info(f"Calling tool: {name} with arguments: {arguments}")
     
     try:
-        if name == "pennylane_list_customers":
-            result = await customers.list_customers(
-                pennylane_client,
-                limit=arguments.get("limit", 20),
-            )
-        elif name == "pennylane_list_quotes":
-            result = await quotes.list_quotes(
-                pennylane_client,
-                limit=arguments.get("limit", 30),
-            )
-        elif name == "pennylane_create_quote":
-            result = await quotes.create_quote(
-                pennylane_client,
-                **arguments
-            )
-        else:
-            return [TextContent(type="text", text=f"Unknown tool: {name}")]
-        
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        result = await dispatch(client or pennylane_client, name, arguments)
+        return dumps_text(result), False
     
+    except UnknownToolError:
+        return f"Unknown tool: {name}", True
+    except ToolValidationError as e:
+        logger.info(f"Rejected call to {name}: {e}")
+        return dumps_text({"error": str(e), "validation_errors": e.errors}), True
     except Exception as e:
         logger.error(f"Error calling tool {name}: {str(e)}")
-        return [TextContent(type="text", text=f"Error: {str(e)}")]
+        return f"Error: {str(e)}", True
 
 
 @app.get("/")
@@ -189,61 +159,70 @@ async def sse_endpoint(request: Request):
 
 @app.post("/message")
 async def handle_message(request: Request):
-    """Handle MCP JSON-RPC messages."""
+    """Handle MCP JSON-RPC messages (a single message or a batch)."""
     try:
-        body = await request.json()
-        method = body.get("method")
-        params = body.get("params", {})
-        msg_id = body.get("id")
-        
-        logger.info(f"Received message: {method}")
-        
-        if method == "tools/list":
-            tools = await list_tools()
-            return {
-                "jsonrpc": "2.0",
-                "id": msg_id,
-                "result": {
-                    "tools": [
-                        {
-                            "name": tool.name,
-                            "description": tool.description,
-                            "inputSchema": tool.inputSchema
-                        }
-                        for tool in tools
-                    ]
-                }
-            }
-        
-        elif method == "tools/call":
-            tool_name = params.get("name")
-            arguments = params.get("arguments", {})
-            result = await call_tool(tool_name, arguments)
-            return {
-                "jsonrpc": "2.0",
-                "id": msg_id,
-                "result": {
-                    "content": [{"type": "text", "text": r.text} for r in result]
-                }
-            }
-        
-        else:
-            return {
-                "jsonrpc": "2.0",
-                "id": msg_id,
-                "error": {"code": -32601, "message": f"Method not found: {method}"}
+        api_key = tenants.resolve(request.headers)
+    except MissingCredentialsError as e:
+        return Response(content=dumps({"error": str(e)}), status_code=401, media_type=JSON_MEDIA_TYPE)
+    try:
+        payload = json.loads(await request.body())
+    except ValueError as e:
+        return Response(
+            content=dumps(error_response(None, PARSE_ERROR, f"Parse error: {e}")),
+            media_type=JSON_MEDIA_TYPE
+        )
+    async with tenants.lease(api_key) as client:
+        content = await handle_payload(payload, lambda message: process_message(message, client))
+    if content is None:
+        # Notification (or batch made only of notifications): nothing to answer
+        return Response(status_code=202)
+    return Response(content=content, media_type=JSON_MEDIA_TYPE)
+
+
+async def process_message(body: dict[str, Any], client: PennylaneClient | None = None) -> dict[str, Any]:
+    """Process one MCP JSON-RPC message and return its response."""
+    method = body.get("method")
+    params = body.get("params", {})
+    msg_id = body.get("id")
+    
+    logger.info(f"Received message: {method}")
+    
+    if method == "tools/list":
+        tools = await list_tools()
+        return {
+            "jsonrpc": "2.0",
+            "id": msg_id,
+            "result": {
+                "tools": [
+                    {
+                        "name": tool.name,
+                        "description": tool.description,
+                        "inputSchema": tool.inputSchema
+                    }
+                    for tool in tools
+                ]
             }
+        }
     
-    except Exception as e:
-        logger.error(f"Error handling message: {e}")
+    elif method == "tools/call":
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        text, is_error = await run_tool(tool_name, arguments, client)
+        result: dict[str, Any] = {"content": [{"type": "text", "text": text}]}
+        if is_error:
+            result["isError"] = True
         return {
             "jsonrpc": "2.0",
-            "id": body.get("id") if body else None,
-            "error": {"code": -32603, "message": str(e)}
+            "id": msg_id,
+            "result": result
         }
+    
+    else:
+        return error_response(msg_id, METHOD_NOT_FOUND, f"Method not found: {method}")
 
 
 @app.on_event("shutdown")
 async def shutdown():
     """Cleanup."""
-    await pennylane_client.close()
+    await tenants.close()
+    await close_backends()
@@ -0,0 +1,92 @@
+"""Progression et résultats partiels d'un appel d'outil diffusé en flux.
+
+Le transport HTTP « streamable » associe un `ProgressReporter` à l'appel en
+cours (variable de contexte). Les listes complètes (`*_all`) le notifient à
+chaque page reçue. Comme le prévoit MCP, une notification
+`notifications/progress` n'est envoyée que si le client a fourni un jeton
+(`_meta.progressToken`).
+
+`notifications/partial_result` ne fait pas partie de la spécification MCP :
+c'est une extension de ce serveur, annoncée dans `capabilities.experimental`
+à l'initialisation et envoyée seulement si le client l'a demandée
+(`_meta.partialResults`). Elle contient les items de la page, qui ne sont
+alors pas conservés pour la réponse finale : celle-ci ne contient plus que
+les compteurs.
+
+Les notifications passent par une file bornée : un client lent ralentit la
+pagination au lieu de faire grossir la mémoire.
+"""
+import asyncio
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable
+
+# Notifications en attente d'envoi par appel
+PROGRESS_QUEUE_SIZE = 32
+
+# Capacité expérimentale annoncée à l'initialisation pour `notifications/partial_result`
+PARTIAL_RESULTS_CAPABILITY = "partialResults"
+
+_reporter: ContextVar["ProgressReporter | None"] = ContextVar("pennylane_progress_reporter", default=None)
+
+
+def current_reporter() -> "ProgressReporter | None":
+    """Reporter de l'appel en cours, s'il est diffusé en flux."""
+    return _reporter.get()
+
+
+class ProgressReporter:
+    """File des notifications de progression d'un appel d'outil."""
+
+    __slots__ = ("request_id", "progress_token", "partial", "queue", "items", "pages")
+
+    def __init__(self, request_id: Any, progress_token: Any = None, partial: bool = False):
+        """
+        Args:
+            request_id: `id` JSON-RPC de l'appel
+            progress_token: Jeton fourni par le client (`_meta.progressToken`) ; sans jeton,
+                aucune notification de progression n'est envoyée
+            partial: Diffuse les items de chaque page au lieu de les renvoyer dans la réponse finale
+        """
+        self.request_id = request_id
+        self.progress_token = progress_token
+        self.partial = partial
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=PROGRESS_QUEUE_SIZE)
+        self.items = 0
+        self.pages = 0
+
+    async def on_page(self, items: list[Any], paginated: Any):
+        """Callback de Paginated.collect : une page vient d'être reçue."""
+        self.items += len(items)
+        self.pages = paginated.pages
+        if self.progress_token is not None:
+            params: dict[str, Any] = {
+                "progressToken": self.progress_token,
+                "progress": self.items,
+                "message": f"page {paginated.pages} ({self.items} items)",
+            }
+            if not paginated.has_more:
+                params["total"] = self.items
+            await self.queue.put({"jsonrpc": "2.0", "method": "notifications/progress", "params": params})
+        if self.partial:
+            partial: dict[str, Any] = {"requestId": self.request_id, "page": paginated.pages, "items": items}
+            if self.progress_token is not None:
+                partial["progressToken"] = self.progress_token
+            await self.queue.put({"jsonrpc": "2.0", "method": "notifications/partial_result", "params": partial})
+
+    async def run(self, call: Awaitable[Any]) -> Any:
+        """Exécute l'appel avec ce reporter comme reporter courant (à lancer dans sa propre tâche)."""
+        _reporter.set(self)
+        return await call
+
+    async def events(self, task: asyncio.Task) -> AsyncIterator[dict[str, Any]]:
+        """Notifications de l'appel, jusqu'à la fin de `task`."""
+        while True:
+            getter = asyncio.ensure_future(self.queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield getter.result()
+                continue
+            getter.cancel()
+            break
+        while not self.queue.empty():
+            yield self.queue.get_nowait()
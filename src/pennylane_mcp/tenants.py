@@ -0,0 +1,216 @@
+"""Clients Pennylane par entreprise (multi-tenant).
+
+Un processus peut servir plusieurs entreprises : chaque requête fournit sa clé
+API (en-tête `X-Pennylane-Api-Key` ou `Authorization: Bearer`) et reçoit le
+`PennylaneClient` de cette clé. Chaque client a son propre pool de
+connexions, son limiteur de débit (quota isolé par entreprise) et son cache.
+
+Les clients sont conservés dans un LRU borné. Un client est « emprunté » le
+temps d'une requête (`lease`) : un client évincé alors qu'il est encore utilisé
+n'est fermé qu'à la fin du dernier emprunt. Les clients inutilisés depuis
+`idle_timeout` secondes sont fermés lors des emprunts suivants.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Mapping
+
+from .cache import key_namespace
+from .client import PennylaneClient, client_options_from_env
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CLIENTS = 64
+DEFAULT_IDLE_TIMEOUT = 900.0
+
+API_KEY_HEADER = "x-pennylane-api-key"
+
+# Clé API -> nouveau client
+ClientFactory = Callable[[str], PennylaneClient]
+
+
+class MissingCredentialsError(PermissionError):
+    """Aucune clé API fournie et pas de clé par défaut configurée."""
+
+
+def tenant_id(api_key: str) -> str:
+    """Identifiant stable d'une clé API, utilisable dans les journaux (PennylaneClient.tenant_id)."""
+    return key_namespace(api_key)
+
+
+def api_key_from_headers(headers: Mapping[str, str]) -> str | None:
+    """Clé API fournie par la requête (X-Pennylane-Api-Key, sinon Authorization: Bearer)."""
+    value = headers.get(API_KEY_HEADER)
+    if value:
+        return value.strip()
+    authorization = headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token.strip():
+        return token.strip()
+    return None
+
+
+class _Entry:
+    __slots__ = ("client", "leases", "last_used", "evicted")
+
+    def __init__(self, client: PennylaneClient):
+        self.client = client
+        self.leases = 0
+        self.last_used = time.monotonic()
+        self.evicted = False
+
+
+class ClientPool:
+    """LRU borné de clients Pennylane, indexé par clé API."""
+
+    def __init__(self, factory: ClientFactory, max_clients: int = DEFAULT_MAX_CLIENTS,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        """
+        Args:
+            factory: Crée le client d'une clé API
+            max_clients: Nombre maximal de clients ouverts
+            idle_timeout: Inactivité (s) au-delà de laquelle un client est fermé
+        """
+        self.factory = factory
+        self.max_clients = max(1, max_clients)
+        self.idle_timeout = idle_timeout
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        # Recherche, création et évictions atomiques : deux premiers emprunts simultanés
+        # d'une même clé ne créent qu'un client
+        self._lock = asyncio.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def _close(self, tenant: str, entry: _Entry, reason: str):
+        logger.info(f"Closing Pennylane client of tenant {tenant} ({reason})")
+        await entry.client.close()
+
+    async def _evict(self, tenant: str, reason: str):
+        entry = self._entries.pop(tenant)
+        entry.evicted = True
+        self.evicted += 1
+        if entry.leases == 0:
+            await self._close(tenant, entry, reason)
+
+    async def evict_idle(self) -> int:
+        """Ferme les clients inutilisés depuis `idle_timeout` ; renvoie leur nombre."""
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [tenant for tenant, entry in self._entries.items()
+                if entry.leases == 0 and entry.last_used < cutoff]
+        for tenant in idle:
+            await self._evict(tenant, "idle")
+        return len(idle)
+
+    @asynccontextmanager
+    async def lease(self, api_key: str) -> AsyncIterator[PennylaneClient]:
+        """Emprunte le client d'une clé API pour la durée du bloc."""
+        tenant = tenant_id(api_key)
+        async with self._lock:
+            entry = self._entries.get(tenant)
+            if entry is None:
+                await self.evict_idle()
+                entry = self._entries[tenant] = _Entry(self.factory(api_key))
+                self.created += 1
+                logger.info(f"Created Pennylane client for tenant {tenant} ({len(self._entries)} open)")
+                while len(self._entries) > self.max_clients:
+                    await self._evict(next(iter(self._entries)), "pool full")
+            else:
+                self._entries.move_to_end(tenant)
+            # Emprunt pris sous le verrou : le client ne peut pas être fermé entre-temps
+            entry.leases += 1
+        try:
+            yield entry.client
+        finally:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            if entry.evicted and entry.leases == 0:
+                await self._close(tenant, entry, "evicted while in use")
+
+    async def close(self):
+        async with self._lock:
+            for tenant in list(self._entries):
+                await self._evict(tenant, "shutdown")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "clients": len(self._entries),
+            "leased": sum(1 for entry in self._entries.values() if entry.leases),
+            "created": self.created,
+            "evicted": self.evicted,
+        }
+
+
+class TenantClients:
+    """
+    Client par défaut (PENNYLANE_API_KEY) et, en mode multi-tenant, pool des
+    clients des clés fournies par les requêtes.
+    """
+
+    def __init__(self, base_url: str, default_api_key: str | None = None, multi_tenant: bool = False,
+                 max_clients: int = DEFAULT_MAX_CLIENTS, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        if not default_api_key and not multi_tenant:
+            raise ValueError("PENNYLANE_API_KEY environment variable is required")
+        self.base_url = base_url
+        self.multi_tenant = multi_tenant
+        self.default_api_key = default_api_key
+        self.default = self._create(default_api_key) if default_api_key else None
+        self.pool = ClientPool(self._create, max_clients, idle_timeout)
+
+    def _create(self, api_key: str) -> PennylaneClient:
+        # Options relues à chaque création : cache et limiteur propres au client
+        return PennylaneClient(api_key=api_key, base_url=self.base_url, **client_options_from_env())
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] | None = None) -> "TenantClients":
+        """
+        Variables reconnues:
+            PENNYLANE_API_KEY: Clé par défaut (obligatoire hors mode multi-tenant)
+            PENNYLANE_BASE_URL: URL de l'API
+            PENNYLANE_MULTI_TENANT: Accepte la clé API de chaque requête (défaut false)
+            PENNYLANE_TENANT_MAX_CLIENTS: Clients ouverts au plus (défaut 64)
+            PENNYLANE_TENANT_IDLE_TIMEOUT: Inactivité avant fermeture d'un client en s (défaut 900)
+        """
+        env = os.environ if environ is None else environ
+        return cls(
+            base_url=env.get("PENNYLANE_BASE_URL", "https://app.pennylane.com/api/external/v2"),
+            default_api_key=env.get("PENNYLANE_API_KEY") or None,
+            multi_tenant=env.get("PENNYLANE_MULTI_TENANT", "").strip().lower() in ("1", "true", "yes", "on"),
+            max_clients=int(env.get("PENNYLANE_TENANT_MAX_CLIENTS") or DEFAULT_MAX_CLIENTS),
+            idle_timeout=float(env.get("PENNYLANE_TENANT_IDLE_TIMEOUT") or DEFAULT_IDLE_TIMEOUT),
+        )
+
+    def resolve(self, headers: Mapping[str, str]) -> str | None:
+        """Clé API à utiliser pour une requête (None = client par défaut)."""
+        if not self.multi_tenant:
+            return None
+        api_key = api_key_from_headers(headers)
+        if api_key is None and self.default is None:
+            raise MissingCredentialsError(
+                "Missing Pennylane API key (X-Pennylane-Api-Key or Authorization: Bearer header)"
+            )
+        return api_key
+
+    @asynccontextmanager
+    async def lease(self, api_key: str | None) -> AsyncIterator[PennylaneClient]:
+        """Client d'une clé API résolue par `resolve` (client par défaut si None)."""
+        if api_key is None or api_key == self.default_api_key:
+            if self.default is None:
+                raise MissingCredentialsError("Missing Pennylane API key")
+            yield self.default
+            return
+        async with self.pool.lease(api_key) as client:
+            yield client
+
+    async def close(self):
+        await self.pool.close()
+        if self.default is not None:
+            await self.default.close()
+
+    def stats(self) -> dict[str, Any]:
+        return {"multi_tenant": self.multi_tenant, **self.pool.stats()}
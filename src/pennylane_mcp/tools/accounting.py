@@ -1,6 +1,7 @@
 """Outils pour la comptabilité."""
 from typing import Any
 from ..client import PennylaneClient
+from ..pagination import Paginated
 
 
 async def get_trial_balance(
@@ -75,6 +76,21 @@ async def list_categories(
     return await client.get("categories", params)
 
 
+def iter_all_categories(
+    client: PennylaneClient,
+    filter_query: str | None = None,
+    sort: str = "-id",
+    limit: int = 100,
+    max_pages: int | None = None
+) -> Paginated:
+    """Itère sur toutes les catégories comptables, toutes pages confondues."""
+    return Paginated(
+        lambda cursor: list_categories(client, limit=limit, cursor=cursor, filter_query=filter_query, sort=sort),
+        mode="cursor",
+        max_pages=max_pages,
+    )
+
+
 async def list_bank_accounts(
     client: PennylaneClient,
     limit: int = 100,
@@ -95,6 +111,20 @@ async def list_bank_accounts(
     return await client.get("bank_accounts", params)
 
 
+def iter_all_bank_accounts(
+    client: PennylaneClient,
+    sort: str = "-id",
+    limit: int = 100,
+    max_pages: int | None = None
+) -> Paginated:
+    """Itère sur tous les comptes bancaires, toutes pages confondues."""
+    return Paginated(
+        lambda cursor: list_bank_accounts(client, limit=limit, cursor=cursor, sort=sort),
+        mode="cursor",
+        max_pages=max_pages,
+    )
+
+
 async def export_fec(client: PennylaneClient, fiscal_year_id: int) -> dict[str, Any]:
     """
     Lance un export FEC.
@@ -0,0 +1,60 @@
+"""Outils de création par lots."""
+import copy
+from typing import Any
+
+from ..all_tools_definition import ALL_TOOLS
+from ..bulk import BULK_CONCURRENCY, completed_keys, submit_bulk
+from ..client import PennylaneClient
+from ..shaping import SHAPING_ARGUMENTS
+from ..validation import compile_schema
+from . import invoices
+
+# Arguments ajoutés à tous les schémas d'outils et consommés par la couche de dispatch :
+# ils n'ont pas de sens dans un item de lot, qui est transmis tel quel à l'API
+_DISPATCH_ARGUMENTS = ("fields", *SHAPING_ARGUMENTS)
+
+
+def _item_schema(tool_name: str) -> dict[str, Any]:
+    """
+    Schéma d'un item de lot : celui de l'outil unitaire, sans les arguments de dispatch.
+
+    Les propriétés inconnues sont refusées, sans quoi elles seraient transmises
+    à l'API sans avoir été validées.
+    """
+    schema = copy.deepcopy(next(tool["inputSchema"] for tool in ALL_TOOLS if tool["name"] == tool_name))
+    for name in _DISPATCH_ARGUMENTS:
+        schema["properties"].pop(name, None)
+    schema["additionalProperties"] = False
+    return schema
+
+
+# Chaque facture du lot est validée contre le schéma de la création unitaire
+_validate_customer_invoice = compile_schema(_item_schema("pennylane_create_customer_invoice"))
+
+
+async def bulk_create_customer_invoices(
+    client: PennylaneClient,
+    invoices_data: list[dict[str, Any]],
+    batch_id: str | None = None,
+    concurrency: int = BULK_CONCURRENCY,
+    skip_invalid: bool = False,
+    stop_on_error: bool = False,
+    validate_only: bool = False
+) -> dict[str, Any]:
+    """
+    Crée un lot de factures clients.
+
+    Args:
+        invoices_data: Factures (mêmes champs que create_customer_invoice)
+        batch_id: Identifiant du lot, à réutiliser pour reprendre un import interrompu (généré si absent)
+        concurrency: Créations simultanées
+        skip_invalid: Envoie les factures valides même si d'autres sont invalides
+        stop_on_error: N'envoie plus rien après la première erreur API
+        validate_only: Valide sans rien envoyer
+    """
+    async def submit(invoice: dict[str, Any], key: str) -> dict[str, Any]:
+        return await invoices.create_customer_invoice(client, idempotency_key=key, **invoice)
+
+    return await submit_bulk(invoices_data, submit, _validate_customer_invoice, batch_id, concurrency,
+                             skip_invalid, stop_on_error, validate_only, path="invoices",
+                             completed=completed_keys(client.tenant_id))
@@ -1,6 +1,7 @@
 """Outils pour la gestion des clients."""
 from typing import Any
 from ..client import PennylaneClient
+from ..pagination import Paginated
 
 
 async def list_customers(
@@ -20,6 +21,21 @@ async def list_customers(
     return await client.get("customers", params)
 
 
+def iter_all_customers(
+    client: PennylaneClient,
+    filter_query: str | None = None,
+    sort: str = "-id",
+    limit: int = 100,
+    max_pages: int | None = None
+) -> Paginated:
+    """Itère sur tous les clients, toutes pages confondues."""
+    return Paginated(
+        lambda cursor: list_customers(client, limit=limit, cursor=cursor, filter_query=filter_query, sort=sort),
+        mode="cursor",
+        max_pages=max_pages,
+    )
+
+
 async def get_customer(client: PennylaneClient, customer_id: int) -> dict[str, Any]:
     """Récupère les détails d'un client (générique)."""
     return await client.get(f"customers/{customer_id}")
@@ -35,6 +51,35 @@ async def get_individual_customer(client: PennylaneClient, customer_id: int) ->
     return await client.get(f"individual_customers/{customer_id}")
 
 
+async def create_customer(
+    client: PennylaneClient,
+    name: str,
+    customer_type: str,
+    email: str | None = None,
+    **kwargs
+) -> dict[str, Any]:
+    """
+    Crée un client entreprise ou particulier.
+    
+    Args:
+        name: Nom de l'entreprise, ou "Prénom Nom" pour un particulier
+        customer_type: "company" ou "individual"
+        email: Email du client
+        **kwargs: Autres paramètres (billing_address, phone, etc.)
+    """
+    emails = [email] if email else kwargs.pop("emails", None)
+    billing_address = kwargs.pop("billing_address", {})
+    
+    if customer_type == "company":
+        return await create_company_customer(client, name, billing_address, emails=emails, **kwargs)
+    if customer_type == "individual":
+        first_name, _, last_name = name.partition(" ")
+        return await create_individual_customer(
+            client, first_name, last_name or first_name, billing_address, emails=emails, **kwargs
+        )
+    raise ValueError(f"Unknown customer_type: {customer_type} (expected 'company' or 'individual')")
+
+
 async def create_company_customer(
     client: PennylaneClient,
     name: str,
@@ -0,0 +1,96 @@
+"""Outils d'export et de consultation du FEC."""
+import os
+from typing import Any
+
+from ..client import PennylaneClient
+from ..fec import POLL_TIMEOUT, download_fec_export, load_fec
+from ..mirror import get_mirror
+from . import accounting
+
+
+async def export_fec_lines(
+    client: PennylaneClient,
+    fiscal_year_id: int,
+    load: bool = True,
+    keep_file: bool = False,
+    timeout: float = POLL_TIMEOUT
+) -> dict[str, Any]:
+    """
+    Génère et télécharge le FEC d'un exercice, puis le charge dans le miroir local.
+
+    Le fichier est téléchargé dans le dossier fixé par le serveur (PENNYLANE_FEC_DIR).
+
+    Args:
+        fiscal_year_id: ID de l'exercice
+        load: Charge les lignes dans la table `fec_lines` du miroir
+        keep_file: Conserve le fichier téléchargé (supprimé par défaut)
+        timeout: Attente maximale de la génération (secondes)
+    """
+    export = await accounting.export_fec(client, fiscal_year_id)
+    report = await download_fec_export(client, fiscal_year_id, export, timeout)
+    try:
+        if load:
+            mirror = get_mirror(client)
+            # Lecture et insertion hors de la boucle d'événements
+            report.update(await mirror.run(load_fec, report["path"], fiscal_year_id))
+    finally:
+        if not keep_file:
+            os.remove(report["path"])
+            report["path"] = None
+    return report
+
+
+async def list_fec_lines(
+    client: PennylaneClient,
+    fiscal_year_id: int,
+    journal_code: str | None = None,
+    compte_num: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    text: str | None = None,
+    limit: int = 100,
+    offset: int = 0
+) -> dict[str, Any]:
+    """
+    Lignes FEC chargées dans le miroir, filtrées par journal, compte (préfixe) ou période.
+
+    Args:
+        fiscal_year_id: ID de l'exercice
+        journal_code: Code journal (ex: "VT", "HA", "BQ")
+        compte_num: Numéro de compte ou préfixe (ex: "411", "6")
+        date_from: Date d'écriture minimale (YYYY-MM-DD)
+        date_to: Date d'écriture maximale (YYYY-MM-DD)
+        text: Texte contenu dans le libellé de l'écriture
+        limit: Nombre maximal de lignes
+        offset: Lignes à sauter
+    """
+    conditions = ["fiscal_year_id = ?"]
+    params: list[Any] = [fiscal_year_id]
+    if journal_code:
+        conditions.append("journal_code = ?")
+        params.append(journal_code)
+    if compte_num:
+        # Borne supérieure plutôt que LIKE : l'index (fiscal_year_id, compte_num) reste utilisable
+        conditions.append("compte_num >= ? AND compte_num < ?")
+        params.extend((compte_num, compte_num + "￿"))
+    if date_from:
+        conditions.append("ecriture_date >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("ecriture_date <= ?")
+        params.append(date_to)
+    if text:
+        conditions.append("ecriture_lib LIKE ?")
+        params.append(f"%{text}%")
+    where = " AND ".join(conditions)
+    mirror = get_mirror(client)
+    rows = await mirror.fetch(
+        f"SELECT * FROM fec_lines WHERE {where} ORDER BY ecriture_date, line LIMIT ? OFFSET ?",
+        (*params, limit + 1, offset),
+    )
+    totals = (await mirror.fetch(
+        f"SELECT COUNT(*) AS lines, ROUND(SUM(debit), 2) AS debit, ROUND(SUM(credit), 2) AS credit "
+        f"FROM fec_lines WHERE {where}",
+        tuple(params),
+    ))[0]
+    return {"items": rows[:limit], "count": min(len(rows), limit), "truncated": len(rows) > limit, "totals": totals}
@@ -1,6 +1,7 @@
 """Outils pour la gestion des factures."""
 from typing import Any
 from ..client import PennylaneClient
+from ..pagination import Paginated
 
 
 async def list_customer_invoices(
@@ -20,6 +21,21 @@ async def list_customer_invoices(
     return await client.get("customer_invoices", params)
 
 
+def iter_all_customer_invoices(
+    client: PennylaneClient,
+    filter_query: str | None = None,
+    sort: str = "-id",
+    limit: int = 100,
+    max_pages: int | None = None
+) -> Paginated:
+    """Itère sur toutes les factures clients, toutes pages confondues."""
+    return Paginated(
+        lambda cursor: list_customer_invoices(client, limit=limit, cursor=cursor, filter_query=filter_query, sort=sort),
+        mode="cursor",
+        max_pages=max_pages,
+    )
+
+
 async def get_customer_invoice(client: PennylaneClient, invoice_id: int) -> dict[str, Any]:
     """Récupère les détails d'une facture client."""
     return await client.get(f"customer_invoices/{invoice_id}")
@@ -34,6 +50,7 @@ async def create_customer_invoice(
     draft: bool = True,
     currency: str = "EUR",
     language: str = "fr_FR",
+    idempotency_key: str | None = None,
     **kwargs
 ) -> dict[str, Any]:
     """
@@ -53,6 +70,8 @@ async def create_customer_invoice(
         draft: OBLIGATOIRE - True = brouillon modifiable, False = facture finalisée
         currency: Devise (EUR, USD, etc.)
         language: Langue (fr_FR, en_GB, de_DE)
+        idempotency_key: Clé d'idempotence (une nouvelle tentative avec la même clé
+                         ne crée pas de doublon)
         **kwargs: Paramètres optionnels (pdf_invoice_subject, pdf_description, 
                  special_mention, external_reference, discount, etc.)
     """
@@ -66,7 +85,7 @@ async def create_customer_invoice(
         "language": language,
         **kwargs
     }
-    return await client.post("customer_invoices", data)
+    return await client.post("customer_invoices", data, idempotency_key=idempotency_key)
 
 
 async def finalize_customer_invoice(client: PennylaneClient, invoice_id: int) -> dict[str, Any]:
@@ -107,6 +126,21 @@ async def list_supplier_invoices(
     return await client.get("supplier_invoices", params)
 
 
+def iter_all_supplier_invoices(
+    client: PennylaneClient,
+    filter_query: str | None = None,
+    sort: str = "-id",
+    limit: int = 100,
+    max_pages: int | None = None
+) -> Paginated:
+    """Itère sur toutes les factures fournisseurs, toutes pages confondues."""
+    return Paginated(
+        lambda cursor: list_supplier_invoices(client, limit=limit, cursor=cursor, filter_query=filter_query, sort=sort),
+        mode="cursor",
+        max_pages=max_pages,
+    )
+
+
 async def get_supplier_invoice(client: PennylaneClient, invoice_id: int) -> dict[str, Any]:
     """Récupère les détails d'une facture fournisseur."""
     return await client.get(f"supplier_invoices/{invoice_id}")
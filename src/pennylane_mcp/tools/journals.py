@@ -1,6 +1,7 @@
 """Outils pour gérer les journaux comptables et comptes généraux Pennylane."""
 from typing import Any
 from ..client import PennylaneClient
+from ..pagination import DEFAULT_PAGE_CONCURRENCY, Paginated
 
 
 async def list_journals(
@@ -24,6 +25,21 @@ async def list_journals(
     return await client.get("/journals", params=params)
 
 
+def iter_all_journals(
+    client: PennylaneClient,
+    filter_query: str | None = None,
+    sort: str = "-id",
+    limit: int = 100,
+    max_pages: int | None = None
+) -> Paginated:
+    """Itère sur tous les journaux comptables, toutes pages confondues."""
+    return Paginated(
+        lambda cursor: list_journals(client, limit=limit, cursor=cursor, filter_query=filter_query, sort=sort),
+        mode="cursor",
+        max_pages=max_pages,
+    )
+
+
 async def get_journal(client: PennylaneClient, journal_id: int) -> dict[str, Any]:
     """Récupère un journal comptable par son ID."""
     return await client.get(f"/journals/{journal_id}")
@@ -45,7 +61,7 @@ async def create_journal(
         "label": label
     }
     
-    return await client.post("/journals", json=data)
+    return await client.post("/journals", data)
 
 
 async def list_ledger_accounts(
@@ -72,6 +88,22 @@ async def list_ledger_accounts(
     return await client.get("/ledger_accounts", params=params)
 
 
+def iter_all_ledger_accounts(
+    client: PennylaneClient,
+    filter_query: str | None = None,
+    limit: int = 100,
+    max_pages: int | None = None,
+    concurrency: int = DEFAULT_PAGE_CONCURRENCY
+) -> Paginated:
+    """Itère sur tous les comptes généraux, pages récupérées en parallèle."""
+    return Paginated(
+        lambda page: list_ledger_accounts(client, limit=limit, page=page, filter_query=filter_query),
+        mode="page",
+        max_pages=max_pages,
+        concurrency=concurrency,
+    )
+
+
 async def get_ledger_account(client: PennylaneClient, account_id: int) -> dict[str, Any]:
     """Récupère un compte général par son ID."""
     return await client.get(f"/ledger_accounts/{account_id}")
@@ -103,7 +135,7 @@ async def create_ledger_account(
     if country_alpha2:
         data["country_alpha2"] = country_alpha2
     
-    return await client.post("/ledger_accounts", json=data)
+    return await client.post("/ledger_accounts", data)
 
 
 async def list_ledger_entries(
@@ -131,6 +163,23 @@ async def list_ledger_entries(
     return await client.get("/ledger_entries", params=params)
 
 
+def iter_all_ledger_entries(
+    client: PennylaneClient,
+    filter_query: str | None = None,
+    sort: str = "-updated_at",
+    limit: int = 100,
+    max_pages: int | None = None,
+    concurrency: int = DEFAULT_PAGE_CONCURRENCY
+) -> Paginated:
+    """Itère sur toutes les écritures comptables, pages récupérées en parallèle."""
+    return Paginated(
+        lambda page: list_ledger_entries(client, limit=limit, page=page, filter_query=filter_query, sort=sort),
+        mode="page",
+        max_pages=max_pages,
+        concurrency=concurrency,
+    )
+
+
 async def list_ledger_entry_lines(
     client: PennylaneClient,
     ledger_entry_id: int,
@@ -176,7 +225,7 @@ async def create_ledger_entry(
     if ledger_attachment_id:
         data["ledger_attachment_id"] = ledger_attachment_id
     
-    return await client.post("/ledger_entries", json=data)
+    return await client.post("/ledger_entries", data)
 
 
 async def update_ledger_entry(
@@ -215,7 +264,7 @@ async def update_ledger_entry(
     if currency:
         data["currency"] = currency
     
-    return await client.put(f"/ledger_entries/{ledger_entry_id}", json=data)
+    return await client.put(f"/ledger_entries/{ledger_entry_id}", data)
 
 
 async def list_all_ledger_entry_lines(
@@ -239,6 +288,21 @@ async def list_all_ledger_entry_lines(
     return await client.get("/ledger_entry_lines", params=params)
 
 
+def iter_all_ledger_entry_lines(
+    client: PennylaneClient,
+    filter_query: str | None = None,
+    sort: str = "id",
+    limit: int = 100,
+    max_pages: int | None = None
+) -> Paginated:
+    """Itère sur toutes les lignes d'écriture, toutes pages confondues."""
+    return Paginated(
+        lambda cursor: list_all_ledger_entry_lines(client, limit=limit, cursor=cursor, filter_query=filter_query, sort=sort),
+        mode="cursor",
+        max_pages=max_pages,
+    )
+
+
 async def get_ledger_entry_line(client: PennylaneClient, line_id: int) -> dict[str, Any]:
     """Récupère une ligne d'écriture par son ID."""
     return await client.get(f"/ledger_entry_lines/{line_id}")
@@ -281,7 +345,7 @@ async def link_categories_to_ledger_entry_line(
 ) -> dict[str, Any]:
     """Lie des catégories analytiques à une ligne d'écriture."""
     data = {"categories": categories}
-    return await client.put(f"/ledger_entry_lines/{line_id}/categories", json=data)
+    return await client.put(f"/ledger_entry_lines/{line_id}/categories", data)
 
 
 async def letter_ledger_entry_lines(
@@ -300,7 +364,7 @@ async def letter_ledger_entry_lines(
         "ledger_entry_lines": ledger_entry_lines
     }
     
-    return await client.post("/ledger_entry_lines/lettering", json=data)
+    return await client.post("/ledger_entry_lines/lettering", data)
 
 
 async def unletter_ledger_entry_lines(
@@ -319,7 +383,7 @@ async def unletter_ledger_entry_lines(
         "ledger_entry_lines": ledger_entry_lines
     }
     
-    return await client.delete("/ledger_entry_lines/lettering", json=data)
+    return await client.delete("/ledger_entry_lines/lettering", data)
 
 
 async def get_trial_balance(
@@ -350,6 +414,24 @@ async def get_trial_balance(
     return await client.get("/trial_balance", params=params)
 
 
+def iter_all_trial_balance(
+    client: PennylaneClient,
+    period_start: str,
+    period_end: str,
+    is_auxiliary: bool = False,
+    limit: int = 100,
+    max_pages: int | None = None,
+    concurrency: int = DEFAULT_PAGE_CONCURRENCY
+) -> Paginated:
+    """Itère sur toutes les lignes de la balance générale, pages récupérées en parallèle."""
+    return Paginated(
+        lambda page: get_trial_balance(client, period_start, period_end, is_auxiliary, limit=limit, page=page),
+        mode="page",
+        max_pages=max_pages,
+        concurrency=concurrency,
+    )
+
+
 async def list_fiscal_years(
     client: PennylaneClient,
     limit: int = 20,
@@ -362,3 +444,18 @@ async def list_fiscal_years(
     }
     
     return await client.get("/fiscal_years", params=params)
+
+
+def iter_all_fiscal_years(
+    client: PennylaneClient,
+    limit: int = 100,
+    max_pages: int | None = None,
+    concurrency: int = DEFAULT_PAGE_CONCURRENCY
+) -> Paginated:
+    """Itère sur tous les exercices fiscaux, pages récupérées en parallèle."""
+    return Paginated(
+        lambda page: list_fiscal_years(client, limit=limit, page=page),
+        mode="page",
+        max_pages=max_pages,
+        concurrency=concurrency,
+    )
@@ -0,0 +1,77 @@
+"""Outil de lettrage automatique des lignes d'écriture d'un compte."""
+import asyncio
+import json
+from typing import Any
+
+from ..client import PennylaneClient
+from ..lettering import (
+    DEFAULT_DATE_WINDOW_DAYS,
+    DEFAULT_MAX_CANDIDATES,
+    DEFAULT_MAX_GROUP_SIZE,
+    LetteringEngine,
+)
+from . import journals
+
+# Lettrages envoyés simultanément à l'API en mode `apply`
+APPLY_CONCURRENCY = 4
+
+
+async def suggest_lettering(
+    client: PennylaneClient,
+    ledger_account_id: int,
+    max_group_size: int = DEFAULT_MAX_GROUP_SIZE,
+    date_window_days: int = DEFAULT_DATE_WINDOW_DAYS,
+    max_candidates: int = DEFAULT_MAX_CANDIDATES,
+    max_groups: int = 500,
+    apply: bool = False
+) -> dict[str, Any]:
+    """
+    Propose (ou applique) des groupes de lignes non lettrées qui s'équilibrent sur un compte.
+
+    Les lignes sont lues page par page et réduites à (id, montant, date) au
+    fil de l'eau : seules ces trois valeurs sont conservées en mémoire.
+
+    Args:
+        ledger_account_id: ID du compte général
+        max_group_size: Nombre maximal de lignes par groupe
+        date_window_days: Écart de dates maximal entre les lignes d'un groupe
+        max_candidates: Lignes examinées par recherche de groupe N↔1
+        max_groups: Nombre maximal de groupes renvoyés
+        apply: Lettre les groupes trouvés dans Pennylane
+    """
+    engine = LetteringEngine(max_group_size, date_window_days, max_candidates)
+    filter_query = json.dumps([{"field": "ledger_account_id", "operator": "eq", "value": ledger_account_id}])
+    scanned = 0
+    async for line in journals.iter_all_ledger_entry_lines(client, filter_query=filter_query):
+        scanned += 1
+        engine.add(line)
+
+    # Calcul CPU hors de la boucle d'événements
+    result = await asyncio.to_thread(engine.solve)
+    groups = result["groups"]
+    report: dict[str, Any] = {
+        "ledger_account_id": ledger_account_id,
+        "scanned_lines": scanned,
+        "unlettered_lines": result["lines"],
+        "groupable_lines": result["lettered_lines"],
+        "group_count": len(groups),
+        "groups": groups[:max_groups],
+        "truncated": len(groups) > max_groups,
+    }
+    if apply:
+        semaphore = asyncio.Semaphore(APPLY_CONCURRENCY)
+
+        async def letter(group: dict[str, Any]) -> dict[str, Any]:
+            async with semaphore:
+                try:
+                    await journals.letter_ledger_entry_lines(
+                        client, [{"id": line_id} for line_id in group["line_ids"]]
+                    )
+                    return {"line_ids": group["line_ids"], "status": "lettered"}
+                except Exception as e:
+                    return {"line_ids": group["line_ids"], "status": "error", "error": str(e)}
+
+        applied = await asyncio.gather(*(letter(group) for group in groups))
+        report["applied"] = applied
+        report["applied_count"] = sum(1 for item in applied if item["status"] == "lettered")
+    return report
@@ -0,0 +1,114 @@
+"""Outils de synchronisation et de consultation du miroir local."""
+from datetime import date, timedelta
+from typing import Any
+
+from ..client import PennylaneClient
+from ..mirror import QUERY_MAX_ROWS, QUERY_TIMEOUT, RESOURCES, get_mirror
+
+# Colonnes sur lesquelles la recherche accepte un filtre d'égalité
+SEARCH_FILTERS = ("status", "customer_id", "supplier_id", "bank_account_id", "journal_id",
+                  "ledger_account_id", "ledger_entry_id", "paid")
+
+
+async def sync_mirror(
+    client: PennylaneClient,
+    resources: list[str] | None = None,
+    full: bool = False
+) -> dict[str, Any]:
+    """Synchronise le miroir local (incrémental par défaut)."""
+    return await get_mirror(client).sync(client, resources, full)
+
+
+async def get_sync_status(client: PennylaneClient) -> dict[str, Any]:
+    """Renvoie l'état de synchronisation du miroir (filigranes, dernières synchronisations, volumes)."""
+    return await get_mirror(client).status()
+
+
+async def query_mirror(
+    client: PennylaneClient,
+    sql: str,
+    params: list[Any] | None = None,
+    max_rows: int = QUERY_MAX_ROWS,
+    timeout: float = QUERY_TIMEOUT
+) -> dict[str, Any]:
+    """Exécute une requête SQL en lecture seule sur le miroir local."""
+    return await get_mirror(client).query(sql, params, min(max_rows, QUERY_MAX_ROWS), min(timeout, QUERY_TIMEOUT))
+
+
+async def search_mirror(
+    client: PennylaneClient,
+    resource: str,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    text: str | None = None,
+    limit: int = 100,
+    include_data: bool = False,
+    **filters: Any
+) -> dict[str, Any]:
+    """Recherche dans une ressource du miroir (filtres d'égalité, période, libellé)."""
+    if resource not in RESOURCES:
+        raise ValueError(f"Unknown mirrored resource: {resource}")
+    columns = set(RESOURCES[resource].columns)
+    conditions = []
+    params: list[Any] = []
+    for name in SEARCH_FILTERS:
+        if filters.get(name) is not None and name in columns:
+            conditions.append(f"{name} = ?")
+            params.append(int(filters[name]) if name == "paid" else filters[name])
+    if "date" in columns:
+        if date_from:
+            conditions.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("date <= ?")
+            params.append(date_to)
+    if text:
+        text_column = "label" if "label" in columns else "name"
+        conditions.append(f"{text_column} LIKE ?")
+        params.append(f"%{text}%")
+
+    selected = ["id", "updated_at", *RESOURCES[resource].columns] + (["data"] if include_data else [])
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    order = "date DESC, id DESC" if "date" in columns else "id DESC"
+    rows = await get_mirror(client).fetch(
+        f"SELECT {', '.join(selected)} FROM {resource}{where} ORDER BY {order} LIMIT ?", (*params, limit + 1)
+    )
+    return {"items": rows[:limit], "count": min(len(rows), limit), "truncated": len(rows) > limit}
+
+
+async def aged_balance(
+    client: PennylaneClient,
+    side: str = "customer",
+    min_days_overdue: int = 0,
+    as_of: str | None = None
+) -> dict[str, Any]:
+    """
+    Factures impayées en retard, regroupées par client ou fournisseur.
+
+    Args:
+        side: "customer" (factures clients) ou "supplier" (factures fournisseurs)
+        min_days_overdue: Retard minimal par rapport à l'échéance (jours)
+        as_of: Date de référence (YYYY-MM-DD, aujourd'hui par défaut)
+    """
+    if side not in ("customer", "supplier"):
+        raise ValueError(f"Unknown side: {side}")
+    reference = date.fromisoformat(as_of) if as_of else date.today()
+    cutoff = (reference - timedelta(days=min_days_overdue)).isoformat()
+    party_table = f"{side}s"
+    rows = await get_mirror(client).fetch(
+        f"""
+        SELECT i.{side}_id AS {side}_id, p.name AS name, COUNT(*) AS invoices,
+               SUM(i.remaining_amount) AS remaining_amount, MIN(i.deadline) AS oldest_deadline
+        FROM {side}_invoices i LEFT JOIN {party_table} p ON p.id = i.{side}_id
+        WHERE i.remaining_amount > 0 AND COALESCE(i.deadline, i.date) <= ?
+        GROUP BY i.{side}_id
+        ORDER BY remaining_amount DESC
+        """,
+        (cutoff,),
+    )
+    return {
+        "as_of": reference.isoformat(),
+        "min_days_overdue": min_days_overdue,
+        "items": rows,
+        "total_remaining_amount": round(sum(row["remaining_amount"] or 0 for row in rows), 2),
+    }
@@ -1,6 +1,7 @@
 """Outils pour la gestion des devis."""
 from typing import Any
 from ..client import PennylaneClient
+from ..pagination import Paginated
 
 
 async def list_quotes(
@@ -20,6 +21,21 @@ async def list_quotes(
     return await client.get("quotes", params)
 
 
+def iter_all_quotes(
+    client: PennylaneClient,
+    filter_query: str | None = None,
+    sort: str = "-id",
+    limit: int = 100,
+    max_pages: int | None = None
+) -> Paginated:
+    """Itère sur tous les devis, toutes pages confondues."""
+    return Paginated(
+        lambda cursor: list_quotes(client, limit=limit, cursor=cursor, filter_query=filter_query, sort=sort),
+        mode="cursor",
+        max_pages=max_pages,
+    )
+
+
 async def get_quote(client: PennylaneClient, quote_id: int) -> dict[str, Any]:
     """Récupère les détails d'un devis."""
     return await client.get(f"quotes/{quote_id}")
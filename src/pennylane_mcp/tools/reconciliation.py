@@ -0,0 +1,157 @@
+"""Outil de rapprochement automatique transactions ↔ factures."""
+import asyncio
+import json
+import sqlite3
+from typing import Any
+
+from ..client import PennylaneClient
+from ..mirror import fetch_rows, get_mirror
+from ..reconciliation import (
+    DEFAULT_AMOUNT_TOLERANCE,
+    DEFAULT_DATE_WINDOW_DAYS,
+    DEFAULT_MIN_SCORE,
+    ReconciliationEngine,
+    is_open_invoice,
+    is_unmatched_transaction,
+)
+from . import invoices, transactions
+
+# Associations envoyées simultanément à l'API en mode `apply`
+APPLY_CONCURRENCY = 4
+
+
+def _filter(*conditions: tuple[str, str, Any]) -> str | None:
+    """Filtre API v2 (JSON) à partir de (champ, opérateur, valeur)."""
+    items = [{"field": field, "operator": operator, "value": value}
+             for field, operator, value in conditions if value is not None]
+    return json.dumps(items) if items else None
+
+
+async def _load_from_api(client: PennylaneClient, side: str, date_from: str | None,
+                         date_to: str | None) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    iterate_invoices = (invoices.iter_all_customer_invoices if side == "customer"
+                        else invoices.iter_all_supplier_invoices)
+    open_invoices, bank_transactions = await asyncio.gather(
+        iterate_invoices(client, filter_query=_filter(("paid", "eq", "false"))).collect(),
+        transactions.iter_all_transactions(
+            client, filter_query=_filter(("date", "gteq", date_from), ("date", "lteq", date_to))
+        ).collect(),
+    )
+    return open_invoices["items"], bank_transactions["items"]
+
+
+def _load_from_mirror(db: sqlite3.Connection, side: str, date_from: str | None,
+                      date_to: str | None) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    open_invoices = []
+    for row in fetch_rows(
+        db,
+        f"SELECT i.data, p.name FROM {side}_invoices i LEFT JOIN {side}s p ON p.id = i.{side}_id "
+        f"WHERE i.remaining_amount IS NULL OR i.remaining_amount != 0"
+    ):
+        invoice = json.loads(row["data"])
+        if row["name"]:
+            invoice["counterparty_name"] = row["name"]
+        open_invoices.append(invoice)
+    conditions, params = [], []
+    if date_from:
+        conditions.append("date >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("date <= ?")
+        params.append(date_to)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    bank_transactions = [
+        json.loads(row["data"]) for row in fetch_rows(db, f"SELECT data FROM transactions{where}", tuple(params))
+    ]
+    return open_invoices, bank_transactions
+
+
+async def _apply(client: PennylaneClient, side: str, proposals: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    match = (transactions.match_transaction_to_customer_invoice if side == "customer"
+             else transactions.match_transaction_to_supplier_invoice)
+    semaphore = asyncio.Semaphore(APPLY_CONCURRENCY)
+
+    async def apply_one(proposal: dict[str, Any]) -> dict[str, Any]:
+        async with semaphore:
+            try:
+                await match(client, invoice_id=proposal["invoice_id"], transaction_id=proposal["transaction_id"])
+                return {"transaction_id": proposal["transaction_id"], "invoice_id": proposal["invoice_id"],
+                        "status": "matched"}
+            except Exception as e:
+                return {"transaction_id": proposal["transaction_id"], "invoice_id": proposal["invoice_id"],
+                        "status": "error", "error": str(e)}
+
+    return await asyncio.gather(*(apply_one(proposal) for proposal in proposals))
+
+
+async def reconcile_transactions(
+    client: PennylaneClient,
+    side: str = "customer",
+    source: str = "api",
+    date_from: str | None = None,
+    date_to: str | None = None,
+    amount_tolerance: str = str(DEFAULT_AMOUNT_TOLERANCE),
+    date_window_days: int = DEFAULT_DATE_WINDOW_DAYS,
+    min_score: float = DEFAULT_MIN_SCORE,
+    alternatives: int = 2,
+    max_proposals: int = 200,
+    apply: bool = False,
+    apply_min_score: float = 0.9
+) -> dict[str, Any]:
+    """
+    Propose (ou applique) le rapprochement des transactions non lettrées avec les factures ouvertes.
+
+    Args:
+        side: "customer" (encaissements ↔ factures clients) ou "supplier" (décaissements ↔ factures fournisseurs)
+        source: "api" (chargement complet via l'API) ou "mirror" (miroir local synchronisé)
+        date_from: Date minimale des transactions (YYYY-MM-DD)
+        date_to: Date maximale des transactions (YYYY-MM-DD)
+        amount_tolerance: Écart de montant accepté
+        date_window_days: Écart de dates accepté autour de [date, échéance] de la facture
+        min_score: Score minimal d'une proposition (0-1)
+        alternatives: Nombre d'alternatives renvoyées par proposition
+        max_proposals: Nombre maximal de propositions renvoyées
+        apply: Associe dans Pennylane les propositions dont le score atteint `apply_min_score`
+        apply_min_score: Score minimal pour l'application automatique
+    """
+    if side not in ("customer", "supplier"):
+        raise ValueError(f"Unknown side: {side}")
+    if source == "api":
+        open_invoices, bank_transactions = await _load_from_api(client, side, date_from, date_to)
+    elif source == "mirror":
+        # Requêtes SQLite et décodage JSON hors de la boucle d'événements
+        open_invoices, bank_transactions = await get_mirror(client).run(_load_from_mirror, side, date_from, date_to)
+    else:
+        raise ValueError(f"Unknown source: {source}")
+
+    # Encaissements pour les factures clients, décaissements pour les factures fournisseurs
+    sign = 1 if side == "customer" else -1
+    candidates = [
+        transaction for transaction in bank_transactions
+        if is_unmatched_transaction(transaction) and sign * float(transaction.get("amount") or 0) > 0
+    ]
+    open_invoices = [invoice for invoice in open_invoices if is_open_invoice(invoice)]
+
+    def run() -> dict[str, Any]:
+        engine = ReconciliationEngine(open_invoices, amount_tolerance, date_window_days)
+        return engine.propose(candidates, min_score, alternatives)
+
+    # Calcul CPU hors de la boucle d'événements
+    result = await asyncio.to_thread(run)
+    proposals = result["proposals"]
+    report: dict[str, Any] = {
+        "side": side,
+        "source": source,
+        "open_invoices": len(open_invoices),
+        "transactions": len(candidates),
+        "proposed": len(proposals),
+        "unmatched_transactions": result["unmatched_transactions"],
+        "proposals": proposals[:max_proposals],
+        "truncated": len(proposals) > max_proposals,
+    }
+    if apply:
+        selected = [proposal for proposal in proposals if proposal["score"] >= apply_min_score]
+        applied = await _apply(client, side, selected)
+        report["applied"] = applied
+        report["applied_count"] = sum(1 for item in applied if item["status"] == "matched")
+    return report
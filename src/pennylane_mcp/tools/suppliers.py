@@ -1,6 +1,7 @@
 """Outils pour la gestion des fournisseurs."""
 from typing import Any
 from ..client import PennylaneClient
+from ..pagination import Paginated
 
 
 async def list_suppliers(
@@ -20,6 +21,21 @@ async def list_suppliers(
     return await client.get("suppliers", params)
 
 
+def iter_all_suppliers(
+    client: PennylaneClient,
+    filter_query: str | None = None,
+    sort: str = "-id",
+    limit: int = 100,
+    max_pages: int | None = None
+) -> Paginated:
+    """Itère sur tous les fournisseurs, toutes pages confondues."""
+    return Paginated(
+        lambda cursor: list_suppliers(client, limit=limit, cursor=cursor, filter_query=filter_query, sort=sort),
+        mode="cursor",
+        max_pages=max_pages,
+    )
+
+
 async def get_supplier(client: PennylaneClient, supplier_id: int) -> dict[str, Any]:
     """Récupère les détails d'un fournisseur."""
     return await client.get(f"suppliers/{supplier_id}")
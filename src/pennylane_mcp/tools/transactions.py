@@ -1,6 +1,7 @@
 """Outils pour la gestion des transactions bancaires."""
 from typing import Any
 from ..client import PennylaneClient
+from ..pagination import Paginated
 
 
 async def list_transactions(
@@ -20,6 +21,21 @@ async def list_transactions(
     return await client.get("transactions", params)
 
 
+def iter_all_transactions(
+    client: PennylaneClient,
+    filter_query: str | None = None,
+    sort: str = "-date",
+    limit: int = 100,
+    max_pages: int | None = None
+) -> Paginated:
+    """Itère sur toutes les transactions bancaires, toutes pages confondues."""
+    return Paginated(
+        lambda cursor: list_transactions(client, limit=limit, cursor=cursor, filter_query=filter_query, sort=sort),
+        mode="cursor",
+        max_pages=max_pages,
+    )
+
+
 async def get_transaction(client: PennylaneClient, transaction_id: int) -> dict[str, Any]:
     """Récupère les détails d'une transaction."""
     return await client.get(f"transactions/{transaction_id}")
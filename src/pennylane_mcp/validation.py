@@ -0,0 +1,167 @@
+"""Validation locale des arguments d'outils contre leur inputSchema.
+
+Les schémas sont compilés une seule fois en fonctions de validation (closures)
+pour éviter de réinterpréter le schéma à chaque appel. Seul le sous-ensemble
+de JSON Schema utilisé par les outils est pris en charge : type, properties,
+required, items, enum, additionalProperties, minimum/maximum, minLength,
+minItems/maxItems. Les autres mots-clés sont ignorés.
+"""
+from typing import Any, Callable
+
+# Renvoie la liste des erreurs pour une valeur située au chemin donné
+Validator = Callable[[Any, str], list[dict[str, Any]]]
+
+_TYPE_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, str),
+    # Les flottants (même 3.0) sont refusés : les arguments validés sont transmis tels quels
+    # aux handlers, et 3.0 produirait des URL et des filtres erronés ("customers/3.0")
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+    "null": lambda value: value is None,
+}
+
+
+class ToolValidationError(ValueError):
+    """Arguments d'outil non conformes à son schéma."""
+
+    def __init__(self, tool: str, errors: list[dict[str, Any]]):
+        self.tool = tool
+        self.errors = errors
+        details = "; ".join(f"{error['path']}: {error['message']}" for error in errors)
+        super().__init__(f"Invalid arguments for {tool}: {details}")
+
+
+def _error(path: str, keyword: str, message: str) -> dict[str, Any]:
+    return {"path": path or "$", "keyword": keyword, "message": message}
+
+
+def _child(path: str, key: str) -> str:
+    return f"{path}.{key}" if path else key
+
+
+def compile_schema(schema: dict[str, Any]) -> Validator:
+    """Compile un schéma JSON en fonction de validation."""
+    checks: list[Validator] = []
+
+    expected = schema.get("type")
+    if expected is not None:
+        types = [expected] if isinstance(expected, str) else list(expected)
+        type_checks = [_TYPE_CHECKS[name] for name in types if name in _TYPE_CHECKS]
+        label = " or ".join(types)
+        is_type = type_checks[0] if len(type_checks) == 1 else (
+            lambda value: any(check(value) for check in type_checks)
+        )
+
+        def check_type(value: Any, path: str) -> list[dict[str, Any]]:
+            if is_type(value):
+                return []
+            return [_error(path, "type", f"expected {label}, got {type(value).__name__}")]
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value: Any, path: str) -> list[dict[str, Any]]:
+            if value in allowed:
+                return []
+            return [_error(path, "enum", f"must be one of {allowed}")]
+
+        checks.append(check_enum)
+
+    for keyword, compare, message in (
+        ("minimum", lambda value, bound: value >= bound, "must be >= {}"),
+        ("maximum", lambda value, bound: value <= bound, "must be <= {}"),
+    ):
+        if keyword in schema:
+            bound = schema[keyword]
+
+            def check_bound(value: Any, path: str, keyword=keyword, compare=compare,
+                            message=message, bound=bound) -> list[dict[str, Any]]:
+                if _TYPE_CHECKS["number"](value) and not compare(value, bound):
+                    return [_error(path, keyword, message.format(bound))]
+                return []
+
+            checks.append(check_bound)
+
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+
+        def check_min_length(value: Any, path: str) -> list[dict[str, Any]]:
+            if isinstance(value, str) and len(value) < min_length:
+                return [_error(path, "minLength", f"must have at least {min_length} characters")]
+            return []
+
+        checks.append(check_min_length)
+
+    if "minItems" in schema or "maxItems" in schema:
+        min_items = schema.get("minItems", 0)
+        max_items = schema.get("maxItems")
+
+        def check_item_count(value: Any, path: str) -> list[dict[str, Any]]:
+            if not isinstance(value, list):
+                return []
+            if len(value) < min_items:
+                return [_error(path, "minItems", f"must contain at least {min_items} items")]
+            if max_items is not None and len(value) > max_items:
+                return [_error(path, "maxItems", f"must contain at most {max_items} items")]
+            return []
+
+        checks.append(check_item_count)
+
+    if "items" in schema and isinstance(schema["items"], dict):
+        item_validator = compile_schema(schema["items"])
+
+        def check_items(value: Any, path: str) -> list[dict[str, Any]]:
+            if not isinstance(value, list):
+                return []
+            errors = []
+            for index, item in enumerate(value):
+                errors.extend(item_validator(item, f"{path}[{index}]"))
+            return errors
+
+        checks.append(check_items)
+
+    properties = schema.get("properties") or {}
+    required = list(schema.get("required") or [])
+    additional = schema.get("additionalProperties", True)
+    if properties or required or additional is False:
+        property_validators = {name: compile_schema(sub) for name, sub in properties.items()}
+
+        def check_object(value: Any, path: str) -> list[dict[str, Any]]:
+            if not isinstance(value, dict):
+                return []
+            errors = [
+                _error(_child(path, name), "required", "is required")
+                for name in required if name not in value
+            ]
+            for name, item in value.items():
+                validator = property_validators.get(name)
+                if validator is not None:
+                    errors.extend(validator(item, _child(path, name)))
+                elif additional is False:
+                    errors.append(_error(_child(path, name), "additionalProperties", "is not allowed"))
+            return errors
+
+        checks.append(check_object)
+
+    if not checks:
+        return lambda value, path="": []
+    if len(checks) == 1:
+        return checks[0]
+
+    first, rest = checks[0], checks[1:]
+
+    def validate(value: Any, path: str = "") -> list[dict[str, Any]]:
+        errors = first(value, path)
+        if errors and expected is not None:
+            # Type invalide : les autres contrôles n'ont pas de sens
+            return errors
+        for check in rest:
+            errors = errors + check(value, path) if errors else check(value, path)
+        return errors
+
+    return validate
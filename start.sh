@@ -1,4 +1,11 @@
 #!/bin/bash
 # Script de démarrage pour Railway
 PORT=${PORT:-8000}
-exec uvicorn pennylane_mcp.mcp_sse_server:app --host 0.0.0.0 --port $PORT
+# Nombre de workers uvicorn (WEB_CONCURRENCY, 1 par défaut)
+WORKERS=${WEB_CONCURRENCY:-1}
+if [ "$WORKERS" -gt 1 ]; then
+    # Quota Pennylane réparti entre workers ; sessions SSE et cache partagés
+    export PENNYLANE_WORKERS=$WORKERS
+    export PENNYLANE_STATE_BACKEND=${PENNYLANE_STATE_BACKEND:-sqlite:////tmp/pennylane-mcp-state.db}
+fi
+exec uvicorn pennylane_mcp.mcp_sse_server:app --host 0.0.0.0 --port $PORT --workers $WORKERS
@@ -0,0 +1,59 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from pennylane_mcp.backends import RedisBackend, SQLiteBackend
+from pennylane_mcp.client import PennylaneClient
+
+# Serveur Redis de test (optionnel) : les tests du backend Redis sont ignorés sans lui
+REDIS_URL = os.getenv("PENNYLANE_TEST_REDIS_URL")
+
+
+def run(coroutine):
+    """Exécute une coroutine de test dans une boucle neuve."""
+    return asyncio.run(coroutine)
+
+
+def mock_client(handler, **options) -> PennylaneClient:
+    """Client Pennylane dont les requêtes sont servies par `handler` (httpx.MockTransport)."""
+    client = PennylaneClient(api_key="test-key", **options)
+    client.client._transport = httpx.MockTransport(handler)
+    return client
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "state.db")
+
+
+def _redis_backend(request) -> RedisBackend:
+    pytest.importorskip("redis")
+    if not REDIS_URL:
+        pytest.skip("PENNYLANE_TEST_REDIS_URL is not set")
+    # Préfixe propre au test : n'écrase rien sur le serveur
+    return RedisBackend(REDIS_URL, prefix=f"pennylane-mcp-test-{os.getpid()}-{request.node.name}")
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_backend(request, sqlite_path):
+    """Fabrique d'instances du backend partagé, comme dans des workers distincts."""
+    created = []
+
+    def make():
+        backend = SQLiteBackend(sqlite_path) if request.param == "sqlite" else _redis_backend(request)
+        created.append(backend)
+        return backend
+
+    yield make
+
+    async def cleanup():
+        for backend in created:
+            if isinstance(backend, RedisBackend):
+                keys = [key async for key in backend.redis.scan_iter(match=f"{backend.prefix}:*")]
+                if keys:
+                    await backend.redis.delete(*keys)
+            await backend.close()
+
+    run(cleanup())
@@ -0,0 +1,161 @@
+import asyncio
+import importlib.util
+
+import pytest
+
+from conftest import run
+from pennylane_mcp import backends
+from pennylane_mcp.backends import SQLiteBackend, backend_from_url, close_backends, shared_backend
+from pennylane_mcp.cache import ResponseCache, make_key
+
+
+def test_cache_roundtrip(make_backend):
+    backend = make_backend()
+    key = make_key("journals", {"limit": 100})
+
+    async def scenario():
+        assert await backend.get("a", key) == (False, None)
+        await backend.set("a", key, {"items": [{"id": 1, "label": "Ventes"}]}, 60)
+        return await backend.get("a", key)
+
+    assert run(scenario()) == (True, {"items": [{"id": 1, "label": "Ventes"}]})
+
+
+def test_cache_namespaces_are_isolated(make_backend):
+    backend = make_backend()
+    key = make_key("journals")
+
+    async def scenario():
+        await backend.set("a", key, "A", 60)
+        await backend.set("b", key, "B", 60)
+        await backend.clear("a")
+        return await backend.get("a", key), await backend.get("b", key)
+
+    assert run(scenario()) == ((False, None), (True, "B"))
+
+
+def test_cache_invalidate_targets_one_resource(make_backend):
+    backend = make_backend()
+    journals, detail, categories = make_key("journals"), make_key("journals/3"), make_key("categories")
+
+    async def scenario():
+        for key in (journals, detail, categories):
+            await backend.set("a", key, key[0], 60)
+        await backend.set("b", journals, "other tenant", 60)
+        stale = await backend.invalidate("a", "journals")
+        return stale, [await backend.get(namespace, key) for namespace, key in
+                       (("a", journals), ("a", detail), ("a", categories), ("b", journals))]
+
+    stale, found = run(scenario())
+    assert stale == 2
+    assert found == [(False, None), (False, None), (True, "categories"), (True, "other tenant")]
+
+
+def test_cache_entries_expire(make_backend):
+    backend = make_backend()
+    key = make_key("journals")
+
+    async def scenario():
+        await backend.set("a", key, "value", 0.001)
+        await asyncio.sleep(0.05)
+        return await backend.get("a", key)
+
+    assert run(scenario()) == (False, None)
+
+
+def test_cache_is_shared_between_workers(make_backend):
+    first, second = make_backend(), make_backend()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return {"items": []}
+
+    async def scenario():
+        # Deux workers, même clé API : le second sert l'entrée chargée par le premier
+        await ResponseCache(store=first, namespace="a").get_or_load("journals", None, load)
+        await ResponseCache(store=second, namespace="a").get_or_load("journals", None, load)
+        # Autre clé API : rien n'est partagé
+        await ResponseCache(store=second, namespace="b").get_or_load("journals", None, load)
+
+    run(scenario())
+    assert len(calls) == 2
+
+
+def test_session_registry_and_inbox(make_backend):
+    backend = make_backend()
+
+    async def scenario():
+        assert await backend.session_owner("s1") is None
+        await backend.register_session("s1", "worker-1")
+        await backend.register_session("s2", "worker-1")
+        owner = await backend.session_owner("s1")
+        for payload in (b"1", b"2"):
+            await backend.push_message("s1", payload)
+        await backend.push_message("s2", b"3")
+        popped = await backend.pop_messages(["s1", "s2"])
+        again = await backend.pop_messages(["s1", "s2"])
+        await backend.push_message("s1", b"4")
+        await backend.unregister_session("s1")
+        return owner, popped, again, await backend.session_owner("s1"), await backend.pop_messages(["s1"])
+
+    owner, popped, again, closed_owner, leftover = run(scenario())
+    assert owner == "worker-1"
+    assert sorted(popped) == [("s1", b"1"), ("s1", b"2"), ("s2", b"3")]
+    assert [payload for session_id, payload in popped if session_id == "s1"] == [b"1", b"2"]
+    assert again == []
+    assert closed_owner is None
+    assert leftover == []
+
+
+def test_sqlite_stale_sessions_have_no_owner(sqlite_path, monkeypatch):
+    backend = SQLiteBackend(sqlite_path)
+    monkeypatch.setattr(backends, "SESSION_TTL", 0.0)
+
+    async def scenario():
+        await backend.register_session("s1", "worker-1")
+        owner = await backend.session_owner("s1")
+        await backend.close()
+        return owner
+
+    assert run(scenario()) is None
+
+
+def test_sqlite_prunes_beyond_max_entries(sqlite_path, monkeypatch):
+    monkeypatch.setattr(backends, "SQLITE_PRUNE_EVERY", 1)
+    backend = SQLiteBackend(sqlite_path, max_entries=3)
+
+    async def scenario():
+        for index in range(5):
+            await backend.set("a", make_key("journals", {"page": index}), index, 60 + index)
+        found = [(await backend.get("a", make_key("journals", {"page": index})))[0] for index in range(5)]
+        await backend.close()
+        return found
+
+    # Les entrées les plus proches de l'expiration sont supprimées en premier
+    assert run(scenario()) == [False, False, True, True, True]
+
+
+def test_backend_from_url(sqlite_path):
+    assert backend_from_url(None) is None
+    assert backend_from_url("memory") is None
+    backend = backend_from_url(f"sqlite:///{sqlite_path}")
+    assert isinstance(backend, SQLiteBackend) and backend.path == sqlite_path
+    run(backend.close())
+    with pytest.raises(ValueError):
+        backend_from_url("postgres://localhost/state")
+
+
+@pytest.mark.skipif(importlib.util.find_spec("redis") is not None, reason="redis is installed")
+def test_redis_backend_requires_redis_package():
+    with pytest.raises(ValueError, match="redis"):
+        backend_from_url("redis://localhost:6379/0")
+
+
+def test_shared_backend_is_created_once_per_url(sqlite_path):
+    environ = {"PENNYLANE_STATE_BACKEND": f"sqlite:///{sqlite_path}"}
+    try:
+        assert shared_backend(environ) is shared_backend(environ)
+        assert shared_backend({}) is None
+    finally:
+        run(close_backends())
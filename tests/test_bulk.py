@@ -0,0 +1,108 @@
+import json
+
+import httpx
+
+from conftest import mock_client, run
+from pennylane_mcp.bulk import item_key
+from pennylane_mcp.registry import dispatch
+
+
+def _invoice(label, **extra):
+    return {
+        "customer_id": 1, "date": "2026-10-01", "deadline": "2026-10-31", "draft": True,
+        "invoice_lines": [{"label": label, "raw_currency_unit_price": "100.00", "quantity": 1,
+                           "unit": "jour", "vat_rate": "FR_200"}],
+        **extra,
+    }
+
+
+class FakeInvoices:
+    """API de création idempotente : une clé déjà vue renvoie la facture déjà créée."""
+
+    def __init__(self, failing_labels=()):
+        self.failing_labels = set(failing_labels)
+        self.created: dict[str, dict] = {}
+        self.keys = []
+
+    def __call__(self, request):
+        key = request.headers["Idempotency-Key"]
+        self.keys.append(key)
+        body = json.loads(request.content)
+        label = body["invoice_lines"][0]["label"]
+        if label in self.failing_labels:
+            return httpx.Response(422, text=f"rejected {label}")
+        if key not in self.created:
+            self.created[key] = {"id": len(self.created) + 1, "label": label}
+        return httpx.Response(201, json=self.created[key])
+
+
+def _bulk(client, invoices, **arguments):
+    async def scenario():
+        try:
+            return await dispatch(client, "pennylane_bulk_create_customer_invoices",
+                                  {"invoices": invoices, **arguments})
+        finally:
+            await client.close()
+
+    return run(scenario())
+
+
+def test_identical_items_get_distinct_keys():
+    invoice = _invoice("A")
+    assert item_key(invoice, "batch", 0) != item_key(invoice, "batch", 1)
+    assert item_key(invoice, "batch", 0) != item_key(_invoice("B"), "batch", 0)
+    assert item_key({**invoice, "idempotency_key": "mine"}, "batch", 0) == "mine"
+
+
+def test_resume_with_reported_keys_creates_only_the_missing_items():
+    api = FakeInvoices(failing_labels={"B"})
+    report = _bulk(mock_client(api), [_invoice("A"), _invoice("B"), _invoice("C")], batch_id="resume-keys")
+    assert report["counts"] == {"created": 2, "error": 1}
+    assert [item["index"] for item in report["retry"]] == [1]
+    failed_key = report["retry"][0]["idempotency_key"]
+
+    # Le client corrige puis renvoie la seule facture en échec, désormais en position 0
+    api.failing_labels.clear()
+    retried = _bulk(mock_client(api), [_invoice("B", idempotency_key=failed_key)], batch_id="resume-keys")
+    assert retried["counts"] == {"created": 1}
+    assert api.keys[-1] == failed_key
+    assert sorted(invoice["label"] for invoice in api.created.values()) == ["A", "B", "C"]
+
+
+def test_renumbered_items_never_reuse_another_items_key():
+    api = FakeInvoices(failing_labels={"B"})
+    first = _bulk(mock_client(api), [_invoice("A"), _invoice("B")], batch_id="renumbered")
+    created_key = first["items"][0]["idempotency_key"]
+
+    # Facture en échec renvoyée seule, sans sa clé : elle ne prend pas la clé de la facture A
+    api.failing_labels.clear()
+    second = _bulk(mock_client(api), [_invoice("B")], batch_id="renumbered")
+    assert second["items"][0]["idempotency_key"] != created_key
+    assert second["counts"] == {"created": 1}
+    assert sorted(invoice["label"] for invoice in api.created.values()) == ["A", "B"]
+
+
+def test_resending_the_whole_batch_skips_created_items():
+    api = FakeInvoices(failing_labels={"B"})
+    invoices = [_invoice("A"), _invoice("B")]
+    first = _bulk(mock_client(api), invoices, batch_id="whole-batch")
+
+    api.failing_labels.clear()
+    second = _bulk(mock_client(api), invoices, batch_id="whole-batch")
+    assert [item["status"] for item in second["items"]] == ["already_created", "created"]
+    assert second["items"][0]["id"] == first["items"][0]["id"]
+    assert len(api.keys) == 3
+
+
+def test_invalid_items_block_the_batch():
+    api = FakeInvoices()
+    report = _bulk(mock_client(api), [_invoice("A"), _invoice("B", fields=["id"], max_bytes=512)],
+                   batch_id="invalid")
+    assert report["counts"] == {"not_submitted": 1, "invalid": 1}
+    assert sorted(error["path"] for error in report["items"][1]["errors"]) == [
+        "invoices[1].fields", "invoices[1].max_bytes",
+    ]
+    assert api.keys == []
+
+    report = _bulk(mock_client(api), [_invoice("A"), {"customer_id": 1}], batch_id="invalid", skip_invalid=True)
+    assert report["counts"] == {"created": 1, "invalid": 1}
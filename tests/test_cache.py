@@ -0,0 +1,116 @@
+import asyncio
+
+import httpx
+
+from conftest import mock_client, run
+from pennylane_mcp.cache import ResponseCache, make_key, parse_ttls
+
+
+def _counting_loader(value="v", delay=0.0):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return f"{value}{len(calls)}"
+
+    return loader, calls
+
+
+def test_key_ignores_parameter_order_and_none():
+    assert make_key("/journals/", {"b": 1, "a": True, "c": None}) == make_key("journals", {"a": True, "b": "1"})
+
+
+def test_parse_ttls():
+    assert parse_ttls("journals=60, categories=0,garbage") == {"journals": 60.0, "categories": 0.0}
+
+
+def test_uncached_resources_always_load():
+    cache = ResponseCache()
+    loader, calls = _counting_loader()
+
+    async def scenario():
+        return [await cache.get_or_load("customer_invoices", None, loader) for _ in range(2)]
+
+    assert run(scenario()) == ["v1", "v2"]
+    assert cache.ttl_for("customer_invoices") is None
+
+
+def test_entries_expire_after_their_ttl():
+    cache = ResponseCache(ttls={"journals": 0.05})
+    loader, calls = _counting_loader()
+
+    async def scenario():
+        first = await cache.get_or_load("journals", {"limit": 100}, loader)
+        second = await cache.get_or_load("journals", {"limit": 100}, loader)
+        await asyncio.sleep(0.08)
+        third = await cache.get_or_load("journals", {"limit": 100}, loader)
+        return first, second, third
+
+    assert run(scenario()) == ("v1", "v1", "v2")
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    loader, calls = _counting_loader()
+
+    async def scenario():
+        for endpoint in ("journals/1", "journals/2", "journals/1", "journals/3"):
+            await cache.get_or_load(endpoint, None, loader)
+        await cache.get_or_load("journals/1", None, loader)
+        await cache.get_or_load("journals/2", None, loader)
+
+    run(scenario())
+    # journals/2, le moins récemment lu, a été évincé par journals/3
+    assert len(calls) == 4
+    assert len(cache) == 2
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ResponseCache()
+    loader, calls = _counting_loader(delay=0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_load("journals", None, loader) for _ in range(10)))
+
+    assert run(scenario()) == ["v1"] * 10
+    assert len(calls) == 1
+    assert len(cache._loading) == 0
+
+
+def test_write_during_load_is_not_cached():
+    cache = ResponseCache()
+    loader, calls = _counting_loader(delay=0.05)
+
+    async def scenario():
+        load = asyncio.create_task(cache.get_or_load("journals", None, loader))
+        await asyncio.sleep(0.01)
+        await cache.invalidate("journals/3")
+        await load
+        return await cache.get_or_load("journals", None, loader)
+
+    assert run(scenario()) == "v2"
+
+
+def test_client_writes_invalidate_the_resource():
+    upstream = []
+
+    def handler(request):
+        upstream.append((request.method, request.url.path.rsplit("/", 1)[-1]))
+        return httpx.Response(200, json={"items": [], "n": len(upstream)})
+
+    client = mock_client(handler, cache=ResponseCache(), coalesce_gets=False, conditional_gets=0)
+
+    async def scenario():
+        try:
+            await client.get("journals")
+            await client.get("categories")
+            await client.get("journals")
+            await client.post("journals", {"label": "Achats"})
+            await client.get("journals")
+            await client.get("categories")
+        finally:
+            await client.close()
+
+    run(scenario())
+    assert upstream == [("GET", "journals"), ("GET", "categories"), ("POST", "journals"), ("GET", "journals")]
@@ -0,0 +1,31 @@
+import pytest
+
+from conftest import run
+from pennylane_mcp.backends import SQLiteBackend, close_backends
+from pennylane_mcp.client import _worker_share, client_options_from_env
+
+
+@pytest.mark.parametrize("rate_limit, workers, share", [
+    (25, 1, 25),
+    (25, 0, 25),
+    (25, 4, 6),
+    (25, 5, 5),
+    (3, 8, 1),   # jamais moins d'une requête par période
+    (0, 4, 0),   # limiteur désactivé
+])
+def test_worker_share(rate_limit, workers, share):
+    assert _worker_share(rate_limit, workers) == share
+
+
+def test_rate_limit_is_split_between_workers():
+    options = client_options_from_env({"PENNYLANE_RATE_LIMIT": "25", "PENNYLANE_WORKERS": "4"})
+    assert options["rate_limit"] == 6
+    assert client_options_from_env({"PENNYLANE_RATE_LIMIT": "25"})["rate_limit"] == 25
+
+
+def test_cache_uses_the_shared_backend(sqlite_path):
+    options = client_options_from_env({"PENNYLANE_STATE_BACKEND": f"sqlite:///{sqlite_path}"})
+    try:
+        assert isinstance(options["cache"].store, SQLiteBackend)
+    finally:
+        run(close_backends())
@@ -0,0 +1,65 @@
+import httpx
+
+from conftest import mock_client, run
+from pennylane_mcp.cache import ValidatorStore, make_key
+
+
+def test_validators_are_only_kept_with_etag_or_last_modified():
+    store = ValidatorStore(max_entries=2)
+    journals, categories = make_key("journals"), make_key("categories")
+    store.store(journals, {"ETag": '"v1"'}, {"items": []})
+    store.store(categories, {}, {"items": []})
+    assert store.conditional_headers(journals) == ({"If-None-Match": '"v1"'}, {"items": []})
+    assert store.conditional_headers(categories) == ({}, None)
+
+
+def test_validator_store_is_bounded():
+    store = ValidatorStore(max_entries=2)
+    for page in range(3):
+        store.store(make_key("customers", {"page": page}), {"Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT"}, page)
+    assert len(store) == 2
+    assert store.conditional_headers(make_key("customers", {"page": 0})) == ({}, None)
+
+
+def test_not_modified_serves_the_stored_body():
+    sent = []
+
+    def handler(request):
+        sent.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"items": [{"id": 1}]}, headers={"ETag": '"v1"'})
+
+    client = mock_client(handler, coalesce_gets=False)
+
+    async def scenario():
+        try:
+            return [await client.get("customers", {"page": 1}) for _ in range(2)]
+        finally:
+            await client.close()
+
+    first, second = run(scenario())
+    assert sent == [None, '"v1"']
+    assert second == first == {"items": [{"id": 1}]}
+
+
+def test_body_is_captured_with_the_conditional_headers():
+    client = None
+
+    def handler(request):
+        if request.headers.get("If-None-Match"):
+            # Entrée évincée pendant la requête : le corps capturé est resservi quand même
+            client.validators._entries.clear()
+            return httpx.Response(304)
+        return httpx.Response(200, json={"items": [{"id": 2}]}, headers={"ETag": '"v2"'})
+
+    client = mock_client(handler, coalesce_gets=False)
+
+    async def scenario():
+        try:
+            await client.get("customers")
+            return await client.get("customers")
+        finally:
+            await client.close()
+
+    assert run(scenario()) == {"items": [{"id": 2}]}
@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import stat
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from pennylane_mcp import fec
+from pennylane_mcp.fec import FEC_COLUMNS, load_fec, parse_fec
+
+LINES = [
+    ("VE", "Ventes", "1", "20260105", "411000", "Clients", "C1", "ACME", "F1", "20260105", "Facture F1",
+     "1200,00", "0,00", "", "", "20260105", "", ""),
+    ("VE", "Ventes", "1", "20260105", "706000", "Prestations", "", "", "F1", "20260105", "Facture F1",
+     "0,00", "1000,00", "", "", "20260105", "", ""),
+    ("VE", "Ventes", "1", "20260105", "445710", "TVA collectée", "", "", "F1", "20260105", "Facture F1",
+     "0,00", "200,00", "", "", "20260105", "", ""),
+    ("BQ", "Banque", "2", "20260120", "512000", "Banque", "", "", "R1", "20260120", "Règlement F1",
+     "1200,00", "0,00", "", "", "20260120", "", ""),
+    ("BQ", "Banque", "2", "20260120", "411000", "Clients", "C1", "ACME", "R1", "20260120", "Règlement F1",
+     "0,00", "1 200,00", "AA", "20260121", "20260120", "", ""),
+]
+
+
+def _write_fec(path, lines=LINES, separator="\t", encoding="utf-8"):
+    with open(path, "w", encoding=encoding, newline="") as file:
+        file.write(separator.join(FEC_COLUMNS) + "\r\n")
+        for line in lines:
+            file.write(separator.join(line) + "\r\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("separator, encoding", [("\t", "utf-8"), ("|", "iso-8859-1")])
+def test_parse_fec_types_dates_and_amounts(tmp_path, separator, encoding):
+    records = list(parse_fec(_write_fec(tmp_path / "fec.txt", separator=separator, encoding=encoding)))
+    assert len(records) == 5
+    first, last = records[0], records[-1]
+    assert (first.journal_code, first.compte_num, first.comp_aux_num) == ("VE", "411000", "C1")
+    assert first.ecriture_date == date(2026, 1, 5)
+    assert first.debit == Decimal("1200.00")
+    assert records[2].compte_lib == "TVA collectée"
+    assert last.credit == Decimal("1200.00")
+    assert (last.ecriture_let, last.date_let) == ("AA", date(2026, 1, 21))
+    assert records[1].comp_aux_num is None and records[1].montant_devise is None
+
+
+def test_parse_fec_rejects_other_files(tmp_path):
+    path = tmp_path / "other.csv"
+    path.write_text("date;label;amount\n2026-01-01;x;1\n")
+    with pytest.raises(ValueError, match="Not a FEC file"):
+        list(parse_fec(str(path)))
+
+
+def test_load_fec_totals_and_replaces_the_fiscal_year(tmp_path):
+    db = sqlite3.connect(":memory:")
+    path = _write_fec(tmp_path / "fec.txt")
+    report = load_fec(db, path, fiscal_year_id=7, batch_size=2)
+    assert report == {
+        "lines": 5,
+        "debit": "2400.00",
+        "credit": "2400.00",
+        "balanced": True,
+        "journals": {
+            "BQ": {"lines": 2, "debit": "1200.00", "credit": "1200.00"},
+            "VE": {"lines": 3, "debit": "1200.00", "credit": "1200.00"},
+        },
+    }
+    load_fec(db, _write_fec(tmp_path / "fec2.txt", LINES[:3]), fiscal_year_id=7)
+    load_fec(db, path, fiscal_year_id=8)
+    counts = dict(db.execute("SELECT fiscal_year_id, count(*) FROM fec_lines GROUP BY fiscal_year_id"))
+    assert counts == {7: 3, 8: 5}
+
+
+def test_failed_load_keeps_the_previous_lines(tmp_path):
+    db = sqlite3.connect(":memory:")
+    load_fec(db, _write_fec(tmp_path / "fec.txt"), fiscal_year_id=7)
+    bad = tmp_path / "bad.txt"
+    bad.write_text("not a FEC\n")
+    with pytest.raises(ValueError):
+        load_fec(db, str(bad), fiscal_year_id=7)
+    assert db.execute("SELECT count(*) FROM fec_lines WHERE fiscal_year_id = 7").fetchone()[0] == 5
+
+
+def test_export_directory_is_private_unless_configured(tmp_path, monkeypatch):
+    monkeypatch.delenv(fec.FEC_DIR_ENV, raising=False)
+    monkeypatch.setattr(fec, "_private_directory", None)
+    directory = fec.export_directory()
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    assert fec.export_directory() == directory
+    os.rmdir(directory)
+
+    configured = tmp_path / "exports"
+    monkeypatch.setenv(fec.FEC_DIR_ENV, str(configured))
+    assert fec.export_directory() == str(configured)
+    assert configured.is_dir()
@@ -0,0 +1,76 @@
+import asyncio
+import importlib
+import json
+
+import pytest
+
+from conftest import mock_client, run
+from pennylane_mcp.jsonrpc import INTERNAL_ERROR, INVALID_REQUEST, MAX_BATCH_SIZE, handle_payload
+from pennylane_mcp.serialization import tool_result_envelope
+
+
+async def echo(message):
+    if message.get("method") == "fail":
+        raise RuntimeError("boom")
+    # Les premières requêtes finissent en dernier : l'ordre des réponses ne dépend pas de l'exécution
+    await asyncio.sleep(0.01 * (5 - message.get("id", 0)))
+    return {"jsonrpc": "2.0", "id": message["id"], "result": message["method"]}
+
+
+def _handle(payload, concurrency=8):
+    response = run(handle_payload(payload, echo, concurrency))
+    return None if response is None else json.loads(response)
+
+
+def test_single_message_and_notification():
+    assert _handle({"jsonrpc": "2.0", "id": 1, "method": "ping"}) == {"jsonrpc": "2.0", "id": 1, "result": "ping"}
+    assert _handle({"jsonrpc": "2.0", "method": "notifications/initialized"}) is None
+
+
+def test_batch_responses_keep_request_order_and_skip_notifications():
+    batch = [
+        {"jsonrpc": "2.0", "id": 1, "method": "a"},
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {"jsonrpc": "2.0", "id": 2, "method": "fail"},
+        "garbage",
+        {"jsonrpc": "2.0", "id": 3, "method": "c"},
+    ]
+    responses = _handle(batch, concurrency=2)
+    assert [response["id"] for response in responses] == [1, 2, None, 3]
+    assert responses[0]["result"] == "a"
+    assert responses[1]["error"]["code"] == INTERNAL_ERROR
+    assert responses[2]["error"]["code"] == INVALID_REQUEST
+
+
+def test_batch_of_notifications_gets_no_response():
+    assert _handle([{"jsonrpc": "2.0", "method": "notifications/initialized"}] * 3) is None
+
+
+@pytest.mark.parametrize("batch", [[], [{"jsonrpc": "2.0", "id": 1, "method": "a"}] * (MAX_BATCH_SIZE + 1)])
+def test_empty_or_oversized_batches_are_rejected(batch):
+    assert _handle(batch)["error"]["code"] == INVALID_REQUEST
+
+
+def test_tool_errors_are_flagged():
+    assert json.loads(tool_result_envelope(4, "{}"))["result"] == {"content": [{"type": "text", "text": "{}"}]}
+    assert json.loads(tool_result_envelope(4, "{}", is_error=True))["result"]["isError"] is True
+
+
+@pytest.mark.parametrize("module", ["sse_server", "mcp_sse_server"])
+def test_validation_errors_are_structured_tool_errors(monkeypatch, module):
+    monkeypatch.setenv("PENNYLANE_API_KEY", "test-key")
+    server = importlib.import_module(f"pennylane_mcp.{module}")
+    client = mock_client(lambda request: pytest.fail("invalid call reached the API"))
+    message = {"jsonrpc": "2.0", "id": 9, "method": "tools/call",
+               "params": {"name": "pennylane_get_customer", "arguments": {"customer_id": 3.0}}}
+
+    async def scenario():
+        try:
+            return await handle_payload(message, lambda body: server.process_message(body, client))
+        finally:
+            await client.close()
+
+    result = json.loads(run(scenario()))["result"]
+    assert result["isError"] is True
+    body = json.loads(result["content"][0]["text"])
+    assert [error["path"] for error in body["validation_errors"]] == ["customer_id"]
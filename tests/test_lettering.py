@@ -0,0 +1,78 @@
+from pennylane_mcp.lettering import LetteringEngine
+
+
+def _line(id, date, debit=None, credit=None, **extra):
+    return {"id": id, "date": date, "debit": debit, "credit": credit, **extra}
+
+
+def _solve(lines, **options):
+    engine = LetteringEngine(**options)
+    for line in lines:
+        engine.add(line)
+    return engine.solve()
+
+
+def _groups(result):
+    return [(group["kind"], sorted(group["line_ids"]), group["amount"]) for group in result["groups"]]
+
+
+def test_lettered_and_zero_lines_are_ignored():
+    engine = LetteringEngine()
+    assert engine.add(_line(1, "2026-01-01", debit="10.00"))
+    assert not engine.add(_line(2, "2026-01-01", debit="10.00", lettering={"id": 4}))
+    assert not engine.add(_line(3, "2026-01-01", debit="0.00", credit="0.00"))
+    assert len(engine) == 1
+
+
+def test_exact_pairs_take_the_closest_debit_in_date():
+    result = _solve([
+        _line(1, "2026-01-05", debit="120.00"),
+        _line(2, "2026-03-01", debit="120.00"),
+        _line(3, "2026-02-25", credit="120.00"),
+        _line(4, "2026-01-10", credit="120.00"),
+        _line(5, "2026-01-10", credit="99.99"),
+    ])
+    assert _groups(result) == [("exact", [1, 4], "120.00"), ("exact", [2, 3], "120.00")]
+    assert (result["lines"], result["lettered_lines"]) == (5, 4)
+
+
+def test_exact_pairs_respect_the_date_window():
+    result = _solve([_line(1, "2026-01-01", debit="50.00"), _line(2, "2026-12-01", credit="50.00")],
+                    date_window_days=30)
+    assert result["groups"] == []
+
+
+def test_recurring_amounts_are_all_paired():
+    lines = [_line(index, f"2026-01-{index:02d}", debit="75.00") for index in range(1, 21)]
+    lines += [_line(100 + index, f"2026-01-{index:02d}", credit="75.00") for index in range(1, 21)]
+    result = _solve(lines)
+    assert _groups(result) == [("exact", [index, 100 + index], "75.00") for index in range(1, 21)]
+
+
+def test_subset_groups_balance_one_line_against_several():
+    result = _solve([
+        _line(1, "2026-01-31", debit="1000.00"),
+        _line(2, "2026-01-05", credit="250.00"),
+        _line(3, "2026-01-12", credit="400.00"),
+        _line(4, "2026-01-20", credit="350.00"),
+        _line(5, "2026-01-21", credit="5.00"),
+    ])
+    assert _groups(result) == [("subset", [1, 2, 3, 4], "1000.00")]
+    assert result["lettered_lines"] == 4
+
+
+def test_exact_matches_are_preferred_to_subsets():
+    result = _solve([
+        _line(1, "2026-01-31", debit="300.00"),
+        _line(2, "2026-01-05", credit="100.00"),
+        _line(3, "2026-01-06", credit="200.00"),
+        _line(4, "2026-01-07", credit="300.00"),
+    ])
+    assert _groups(result) == [("exact", [1, 4], "300.00")]
+
+
+def test_subset_size_is_bounded():
+    lines = [_line(1, "2026-01-31", debit="400.00")]
+    lines += [_line(index, "2026-01-10", credit="100.00") for index in range(2, 6)]
+    assert _solve(lines, max_group_size=4)["groups"] == []
+    assert _groups(_solve(lines, max_group_size=5)) == [("subset", [1, 2, 3, 4, 5], "400.00")]
@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from conftest import mock_client, run
+from pennylane_mcp.client import PennylaneAPIError
+from pennylane_mcp.mirror import Mirror
+
+
+def _customer(id, updated_at):
+    return {"id": id, "updated_at": updated_at, "name": f"Client {id}", "customer_type": "company"}
+
+
+class FakeCustomers:
+    """API clients paginée par deux, filtrable sur updated_at."""
+
+    def __init__(self, customers):
+        self.customers = customers
+        self.filters = []
+        self.fail_on_cursor = None
+
+    def __call__(self, request):
+        filter_query = request.url.params.get("filter")
+        self.filters.append(filter_query)
+        cursor = int(request.url.params.get("cursor") or 0)
+        if cursor == self.fail_on_cursor:
+            return httpx.Response(400, text="bad cursor")
+        customers = self.customers
+        if filter_query:
+            since = json.loads(filter_query)[0]["value"]
+            customers = [customer for customer in customers if customer["updated_at"] >= since]
+        page = customers[cursor:cursor + 2]
+        more = cursor + 2 < len(customers)
+        return httpx.Response(200, json={"items": page, "has_more": more, "next_cursor": str(cursor + 2) if more else None})
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = Mirror(str(tmp_path / "mirror.db"))
+    yield mirror
+    mirror.close()
+
+
+def test_sync_is_incremental(mirror):
+    api = FakeCustomers([_customer(1, "2026-10-01"), _customer(2, "2026-10-02"), _customer(3, "2026-10-03")])
+    client = mock_client(api, coalesce_gets=False)
+
+    async def scenario():
+        try:
+            first = await mirror.sync_resource(client, "customers")
+            api.customers.append(_customer(4, "2026-10-04"))
+            api.filters.clear()
+            second = await mirror.sync_resource(client, "customers")
+            rows = await mirror.fetch("SELECT id, name FROM customers ORDER BY id")
+            return first, second, rows
+        finally:
+            await client.close()
+
+    first, second, rows = run(scenario())
+    assert (first["synced"], first["incremental"], first["watermark"]) == (3, False, "2026-10-03")
+    # Seuls les objets modifiés depuis le filigrane sont relus
+    assert second["incremental"] is True
+    assert json.loads(api.filters[0])[0] == {"field": "updated_at", "operator": "gteq", "value": "2026-10-03"}
+    assert (second["synced"], second["watermark"]) == (2, "2026-10-04")
+    assert [row["id"] for row in rows] == [1, 2, 3, 4]
+
+
+def test_failed_sync_keeps_the_watermark(mirror):
+    api = FakeCustomers([_customer(id, f"2026-10-0{id}") for id in range(1, 6)])
+    api.fail_on_cursor = 2
+    client = mock_client(api, coalesce_gets=False)
+
+    async def scenario():
+        try:
+            with pytest.raises(PennylaneAPIError):
+                await mirror.sync_resource(client, "customers")
+            return await mirror.status(), await mirror.watermark("customers")
+        finally:
+            await client.close()
+
+    status, watermark = run(scenario())
+    state = next(resource for resource in status["resources"] if resource["resource"] == "customers")
+    assert state["last_status"] == "error"
+    assert state["rows"] == 2
+    assert watermark is None
+
+
+def test_concurrent_readers_and_writers_share_the_connection(mirror):
+    api = FakeCustomers([_customer(id, "2026-10-01") for id in range(1, 41)])
+    client = mock_client(api, coalesce_gets=False)
+
+    async def scenario():
+        try:
+            reads = [mirror.fetch("SELECT count(*) AS n FROM customers") for _ in range(20)]
+            results = await asyncio.gather(mirror.sync_resource(client, "customers", full=True), *reads)
+            return results[0], await mirror.fetch("SELECT count(*) AS n FROM customers")
+        finally:
+            await client.close()
+
+    report, rows = run(scenario())
+    assert report["synced"] == 40
+    assert rows == [{"n": 40}]
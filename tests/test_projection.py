@@ -0,0 +1,53 @@
+import httpx
+
+from conftest import mock_client, run
+from pennylane_mcp.projection import Projection, compile_fields
+from pennylane_mcp.registry import dispatch
+
+INVOICE = {
+    "id": 1,
+    "invoice_number": "F-001",
+    "customer": {"id": 3, "name": "ACME", "emails": ["a@acme.test"]},
+    "invoice_lines": [{"label": "Conseil", "amount": "100.00"}, {"label": "Audit", "amount": "50.00"}],
+}
+
+
+def test_compile_fields_keeps_whole_parents():
+    assert compile_fields(["customer.name", "customer", "id", "a..b"]) == {"customer": None, "id": None, "a": {"b": None}}
+
+
+def test_projection_follows_dotted_paths_and_lists():
+    projected = Projection(["id", "customer.name", "invoice_lines.label", "missing.field"]).apply(INVOICE)
+    assert projected == {
+        "id": 1,
+        "customer": {"name": "ACME"},
+        "invoice_lines": [{"label": "Conseil"}, {"label": "Audit"}],
+    }
+    # La réponse d'origine (éventuellement en cache) n'est pas modifiée
+    assert INVOICE["customer"]["emails"] == ["a@acme.test"]
+
+
+def test_list_responses_keep_their_metadata():
+    result = {"items": [INVOICE, INVOICE], "has_more": True, "next_cursor": "abc"}
+    assert Projection(["invoice_number"]).apply(result) == {
+        "items": [{"invoice_number": "F-001"}] * 2, "has_more": True, "next_cursor": "abc",
+    }
+
+
+def test_fields_argument_is_not_sent_upstream():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=INVOICE)
+
+    client = mock_client(handler)
+
+    async def scenario():
+        try:
+            return await dispatch(client, "pennylane_get_customer_invoice", {"invoice_id": 1, "fields": ["id"]})
+        finally:
+            await client.close()
+
+    assert run(scenario()) == {"id": 1}
+    assert "fields" not in str(requests[0].url)
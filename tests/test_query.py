@@ -0,0 +1,54 @@
+import pytest
+
+from conftest import run
+from pennylane_mcp.mirror import RESOURCES, Mirror
+
+CUSTOMERS = RESOURCES["customers"]
+
+
+@pytest.fixture(params=["file", "memory"])
+def mirror(request, tmp_path):
+    mirror = Mirror(str(tmp_path / "mirror.db") if request.param == "file" else ":memory:")
+    rows = [CUSTOMERS.row({"id": index, "updated_at": "2026-10-01T00:00:00Z", "name": f"Client {index}"})
+            for index in range(1, 21)]
+    run(mirror.run(Mirror._upsert, CUSTOMERS.upsert_statement(), rows))
+    yield mirror
+    mirror.close()
+
+
+def test_select_with_bound_parameters(mirror):
+    result = run(mirror.query("SELECT id, name FROM customers WHERE id <= ? ORDER BY id", [2]))
+    assert result["columns"] == ["id", "name"]
+    assert result["rows"] == [[1, "Client 1"], [2, "Client 2"]]
+    assert result["truncated"] is False
+
+
+def test_rows_are_capped(mirror):
+    result = run(mirror.query("SELECT id FROM customers ORDER BY id", max_rows=5))
+    assert result["count"] == 5
+    assert result["truncated"] is True
+
+
+@pytest.mark.parametrize("sql", [
+    "INSERT INTO customers (id, data) VALUES (99, '{}')",
+    "UPDATE customers SET name = 'x'",
+    "DELETE FROM customers",
+    "DROP TABLE customers",
+    "CREATE TABLE stolen (id INTEGER)",
+    "PRAGMA journal_mode=DELETE",
+    "PRAGMA table_info(customers)",
+    "ATTACH DATABASE ':memory:' AS other",
+    "SELECT id FROM customers; DELETE FROM customers",
+])
+def test_anything_but_reads_is_rejected(mirror, sql):
+    with pytest.raises(ValueError, match="Query rejected"):
+        run(mirror.query(sql))
+    assert run(mirror.query("SELECT count(*) FROM customers"))["rows"] == [[20]]
+
+
+def test_long_queries_are_interrupted(mirror):
+    endless = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT max(i) FROM n"
+    with pytest.raises(TimeoutError):
+        run(mirror.query(endless, timeout=0.1))
+    # La connexion reste utilisable après l'interruption
+    assert run(mirror.query("SELECT count(*) FROM customers"))["rows"] == [[20]]
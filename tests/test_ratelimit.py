@@ -0,0 +1,90 @@
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from conftest import mock_client, run
+from pennylane_mcp.client import RateLimitError
+from pennylane_mcp.ratelimit import RateLimiter, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    in_ten_seconds = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+    assert 8 <= parse_retry_after(in_ten_seconds) <= 10
+
+
+def test_limiter_follows_quota_headers():
+    limiter = RateLimiter(rate=25, period=5.0)
+    limiter.update_from_headers({"ratelimit-limit": "10", "ratelimit-remaining": "3"})
+    assert limiter.capacity == 10
+    assert limiter.tokens == 3
+
+    limiter.update_from_headers({"ratelimit-remaining": "0", "ratelimit-reset": "30"})
+    assert limiter.tokens == 0
+    assert limiter._blocked_until - time.monotonic() > 29
+
+
+def test_limiter_spaces_requests_beyond_the_burst():
+    limiter = RateLimiter(rate=2, period=0.2)
+
+    async def scenario():
+        started = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+        return time.monotonic() - started
+
+    # Deux jetons d'emblée, puis un jeton toutes les 0,1 s
+    assert run(scenario()) >= 0.18
+
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_429_is_retried_after_retry_after(method):
+    calls = []
+
+    def handler(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.2"})
+        return httpx.Response(200, json={"id": 1})
+
+    client = mock_client(handler, coalesce_gets=False)
+
+    async def scenario():
+        try:
+            if method == "GET":
+                return await client.get("customers/1")
+            return await client.post("customers", {"name": "ACME"})
+        finally:
+            await client.close()
+
+    # Un 429 n'a pas été traité : même un POST sans clé d'idempotence est rejoué
+    assert run(scenario()) == {"id": 1}
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.19
+
+
+def test_429_gives_up_after_max_retries():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"Retry-After": "0"}, text="slow down")
+
+    client = mock_client(handler, max_rate_limit_retries=2, coalesce_gets=False)
+
+    async def scenario():
+        try:
+            await client.get("customers")
+        finally:
+            await client.close()
+
+    with pytest.raises(RateLimitError) as error:
+        run(scenario())
+    assert error.value.status_code == 429
+    assert len(calls) == 3
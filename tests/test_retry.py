@@ -0,0 +1,87 @@
+import httpx
+import pytest
+
+from conftest import mock_client, run
+from pennylane_mcp.client import PennylaneAPIError
+from pennylane_mcp.retry import RetryPolicy
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01)
+
+
+def test_backoff_is_bounded():
+    policy = RetryPolicy(base_delay=0.5, max_delay=2.0)
+    assert all(0 <= policy.backoff(attempt) <= 2.0 for attempt in range(10) for _ in range(20))
+
+
+def test_next_delay_stops_after_max_attempts_and_deadline():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.1, deadline=5.0)
+    assert policy.next_delay(0, 0.0) is not None
+    assert policy.next_delay(1, 0.0) is not None
+    assert policy.next_delay(2, 0.0) is None
+    # Retry-After plus long que le backoff est respecté, sauf s'il dépasse l'échéance
+    assert policy.next_delay(0, 0.0, retry_after=1.5) == 1.5
+    assert policy.next_delay(0, 4.0, retry_after=1.5) is None
+
+
+def test_only_idempotent_requests_are_retried():
+    policy = RetryPolicy()
+    assert policy.allows("GET") and policy.allows("PUT") and policy.allows("DELETE")
+    assert not policy.allows("POST")
+    assert policy.allows("POST", "invoice-1")
+
+
+def _flaky(failures, error=None):
+    """Handler qui échoue `failures` fois (503 ou exception réseau) puis répond."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) <= failures:
+            if error is not None:
+                raise error("boom", request=request)
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+
+    return handler, requests
+
+
+def _call(client, method, **kwargs):
+    async def scenario():
+        try:
+            if method == "GET":
+                return await client.get("journals")
+            return await client.post("customer_invoices", {"label": "x"}, **kwargs)
+        finally:
+            await client.close()
+
+    return run(scenario())
+
+
+@pytest.mark.parametrize("error", [None, httpx.ConnectError])
+def test_get_is_retried_on_transient_failures(error):
+    handler, requests = _flaky(2, error)
+    client = mock_client(handler, retry_policy=FAST_RETRIES, coalesce_gets=False)
+    assert _call(client, "GET") == {"ok": True}
+    assert len(requests) == 3
+
+
+def test_retries_give_up_after_max_attempts():
+    handler, requests = _flaky(5)
+    client = mock_client(handler, retry_policy=FAST_RETRIES, coalesce_gets=False)
+    with pytest.raises(PennylaneAPIError) as error:
+        _call(client, "GET")
+    assert error.value.status_code == 503
+    assert len(requests) == 3
+
+
+def test_post_is_retried_only_with_an_idempotency_key():
+    handler, requests = _flaky(1)
+    client = mock_client(handler, retry_policy=FAST_RETRIES)
+    with pytest.raises(PennylaneAPIError):
+        _call(client, "POST")
+    assert len(requests) == 1
+
+    handler, requests = _flaky(1)
+    client = mock_client(handler, retry_policy=FAST_RETRIES)
+    assert _call(client, "POST", idempotency_key="invoice-1") == {"ok": True}
+    assert [request.headers["Idempotency-Key"] for request in requests] == ["invoice-1", "invoice-1"]
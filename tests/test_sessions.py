@@ -0,0 +1,82 @@
+import asyncio
+
+from conftest import run
+from pennylane_mcp.serialization import dumps
+from pennylane_mcp.sessions import SessionManager
+
+
+async def echo(session, message):
+    return dumps({"id": message["id"], "session": session.id, "api_key": session.api_key})
+
+
+def test_forward_reaches_the_worker_holding_the_stream(make_backend):
+    holder = SessionManager(make_backend(), worker_id="worker-1")
+    other = SessionManager(make_backend(), worker_id="worker-2")
+
+    async def scenario():
+        holder.start(echo)
+        other.start(echo)
+        session = await holder.open("key-a")
+        try:
+            # Le message arrive sur le worker qui ne détient pas le flux
+            assert other.get(session.id) is None
+            assert await other.forward(session.id, {"id": 7, "method": "tools/list"})
+            return session.id, await asyncio.wait_for(session.queue.get(), 5)
+        finally:
+            await holder.stop()
+            await other.stop()
+
+    session_id, message = run(scenario())
+    assert message == dumps({"id": 7, "session": session_id, "api_key": "key-a"})
+    assert other.forwarded == 1
+
+
+def test_forward_preserves_order(make_backend):
+    holder = SessionManager(make_backend(), worker_id="worker-1")
+    other = SessionManager(make_backend(), worker_id="worker-2")
+
+    async def scenario():
+        session = await holder.open()
+        for index in range(5):
+            assert await other.forward(session.id, {"id": index})
+        # Relève démarrée après les dépôts : tous les messages sont pris en un passage
+        received = []
+
+        async def record(session, message):
+            received.append(message["id"])
+
+        holder.start(record)
+        try:
+            for _ in range(100):
+                if len(received) == 5:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await holder.stop()
+        return received
+
+    assert run(scenario()) == [0, 1, 2, 3, 4]
+
+
+def test_forward_to_unknown_or_closed_session(make_backend):
+    holder = SessionManager(make_backend(), worker_id="worker-1")
+    other = SessionManager(make_backend(), worker_id="worker-2")
+
+    async def scenario():
+        unknown = await other.forward("missing", {"id": 1})
+        session = await holder.open()
+        await holder.close(session.id)
+        return unknown, await other.forward(session.id, {"id": 2})
+
+    assert run(scenario()) == (False, False)
+    assert other.forwarded == 0
+
+
+def test_forward_without_backend():
+    sessions = SessionManager()
+
+    async def scenario():
+        session = await sessions.open()
+        return await sessions.forward(session.id, {"id": 1})
+
+    assert run(scenario()) is False
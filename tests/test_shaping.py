@@ -0,0 +1,76 @@
+import httpx
+import pytest
+
+from conftest import mock_client, run
+from pennylane_mcp.registry import dispatch
+from pennylane_mcp.shaping import ResponseShaper, encode_continuation, resolve_continuation, summarize
+from pennylane_mcp.validation import ToolValidationError
+
+ENTRIES = [
+    {"id": index, "label": f"Écriture {index}", "amount": "10.50", "date": f"2026-01-{index + 1:02d}"}
+    for index in range(30)
+]
+
+
+def test_small_lists_are_returned_untouched():
+    result = {"items": ENTRIES[:2], "has_more": False}
+    assert ResponseShaper("tool", {"max_bytes": 4096}).apply(result) is result
+
+
+@pytest.mark.parametrize("limits", [{"max_bytes": 256}, {"max_bytes": 1024}, {"max_tokens": 64}])
+def test_truncated_lists_fit_the_budget(limits):
+    shaped = ResponseShaper("tool", limits).apply({"items": ENTRIES, "has_more": False})
+    budget = limits.get("max_bytes") or limits["max_tokens"] * 4
+    returned = shaped["shaped"]["returned"]
+    # Petites limites comprises : plusieurs items tiennent, pas seulement le minimum d'un
+    assert 1 < returned < len(ENTRIES)
+    assert shaped["items"] == ENTRIES[:returned]
+    assert shaped["has_more"] is False
+    assert shaped["shaped"]["omitted"] == len(ENTRIES) - returned
+    assert len(str(shaped["items"]).encode()) < budget
+
+
+def test_summary_covers_every_remaining_item():
+    assert summarize(ENTRIES) == {
+        "count": 30,
+        "sums": {"amount": "315.00"},
+        "date_range": {"field": "date", "from": "2026-01-01", "to": "2026-01-30"},
+    }
+
+
+def test_continuation_token_carries_arguments_and_offset():
+    token = encode_continuation("pennylane_list_journals", {"filter": "x"}, 12)
+    arguments, skip = resolve_continuation("pennylane_list_journals", {"continuation": token, "max_bytes": 512})
+    assert (arguments, skip) == ({"filter": "x", "max_bytes": 512}, 12)
+    with pytest.raises(ToolValidationError):
+        resolve_continuation("pennylane_list_customers", {"continuation": token})
+    with pytest.raises(ToolValidationError):
+        resolve_continuation("pennylane_list_journals", {"continuation": "not a token"})
+
+
+def test_continuation_round_trip_returns_every_item_once():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"items": ENTRIES})
+
+    client = mock_client(handler, coalesce_gets=False)
+
+    async def scenario():
+        pages = []
+        arguments = {"max_bytes": 512}
+        try:
+            while True:
+                result = await dispatch(client, "pennylane_list_journals", arguments)
+                pages.append(result["items"])
+                if "shaped" not in result:
+                    return pages
+                arguments = {"continuation": result["shaped"]["continuation"], "max_bytes": 512}
+        finally:
+            await client.close()
+
+    pages = run(scenario())
+    assert len(pages) > 2
+    assert [item for page in pages for item in page] == ENTRIES
+    assert len(requests) == len(pages)
@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+
+from conftest import mock_client, run
+from pennylane_mcp.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"id": 1}
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+        # Appel terminé : le suivant relance une exécution
+        await flight.do("key", fetch)
+        return results
+
+    results = run(scenario())
+    assert len(calls) == 2
+    assert flight.saved == 4
+    assert all(result is results[0] for result in results)
+    assert len(flight) == 0
+
+
+def test_errors_are_shared():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    assert [str(error) for error in run(scenario())] == ["upstream"] * 3
+
+
+def test_followers_survive_the_leader_cancellation():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert run(scenario()) == "done"
+
+
+def test_call_is_cancelled_when_nobody_waits():
+    flight = SingleFlight()
+    finished = []
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    async def scenario():
+        caller = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0.08)
+
+    run(scenario())
+    assert finished == []
+    assert len(flight) == 0
+
+
+def test_client_coalesces_identical_gets():
+    upstream = []
+
+    async def handler(request):
+        upstream.append(str(request.url))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"items": []})
+
+    client = mock_client(handler)
+
+    async def scenario():
+        try:
+            await asyncio.gather(
+                *(client.get("customers", {"page": 1}) for _ in range(5)),
+                client.get("customers", {"page": 2}),
+            )
+        finally:
+            await client.close()
+
+    run(scenario())
+    assert len(upstream) == 2
@@ -0,0 +1,44 @@
+import asyncio
+
+from conftest import run
+from pennylane_mcp.streaming import ProgressReporter
+
+
+class Page:
+    def __init__(self, pages, has_more):
+        self.pages = pages
+        self.has_more = has_more
+
+
+def _notifications(reporter):
+    async def call():
+        await reporter.on_page([{"id": 1}, {"id": 2}], Page(1, True))
+        await reporter.on_page([{"id": 3}], Page(2, False))
+        return "done"
+
+    async def scenario():
+        task = asyncio.create_task(reporter.run(call()))
+        notifications = [notification async for notification in reporter.events(task)]
+        return notifications, task.result()
+
+    notifications, result = run(scenario())
+    assert result == "done"
+    return notifications
+
+
+def test_no_progress_without_a_client_token():
+    assert _notifications(ProgressReporter(request_id=5)) == []
+
+
+def test_progress_uses_the_client_token():
+    notifications = _notifications(ProgressReporter(request_id=5, progress_token="tok"))
+    assert [notification["params"] for notification in notifications] == [
+        {"progressToken": "tok", "progress": 2, "message": "page 1 (2 items)"},
+        {"progressToken": "tok", "progress": 3, "message": "page 2 (3 items)", "total": 3},
+    ]
+
+
+def test_partial_results_are_opt_in():
+    notifications = _notifications(ProgressReporter(request_id=5, partial=True))
+    assert [notification["method"] for notification in notifications] == ["notifications/partial_result"] * 2
+    assert notifications[1]["params"] == {"requestId": 5, "page": 2, "items": [{"id": 3}]}
@@ -0,0 +1,81 @@
+import httpx
+import pytest
+
+from conftest import mock_client, run
+from pennylane_mcp.registry import dispatch
+from pennylane_mcp.validation import ToolValidationError, compile_schema
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "customer_id": {"type": "integer", "minimum": 1},
+        "amount": {"type": "number"},
+        "status": {"type": "string", "enum": ["draft", "final"]},
+        "label": {"type": "string", "minLength": 1},
+        "lines": {
+            "type": "array",
+            "minItems": 1,
+            "maxItems": 2,
+            "items": {"type": "object", "properties": {"quantity": {"type": "number"}}, "required": ["quantity"]},
+        },
+    },
+    "required": ["customer_id"],
+}
+
+validate = compile_schema(SCHEMA)
+
+
+def _errors(value):
+    return [(error["path"], error["keyword"]) for error in validate(value, "")]
+
+
+def test_valid_arguments_have_no_errors():
+    assert validate({"customer_id": 3, "amount": 2, "status": "final", "lines": [{"quantity": 1.5}]}, "") == []
+
+
+@pytest.mark.parametrize("value", [3.0, True, "3"])
+def test_integers_reject_floats_booleans_and_strings(value):
+    assert _errors({"customer_id": value}) == [("customer_id", "type")]
+
+
+def test_numbers_reject_booleans():
+    assert _errors({"customer_id": 1, "amount": False}) == [("amount", "type")]
+
+
+def test_errors_report_every_failing_path():
+    assert sorted(_errors({"status": "sent", "label": "", "lines": [{}, {"quantity": "1"}, {"quantity": 1}],
+                           "customer_id": 0})) == [
+        ("customer_id", "minimum"),
+        ("label", "minLength"),
+        ("lines", "maxItems"),
+        ("lines[0].quantity", "required"),
+        ("lines[1].quantity", "type"),
+        ("status", "enum"),
+    ]
+
+
+def test_missing_and_additional_properties():
+    strict = compile_schema({"type": "object", "properties": {"id": {"type": "integer"}},
+                             "required": ["id"], "additionalProperties": False})
+    assert strict({"extra": 1}, "") == [
+        {"path": "id", "keyword": "required", "message": "is required"},
+        {"path": "extra", "keyword": "additionalProperties", "message": "is not allowed"},
+    ]
+    assert strict([], "") == [{"path": "$", "keyword": "type", "message": "expected object, got list"}]
+
+
+def test_invalid_tool_call_never_reaches_the_api():
+    requests = []
+    client = mock_client(lambda request: requests.append(request) or httpx.Response(200, json={}))
+
+    async def scenario():
+        try:
+            await dispatch(client, "pennylane_get_customer", {"customer_id": 3.0})
+        finally:
+            await client.close()
+
+    with pytest.raises(ToolValidationError) as error:
+        run(scenario())
+    assert error.value.tool == "pennylane_get_customer"
+    assert [item["path"] for item in error.value.errors] == ["customer_id"]
+    assert requests == []